@@ -14,12 +14,14 @@ class AppSettings:
     database_url: str
     jwt_secret: str
     jwt_expires_minutes: int
+    max_concurrent_runs: int
 
 
 def get_settings() -> AppSettings:
     database_url = os.getenv("APP_DATABASE_URL")
     jwt_secret = os.getenv("APP_JWT_SECRET")
     jwt_expires_minutes = int(os.getenv("APP_JWT_EXPIRES_MINUTES", "120"))
+    max_concurrent_runs = max(1, int(os.getenv("APP_MAX_CONCURRENT_RUNS", "2")))
 
     if not database_url:
         raise ValueError("APP_DATABASE_URL não definido.")
@@ -30,6 +32,7 @@ def get_settings() -> AppSettings:
         database_url=database_url,
         jwt_secret=jwt_secret,
         jwt_expires_minutes=jwt_expires_minutes,
+        max_concurrent_runs=max_concurrent_runs,
     )
 
 
@@ -4,6 +4,8 @@ from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
 
+from seiautomation import aio
+
 from .database import Base, engine, get_db
 from .routers import auth as auth_router
 from .routers import tasks as tasks_router
@@ -24,6 +26,11 @@ app.include_router(auth_router.router)
 app.include_router(tasks_router.router)
 
 
+@app.on_event("shutdown")
+async def close_browser_pool() -> None:
+    await aio.close_pool()
+
+
 @app.get("/")
 def read_root():
     return {"status": "ok"}
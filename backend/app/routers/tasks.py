@@ -6,8 +6,8 @@ from sqlalchemy.orm import Session
 from ..auth import get_current_active_user, get_current_admin
 from ..database import get_db
 from ..models import TaskRun, User
-from ..schemas import TaskDefinition, TaskRunCreate, TaskRunRead
-from ..task_executor import enqueue_task
+from ..schemas import TaskDefinition, TaskRunCreate, TaskRunProgress, TaskRunRead
+from ..task_executor import andamento_da_execucao, enqueue_task
 from ..tasks_runner import list_tasks
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
@@ -51,3 +51,17 @@ def get_run(
     if not current_user.is_admin and run.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Acesso negado.")
     return TaskRunRead.model_validate(run)
+
+
+@router.get("/runs/{run_id}/progress", response_model=TaskRunProgress)
+def get_run_progress(
+    run_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> TaskRunProgress:
+    run = db.query(TaskRun).filter(TaskRun.id == run_id).first()
+    if not run:
+        raise HTTPException(status_code=404, detail="Execução não encontrada.")
+    if not current_user.is_admin and run.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Acesso negado.")
+    return TaskRunProgress(id=run.id, status=run.status, andamento=andamento_da_execucao(run.id))
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Any, Optional
+from typing import Any, Literal, Optional
 
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, model_validator
+
+from seiautomation.annotation_plan import regra_das_opcoes
 
 
 class Token(BaseModel):
@@ -57,6 +59,52 @@ class TaskRunCreate(BaseModel):
     limit: Optional[int] = None
     bloco_id: Optional[int] = None
     dev_mode: Optional[bool] = None
+    concurrency: Optional[int] = Field(default=1, ge=1)
+    engine: Literal["sync", "async"] = "sync"
+    listing: Literal["browser", "http"] = "browser"
+    dry_run: bool = False
+    export_format: Literal["csv", "jsonl", "parquet"] = "csv"
+    compression: Optional[Literal["gzip", "zstd"]] = None
+    incremental: bool = False
+    # retoma a execução interrompida anterior da mesma tarefa no mesmo bloco
+    resume: bool = False
+    # download_zip/annotate_ok: processos do sistema entre os quais o bloco é dividido
+    shards: int = Field(default=1, ge=1)
+    # None: usa SEI_ROUTING_PROFILE
+    routing_profile: Optional[Literal["minimal", "no-media", "full"]] = None
+    # tarefa "pipeline": quais etapas executar na mesma sessão
+    stages: list[Literal["download_zip", "annotate_ok", "export_relation"]] = Field(
+        default_factory=lambda: ["download_zip", "annotate_ok", "export_relation"]
+    )
+    # anotações (annotate_ok/pipeline): no máximo uma regra; sem nenhuma, o texto "OK"
+    annotation_text: Optional[str] = None
+    # modelo de `ModeloAnotacao`, ex.: "OK {seq}"
+    annotation_template: Optional[str] = None
+    # `TabelaAnotacoes`: processo → texto; processos fora dela não são alterados
+    annotation_table: Optional[dict[str, str]] = None
+
+    @model_validator(mode="after")
+    def _validar_regra_anotacao(self) -> "TaskRunCreate":
+        regra_das_opcoes(self.annotation_text, modelo=self.annotation_template, tabela=self.annotation_table)
+        return self
+
+    @model_validator(mode="after")
+    def _validar_pipeline(self) -> "TaskRunCreate":
+        if self.task_slug != "pipeline":
+            return self
+        recusadas = [
+            nome
+            for nome, usada in (
+                ("limit", self.limit is not None),
+                ("incremental", self.incremental),
+                ("listing", self.listing != "browser"),
+                ("shards", self.shards > 1),
+            )
+            if usada
+        ]
+        if recusadas:
+            raise ValueError(f"A tarefa pipeline não aceita: {', '.join(recusadas)}.")
+        return self
 
 
 class TaskRunRead(BaseModel):
@@ -70,3 +118,11 @@ class TaskRunRead(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class TaskRunProgress(BaseModel):
+    """Andamento de uma execução (ver `seiautomation.progress.Andamento.para_dict`); None fora de execução."""
+
+    id: str
+    status: str
+    andamento: Optional[dict[str, Any]] = None
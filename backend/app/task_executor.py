@@ -1,22 +1,111 @@
 from __future__ import annotations
 
+import asyncio
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from threading import Thread
 
-from sqlalchemy.orm import Session
+from anyio import from_thread
 
 from seiautomation.config import Settings as AutomationSettings
+from seiautomation.progress import Andamento, EmissorProgresso, Evento, Mensagem, usar_emissor
 
+from .config import settings
 from .database import SessionLocal
 from .models import TaskRun, User
 from .schemas import TaskRunCreate
-from .tasks_runner import execute_task, TASKS
-
-
-def _append_log(db: Session, run: TaskRun, message: str) -> None:
-    run.log = (run.log or "") + message + "\n"
-    db.add(run)
-    db.commit()
+from .tasks_runner import execute_task, execute_task_async, TASKS
+
+
+# Threads persistentes: cada uma mantém o seu pool de navegadores (seiautomation.browser.get_pool),
+# de modo que execuções consecutivas reaproveitam o Chromium já aberto.
+_executor = ThreadPoolExecutor(max_workers=settings.max_concurrent_runs, thread_name_prefix="task-run")
+# Execuções com engine="async" rodam no event loop da API; guardamos as referências até terminarem.
+_async_runs: set[asyncio.Task] = set()
+_async_slots = asyncio.Semaphore(settings.max_concurrent_runs)
+# andamento das execuções em curso (ver `andamento_da_execucao`)
+_andamentos: dict[str, Andamento] = {}
+_andamentos_lock = threading.Lock()
+
+
+def andamento_da_execucao(run_id: str) -> dict | None:
+    """Etapas, contagens, taxa e ETA de uma execução em curso; None se ela não estiver rodando."""
+    with _andamentos_lock:
+        andamento = _andamentos.get(run_id)
+        return andamento.para_dict() if andamento is not None else None
+
+
+class _GravadorDeLog:
+    """
+    Anexa ao log da execução, numa thread própria, os textos entregues pelo
+    emissor: quem emite (inclusive o event loop da API, nas execuções
+    assíncronas) nunca espera o commit no banco. Os textos que chegam durante
+    um commit vão juntos no seguinte.
+    """
+
+    def __init__(self, run_id: str) -> None:
+        self._run_id = run_id
+        self._fila: queue.SimpleQueue[str | None] = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._gravar, name=f"task-log-{run_id[:8]}", daemon=True)
+        self._thread.start()
+
+    def anexar(self, texto: str) -> None:
+        self._fila.put(texto)
+
+    def encerrar(self) -> None:
+        """Espera os textos pendentes chegarem ao banco (bloqueia: fora do event loop)."""
+        self._fila.put(None)
+        self._thread.join()
+
+    def _gravar(self) -> None:
+        fim = False
+        while not fim:
+            textos = [self._fila.get()]
+            while True:
+                try:
+                    textos.append(self._fila.get_nowait())
+                except queue.Empty:
+                    break
+            fim = None in textos
+            texto = "".join(texto for texto in textos if texto is not None)
+            if not texto:
+                continue
+            db = SessionLocal()
+            try:
+                run = db.get(TaskRun, self._run_id)
+                if run is not None:
+                    run.log = (run.log or "") + texto
+                    db.commit()
+            except Exception:  # noqa: BLE001
+                # um commit que falhou não pode parar a gravação dos lotes seguintes
+                db.rollback()
+            finally:
+                db.close()
+
+
+def _emissor_da_execucao(run_id: str, gravador: _GravadorDeLog) -> EmissorProgresso:
+    """
+    Emissor de progresso da execução: os eventos atualizam o andamento
+    consultado pela API e as mensagens de cada lote seguem para `gravador`.
+    """
+    andamento = Andamento()
+    with _andamentos_lock:
+        _andamentos[run_id] = andamento
+
+    def gravar(lote: list[Evento]) -> None:
+        with _andamentos_lock:
+            andamento.aplicar(lote)
+        texto = "".join(f"{evento.texto}\n" for evento in lote if isinstance(evento, Mensagem))
+        if texto:
+            gravador.anexar(texto)
+
+    return EmissorProgresso(gravar)
+
+
+def _encerrar_andamento(run_id: str) -> None:
+    with _andamentos_lock:
+        _andamentos.pop(run_id, None)
 
 
 def _task_worker(run_id: str, user_id: int, request: TaskRunCreate) -> None:
@@ -31,22 +120,85 @@ def _task_worker(run_id: str, user_id: int, request: TaskRunCreate) -> None:
         run.created_at = datetime.utcnow()
         db.commit()
 
-        def progress(message: str) -> None:
-            _append_log(db, run, message)
-
+        gravador = _GravadorDeLog(run_id)
         try:
-            execute_task(request, user, progress)
-            run.status = "success"
-        except Exception as exc:  # noqa: BLE001
-            _append_log(db, run, f"Erro: {exc}")
-            run.status = "failed"
+            with _emissor_da_execucao(run_id, gravador) as emissor, usar_emissor(emissor):
+                try:
+                    execute_task(request, user, emissor.texto)
+                    run.status = "success"
+                except Exception as exc:  # noqa: BLE001
+                    emissor.texto(f"Erro: {exc}")
+                    run.status = "failed"
         finally:
+            _encerrar_andamento(run_id)
+            gravador.encerrar()
+            run.finished_at = datetime.utcnow()
+            db.commit()
+    finally:
+        db.close()
+
+
+def _iniciar_execucao(run_id: str, user_id: int) -> User | None:
+    """Marca a execução como em andamento; None se ela ou o usuário não existirem mais."""
+    db = SessionLocal()
+    try:
+        run = db.get(TaskRun, run_id)
+        user = db.get(User, user_id)
+        if not run or not user:
+            return None
+        run.status = "running"
+        run.created_at = datetime.utcnow()
+        db.commit()
+        # o usuário segue para a tarefa depois que a sessão fecha
+        db.refresh(user)
+        db.expunge(user)
+        return user
+    finally:
+        db.close()
+
+
+def _finalizar_execucao(run_id: str, status: str, gravador: _GravadorDeLog) -> None:
+    # o status final só vai para o banco depois do log completo
+    gravador.encerrar()
+    db = SessionLocal()
+    try:
+        run = db.get(TaskRun, run_id)
+        if run is not None:
+            run.status = status
             run.finished_at = datetime.utcnow()
             db.commit()
     finally:
         db.close()
 
 
+async def _task_worker_async(run_id: str, user_id: int, request: TaskRunCreate) -> None:
+    # o acesso ao banco é síncrono: roda numa thread para não travar o event loop da API
+    async with _async_slots:
+        user = await asyncio.to_thread(_iniciar_execucao, run_id, user_id)
+        if user is None:
+            return
+        gravador = _GravadorDeLog(run_id)
+        status = "running"
+        try:
+            with _emissor_da_execucao(run_id, gravador) as emissor, usar_emissor(emissor):
+                try:
+                    await execute_task_async(request, user, emissor.texto)
+                    status = "success"
+                except Exception as exc:  # noqa: BLE001
+                    emissor.texto(f"Erro: {exc}")
+                    status = "failed"
+        finally:
+            _encerrar_andamento(run_id)
+            await asyncio.to_thread(_finalizar_execucao, run_id, status, gravador)
+
+
+def _agendar_async(run_id: str, user_id: int, request: TaskRunCreate) -> None:
+    """Cria a task da execução; chamada no event loop da API."""
+    task = asyncio.get_running_loop().create_task(_task_worker_async(run_id, user_id, request))
+    _async_runs.add(task)
+    task.add_done_callback(_async_runs.discard)
+
+
 def enqueue_task(request: TaskRunCreate, user: User) -> TaskRun:
     if request.task_slug not in TASKS:
         raise ValueError("Tarefa não encontrada.")
@@ -63,8 +215,12 @@ def enqueue_task(request: TaskRunCreate, user: User) -> TaskRun:
         db.commit()
         db.refresh(run)
 
-        thread = Thread(target=_task_worker, args=(run.id, user.id, request), daemon=True)
-        thread.start()
+        # os shards já são processos próprios: a execução em si segue pelo executor síncrono
+        if request.engine == "async" and request.shards == 1:
+            # enqueue_task roda no threadpool do FastAPI: a task vai para o event loop da API
+            from_thread.run_sync(_agendar_async, run.id, user.id, request)
+        else:
+            _executor.submit(_task_worker, run.id, user.id, request)
         return run
     finally:
         db.close()
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, replace
-from typing import Callable, Dict, Iterable
+from typing import Awaitable, Callable, Dict, Iterable
 
+from seiautomation import aio
+from seiautomation.annotation_plan import RegraAnotacao, TextoConstante, regra_das_opcoes
 from seiautomation.config import Settings as AutomationSettings
-from seiautomation.tasks import download_zip_lote, preencher_anotacoes_ok, exportar_relacao_csv
+from seiautomation.tasks import atualizar_anotacoes, download_zip_lote, executar_pipeline, exportar_relacao_csv
+from seiautomation.tasks.annotate_ok import TEXTO_ANOTACAO
 
 from .models import User
 from .schemas import TaskDefinition, TaskRunCreate
@@ -16,6 +19,7 @@ class RegisteredTask:
     name: str
     description: str
     handler: Callable[[AutomationSettings, TaskRunCreate, User, Callable[[str], None]], None]
+    async_handler: Callable[[AutomationSettings, TaskRunCreate, User, Callable[[str], None]], Awaitable[None]]
 
 
 def _download_handler(
@@ -32,21 +36,38 @@ def _download_handler(
         limite=request.limit,
         auto_credentials=request.auto_credentials,
         bloco_id=request.bloco_id,
+        concurrency=request.concurrency,
+        incremental=request.incremental,
+        resume=request.resume,
+        shards=request.shards,
     )
 
 
+def _regra_anotacao(request: TaskRunCreate) -> RegraAnotacao:
+    """Regra pedida em `annotation_text`/`annotation_template`/`annotation_table`; sem nenhuma, "OK"."""
+    regra = regra_das_opcoes(
+        request.annotation_text, modelo=request.annotation_template, tabela=request.annotation_table
+    )
+    return regra if regra is not None else TextoConstante(TEXTO_ANOTACAO)
+
+
 def _annotate_handler(
     settings: AutomationSettings,
     request: TaskRunCreate,
     user: User,
     progress: Callable[[str], None],
 ) -> None:
-    preencher_anotacoes_ok(
+    atualizar_anotacoes(
         settings,
+        _regra_anotacao(request),
         headless=request.headless,
         progress=progress,
         auto_credentials=request.auto_credentials,
         bloco_id=request.bloco_id,
+        dry_run=request.dry_run,
+        incremental=request.incremental,
+        resume=request.resume,
+        shards=request.shards,
     )
 
 
@@ -62,27 +83,136 @@ def _export_handler(
         progress=progress,
         bloco_id=request.bloco_id,
         auto_credentials=request.auto_credentials,
+        listagem=request.listing,
+        formato=request.export_format,
+        compressao=request.compression,
+        incremental=request.incremental,
+        resume=request.resume,
+    )
+
+
+def _pipeline_kwargs(request: TaskRunCreate, progress: Callable[[str], None]) -> dict:
+    return {
+        "baixar": "download_zip" in request.stages,
+        "regra": _regra_anotacao(request) if "annotate_ok" in request.stages else None,
+        "exportar": "export_relation" in request.stages,
+        "headless": request.headless,
+        "progress": progress,
+        "auto_credentials": request.auto_credentials,
+        "bloco_id": request.bloco_id,
+        "concurrency": request.concurrency or 1,
+        "dry_run": request.dry_run,
+        "formato": request.export_format,
+        "compressao": request.compression,
+        "resume": request.resume,
+    }
+
+
+def _pipeline_handler(
+    settings: AutomationSettings,
+    request: TaskRunCreate,
+    user: User,
+    progress: Callable[[str], None],
+) -> None:
+    executar_pipeline(settings, **_pipeline_kwargs(request, progress))
+
+
+async def _download_handler_async(
+    settings: AutomationSettings,
+    request: TaskRunCreate,
+    user: User,
+    progress: Callable[[str], None],
+) -> None:
+    await aio.download_zip_lote(
+        settings,
+        headless=request.headless,
+        progress=progress,
+        skip_existentes=True,
+        limite=request.limit,
+        auto_credentials=request.auto_credentials,
+        bloco_id=request.bloco_id,
+        concurrency=request.concurrency,
+        incremental=request.incremental,
+        resume=request.resume,
+    )
+
+
+async def _annotate_handler_async(
+    settings: AutomationSettings,
+    request: TaskRunCreate,
+    user: User,
+    progress: Callable[[str], None],
+) -> None:
+    await aio.atualizar_anotacoes(
+        settings,
+        _regra_anotacao(request),
+        headless=request.headless,
+        progress=progress,
+        auto_credentials=request.auto_credentials,
+        bloco_id=request.bloco_id,
+        dry_run=request.dry_run,
+        incremental=request.incremental,
+        resume=request.resume,
+    )
+
+
+async def _export_handler_async(
+    settings: AutomationSettings,
+    request: TaskRunCreate,
+    user: User,
+    progress: Callable[[str], None],
+) -> None:
+    await aio.exportar_relacao_csv(
+        settings,
+        headless=request.headless,
+        progress=progress,
+        bloco_id=request.bloco_id,
+        auto_credentials=request.auto_credentials,
+        listagem=request.listing,
+        formato=request.export_format,
+        compressao=request.compression,
+        incremental=request.incremental,
+        resume=request.resume,
     )
 
 
+async def _pipeline_handler_async(
+    settings: AutomationSettings,
+    request: TaskRunCreate,
+    user: User,
+    progress: Callable[[str], None],
+) -> None:
+    await aio.executar_pipeline(settings, **_pipeline_kwargs(request, progress))
+
+
 TASKS: Dict[str, RegisteredTask] = {
     "download_zip": RegisteredTask(
         slug="download_zip",
         name="Download de ZIPs",
         description="Baixa todos os processos do bloco configurado em formato ZIP.",
         handler=_download_handler,
+        async_handler=_download_handler_async,
     ),
     "annotate_ok": RegisteredTask(
         slug="annotate_ok",
         name="Atualizar anotações",
-        description='Preenche o campo "Anotações" com o texto OK para os processos do bloco.',
+        description='Preenche o campo "Anotações" dos processos do bloco (texto OK, um modelo ou uma tabela).',
         handler=_annotate_handler,
+        async_handler=_annotate_handler_async,
     ),
     "export_relation": RegisteredTask(
         slug="export_relation",
         name="Exportar relação",
         description="Exporta a lista de processos do bloco para CSV.",
         handler=_export_handler,
+        async_handler=_export_handler_async,
+    ),
+    "pipeline": RegisteredTask(
+        slug="pipeline",
+        name="Pipeline do bloco",
+        description="Executa as etapas escolhidas (download, anotações, exportação) com um login e uma leitura do bloco.",
+        handler=_pipeline_handler,
+        async_handler=_pipeline_handler_async,
     ),
 }
 
@@ -92,11 +222,11 @@ def list_tasks() -> Iterable[TaskDefinition]:
         yield TaskDefinition(name=task.name, slug=task.slug, description=task.description)
 
 
-def execute_task(
+def _prepare_task(
     task_request: TaskRunCreate,
     user: User,
     progress: Callable[[str], None],
-) -> None:
+) -> tuple[RegisteredTask, AutomationSettings, TaskRunCreate]:
     task = TASKS.get(task_request.task_slug)
     if not task:
         raise ValueError("Tarefa desconhecida.")
@@ -110,6 +240,8 @@ def execute_task(
         automation_settings = automation_settings.with_dev_mode(task_request.dev_mode)
     if task_request.bloco_id:
         automation_settings = replace(automation_settings, bloco_id=task_request.bloco_id)
+    if task_request.routing_profile:
+        automation_settings = replace(automation_settings, routing_profile=task_request.routing_profile)
 
     request_payload = task_request.model_copy(
         update={
@@ -117,10 +249,32 @@ def execute_task(
             "dev_mode": automation_settings.dev_mode,
         }
     )
+    return task, automation_settings, request_payload
 
+
+def execute_task(
+    task_request: TaskRunCreate,
+    user: User,
+    progress: Callable[[str], None],
+) -> None:
+    task, automation_settings, request_payload = _prepare_task(task_request, user, progress)
     task.handler(
         automation_settings,
         request_payload,
         user,
         progress,
     )
+
+
+async def execute_task_async(
+    task_request: TaskRunCreate,
+    user: User,
+    progress: Callable[[str], None],
+) -> None:
+    task, automation_settings, request_payload = _prepare_task(task_request, user, progress)
+    await task.async_handler(
+        automation_settings,
+        request_payload,
+        user,
+        progress,
+    )
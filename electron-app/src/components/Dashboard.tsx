@@ -8,9 +8,13 @@ interface DashboardProps {
 }
 
 const TASK_ORDER = ['download_zip', 'annotate_ok', 'export_relation'];
+// várias tarefas selecionadas rodam como etapas de uma só execução (um login, uma leitura do bloco)
+const PIPELINE_SLUG = 'pipeline';
 
 const sortTasks = (tasks: TaskDefinition[]): TaskDefinition[] =>
-  [...tasks].sort((a, b) => TASK_ORDER.indexOf(a.slug) - TASK_ORDER.indexOf(b.slug));
+  tasks
+    .filter((task) => task.slug !== PIPELINE_SLUG)
+    .sort((a, b) => TASK_ORDER.indexOf(a.slug) - TASK_ORDER.indexOf(b.slug));
 
 export const Dashboard: React.FC<DashboardProps> = ({ user }) => {
   const { logout } = useAuth();
@@ -79,12 +83,22 @@ export const Dashboard: React.FC<DashboardProps> = ({ user }) => {
       };
 
       const responses: TaskRun[] = [];
-      for (const slug of selectedSlugs) {
+      const stages = selectedSlugs.filter((slug) => TASK_ORDER.includes(slug));
+      if (stages.length > 1) {
         const { data } = await api.post<TaskRun>('/tasks/run', {
           ...payloadBase,
-          task_slug: slug,
+          task_slug: PIPELINE_SLUG,
+          stages,
         });
         responses.push(data);
+      } else {
+        for (const slug of selectedSlugs) {
+          const { data } = await api.post<TaskRun>('/tasks/run', {
+            ...payloadBase,
+            task_slug: slug,
+          });
+          responses.push(data);
+        }
       }
       setSuccessMessage(`${responses.length} tarefa(s) disparadas.`);
       await loadRuns();
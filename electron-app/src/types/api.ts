@@ -25,6 +25,7 @@ export interface TaskRunRequest {
   bloco_id?: number | null;
   limit?: number | null;
   dev_mode?: boolean | null;
+  stages?: string[];
 }
 
 export interface TaskRun {
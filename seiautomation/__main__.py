@@ -0,0 +1,5 @@
+from .cli import main
+
+# os shards (processos iniciados com "spawn") reimportam este módulo
+if __name__ == "__main__":
+    raise SystemExit(main())
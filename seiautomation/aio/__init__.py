@@ -0,0 +1,31 @@
+"""Motor assíncrono (playwright.async_api) das tarefas do SEIAutomation."""
+
+from .browser import AsyncBrowserPool, AsyncBrowserSession, close_pool, get_pool, launch_session
+from .navigation import extrair_linhas, garantir_login, iterar_paginas, iterar_registros, login_and_open_bloco
+from .tasks import (
+    atualizar_anotacoes,
+    download_zip_lote,
+    executar_pipeline,
+    exportar_relacao_csv,
+    planejar_anotacoes,
+    preencher_anotacoes_ok,
+)
+
+__all__ = [
+    "AsyncBrowserPool",
+    "AsyncBrowserSession",
+    "close_pool",
+    "get_pool",
+    "launch_session",
+    "extrair_linhas",
+    "garantir_login",
+    "iterar_paginas",
+    "iterar_registros",
+    "login_and_open_bloco",
+    "atualizar_anotacoes",
+    "download_zip_lote",
+    "executar_pipeline",
+    "exportar_relacao_csv",
+    "planejar_anotacoes",
+    "preencher_anotacoes_ok",
+]
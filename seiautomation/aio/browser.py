@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import asyncio
+import time
+import weakref
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator
+
+from playwright.async_api import Browser, BrowserContext, Page, Playwright, async_playwright
+
+from ..browser import CHROMIUM_ARGS, INTERVALO_MEMORIA, memoria_chromium_mb
+
+
+@dataclass(slots=True)
+class AsyncBrowserSession:
+    browser: Browser
+    context: BrowserContext
+    page: Page
+
+
+@dataclass(slots=True)
+class _PooledContext:
+    headless: bool
+    context: BrowserContext
+    released_at: float = field(default_factory=time.monotonic)
+
+
+class AsyncBrowserPool:
+    """
+    Equivalente assíncrono de `seiautomation.browser.BrowserPool`, um por event loop.
+
+    Args:
+        max_size: quantidade máxima de contextos (em uso + ociosos).
+        idle_timeout: segundos que um contexto ocioso permanece disponível.
+    """
+
+    def __init__(self, *, max_size: int = 8, idle_timeout: float = 300.0) -> None:
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self._playwright: Playwright | None = None
+        self._browsers: dict[bool, Browser] = {}
+        self._idle: list[_PooledContext] = []
+        self._in_use: dict[int, _PooledContext] = {}
+        self._lock = asyncio.Lock()
+
+    @property
+    def size(self) -> int:
+        return len(self._idle) + len(self._in_use)
+
+    async def _browser(self, headless: bool) -> Browser:
+        browser = self._browsers.get(headless)
+        if browser is not None and browser.is_connected():
+            return browser
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        try:
+            browser = await self._playwright.chromium.launch(headless=headless, args=CHROMIUM_ARGS)
+        except Exception:
+            if not self._browsers:
+                await self._playwright.stop()
+                self._playwright = None
+            raise
+        self._browsers[headless] = browser
+        return browser
+
+    @staticmethod
+    def _healthy(pooled: _PooledContext) -> bool:
+        browser = pooled.context.browser
+        return browser is not None and browser.is_connected()
+
+    @staticmethod
+    async def _discard(pooled: _PooledContext) -> None:
+        try:
+            await pooled.context.close()
+        except Exception:  # noqa: BLE001
+            pass
+
+    async def evict_idle(self) -> None:
+        now = time.monotonic()
+        keep: list[_PooledContext] = []
+        for pooled in self._idle:
+            if now - pooled.released_at > self.idle_timeout or not self._healthy(pooled):
+                await self._discard(pooled)
+            else:
+                keep.append(pooled)
+        self._idle = keep
+
+        in_use = {pooled.headless for pooled in self._in_use.values()} | {pooled.headless for pooled in keep}
+        for headless in list(self._browsers):
+            if headless not in in_use:
+                browser = self._browsers.pop(headless)
+                try:
+                    await browser.close()
+                except Exception:  # noqa: BLE001
+                    pass
+        if not self._browsers and self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def acquire(self, headless: bool = True) -> AsyncBrowserSession:
+        async with self._lock:
+            await self.evict_idle()
+            while True:
+                pooled = next((item for item in reversed(self._idle) if item.headless == headless), None)
+                if pooled is None:
+                    break
+                self._idle.remove(pooled)
+                try:
+                    page = await pooled.context.new_page()
+                except Exception:  # noqa: BLE001
+                    await self._discard(pooled)
+                    continue
+                self._in_use[id(pooled.context)] = pooled
+                return AsyncBrowserSession(browser=pooled.context.browser, context=pooled.context, page=page)
+
+            if self.size >= self.max_size:
+                if not self._idle:
+                    raise RuntimeError(f"Limite de {self.max_size} contextos do navegador atingido.")
+                await self._discard(self._idle.pop(0))
+
+            browser = await self._browser(headless)
+            context = await browser.new_context(accept_downloads=True)
+            self._in_use[id(context)] = _PooledContext(headless=headless, context=context)
+            return AsyncBrowserSession(browser=browser, context=context, page=await context.new_page())
+
+    async def release(self, session: AsyncBrowserSession, *, discard: bool = False) -> None:
+        """Devolve o contexto ao pool; com `discard=True` ele é fechado em vez de reaproveitado."""
+        async with self._lock:
+            pooled = self._in_use.pop(id(session.context), None)
+            if pooled is None:
+                return
+            if discard:
+                await self._discard(pooled)
+                return
+            try:
+                for page in list(session.context.pages):
+                    await page.close()
+                await session.context.clear_cookies()
+            except Exception:  # noqa: BLE001
+                await self._discard(pooled)
+                return
+            if not self._healthy(pooled):
+                await self._discard(pooled)
+                return
+            pooled.released_at = time.monotonic()
+            self._idle.append(pooled)
+            await self.evict_idle()
+
+    async def close(self) -> None:
+        async with self._lock:
+            for pooled in [*self._idle, *self._in_use.values()]:
+                await self._discard(pooled)
+            self._idle.clear()
+            self._in_use.clear()
+            for browser in self._browsers.values():
+                try:
+                    await browser.close()
+                except Exception:  # noqa: BLE001
+                    pass
+            self._browsers.clear()
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+
+
+_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncBrowserPool]" = weakref.WeakKeyDictionary()
+
+
+def get_pool() -> AsyncBrowserPool:
+    """Retorna o pool de navegadores do event loop atual."""
+    loop = asyncio.get_running_loop()
+    pool = _pools.get(loop)
+    if pool is None:
+        pool = AsyncBrowserPool()
+        _pools[loop] = pool
+    return pool
+
+
+async def close_pool() -> None:
+    pool = _pools.pop(asyncio.get_running_loop(), None)
+    if pool is not None:
+        await pool.close()
+
+
+@asynccontextmanager
+async def launch_session(
+    headless: bool = True, *, pool: AsyncBrowserPool | None = None
+) -> AsyncIterator[AsyncBrowserSession]:
+    pool = pool or get_pool()
+    session = await pool.acquire(headless=headless)
+    try:
+        yield session
+    finally:
+        await pool.release(session)
+
+
+class ContextoReciclavel:
+    """
+    Equivalente assíncrono de `seiautomation.browser.ContextoReciclavel`: a
+    sessão do pool é trocada por um contexto novo depois de `limite` processos
+    ou quando a memória do Chromium passa de `memoria_mb`.
+
+    Uso: `await registrar_processo()` após cada processo; quando devolver True,
+    esperar os downloads em andamento no contexto atual, chamar `renovar` e
+    refazer o login/abertura do bloco na nova `page`.
+    """
+
+    def __init__(
+        self, *, headless: bool = True, limite: int = 0, memoria_mb: int = 0, pool: AsyncBrowserPool | None = None
+    ) -> None:
+        self.headless = headless
+        self.limite = limite
+        self.memoria_mb = memoria_mb
+        self.renovacoes = 0
+        self._pool = pool
+        self._processos = 0
+        self.session: AsyncBrowserSession | None = None
+
+    @property
+    def page(self) -> Page:
+        return self.session.page
+
+    @property
+    def context(self) -> BrowserContext:
+        return self.session.context
+
+    async def registrar_processo(self) -> bool:
+        """Conta um processo; True quando é hora de renovar o contexto."""
+        self._processos += 1
+        if self.limite and self._processos >= self.limite:
+            return True
+        if self.memoria_mb and self._processos % INTERVALO_MEMORIA == 0:
+            memoria = await asyncio.to_thread(memoria_chromium_mb)
+            return memoria is not None and memoria >= self.memoria_mb
+        return False
+
+    async def renovar(self) -> AsyncBrowserSession:
+        """Fecha o contexto atual (com as abas) e abre outro; o login precisa ser refeito."""
+        await self._pool.release(self.session, discard=True)
+        self._processos = 0
+        self.renovacoes += 1
+        self.session = await self._pool.acquire(headless=self.headless)
+        return self.session
+
+    async def __aenter__(self) -> "ContextoReciclavel":
+        self._pool = self._pool or get_pool()
+        self.session = await self._pool.acquire(headless=self.headless)
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        if self.session is not None:
+            await self._pool.release(self.session)
+            self.session = None
@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import AsyncIterator, Callable
+
+from playwright.async_api import Locator, Page, TimeoutError as PlaywrightTimeoutError
+
+from .. import bloco_index
+from ..config import Settings
+from ..navigation import (
+    ASSINATURA_TABELA_JS,
+    DEFAULT_WAIT_TIMEOUT_MS,
+    EXTRAIR_LINHAS_JS,
+    IR_PARA_PAGINA_JS,
+    PAGINA_INFRA_JS,
+    PROXIMA_PAGINA_SELECTOR,
+    TABELA_MUDOU_JS,
+    TOTAL_REGISTROS_JS,
+    LinhaProcesso,
+    base_host,
+    linhas_de_dados,
+    login_url,
+)
+from ..progress import PaginaLida, emitir
+from ..routing import instalar_roteamento_async
+from ..session_cache import carregar_sessao, descartar_sessao, gravar_sessao
+from ..throttle import regular_async
+from ..timing import medir, registrar_desde
+
+
+
+def _log(message: str, progress: Callable[[str], None] | None) -> None:
+    if progress:
+        progress(message)
+    else:
+        print(message)
+
+async def _select_active_page(page: Page, host: str) -> tuple[Page, bool]:
+    pages = [p for p in page.context.pages if not p.is_closed()]
+    for candidate in pages[::-1]:
+        if host in (candidate.url or ""):
+            return candidate, candidate is not page
+    return page, False
+
+
+async def _restaurar_sessao(page: Page, settings: Settings, progress: Callable[[str], None] | None) -> bool:
+    data = carregar_sessao(settings)
+    if not data or not data.get("home_url"):
+        return False
+    cookies = data.get("storage_state", {}).get("cookies", [])
+    if cookies:
+        await page.context.add_cookies(cookies)
+    _log("Reutilizando sessão autenticada salva…", progress)
+    try:
+        await page.goto(data["home_url"], wait_until="domcontentloaded")
+    except PlaywrightTimeoutError:
+        pass
+    if "infra_unidade_atual" in (page.url or "") and await page.locator("#txtUsuario").count() == 0:
+        return True
+    _log("Sessão salva rejeitada pelo SEI; efetuando novo login…", progress)
+    descartar_sessao(settings)
+    await page.context.clear_cookies()
+    return False
+
+
+async def _efetuar_login(
+    page: Page,
+    settings: Settings,
+    *,
+    progress: Callable[[str], None] | None,
+    auto_credentials: bool,
+) -> Page:
+    host = base_host(settings)
+    _log("Acessando página de login…", progress)
+    await page.goto(login_url(settings), wait_until="domcontentloaded")
+    if auto_credentials:
+        _log("Efetuando login automático…", progress)
+        await page.fill("#txtUsuario", settings.username)
+        await page.fill("#pwdSenha", settings.password)
+        await page.locator("button:has-text('Acessar')").click()
+        try:
+            with medir("login"):
+                await page.wait_for_url("**infra_unidade_atual**", timeout=30000, wait_until="domcontentloaded")
+        except PlaywrightTimeoutError:
+            if "infra_unidade_atual" not in page.url:
+                raise
+            _log(
+                "Aviso: tempo limite atingido aguardando o carregamento completo pós-login, prosseguindo assim mesmo.",
+                progress,
+            )
+    else:
+        _log("Aguardando login manual do usuário…", progress)
+        deadline = time.time() + 120
+        while time.time() < deadline:
+            page, _ = await _select_active_page(page, host)
+            if "infra_unidade_atual" in (page.url or ""):
+                break
+            await asyncio.sleep(0.3)
+        else:
+            raise PlaywrightTimeoutError("Timeout aguardando conclusão do login manual.")
+
+    if page.is_closed():
+        page, _ = await _select_active_page(page, host)
+    return page
+
+
+async def garantir_login(
+    page: Page,
+    settings: Settings,
+    *,
+    progress: Callable[[str], None] | None = None,
+    auto_credentials: bool = True,
+    reuse_session: bool = True,
+) -> Page:
+    await instalar_roteamento_async(page.context, settings)
+    if reuse_session and await _restaurar_sessao(page, settings, progress):
+        return page
+    page = await _efetuar_login(page, settings, progress=progress, auto_credentials=auto_credentials)
+    if reuse_session:
+        gravar_sessao(settings, await page.context.storage_state(), page.url)
+    return page
+
+
+async def _abrir_bloco_direto(page: Page, url: str, bloco_id: int, timeout: int) -> bool:
+    try:
+        async with regular_async("navegacao"):
+            with medir("abrir_bloco_direto"):
+                response = await page.goto(url, wait_until="domcontentloaded", timeout=timeout)
+                if response is not None and not response.ok:
+                    return False
+                if f"id_bloco={bloco_id}" not in (page.url or "") or await page.locator("#txtUsuario").count():
+                    return False
+                await page.wait_for_selector("table tr:nth-child(2)", timeout=timeout)
+    except PlaywrightTimeoutError:
+        return False
+    return True
+
+
+async def login_and_open_bloco(
+    page: Page,
+    settings: Settings,
+    bloco_id: int,
+    *,
+    progress: Callable[[str], None] | None = None,
+    auto_credentials: bool = True,
+    reuse_session: bool = True,
+    use_bloco_index: bool = True,
+) -> None:
+    with medir("login_e_abertura_bloco"):
+        page = await garantir_login(
+            page,
+            settings,
+            progress=progress,
+            auto_credentials=auto_credentials,
+            reuse_session=reuse_session,
+        )
+        await page.bring_to_front()
+
+        timeout = settings.wait_timeout_ms
+        url_direta = bloco_index.url_do_bloco(settings, bloco_id) if use_bloco_index else None
+        if url_direta:
+            _log(f"Abrindo bloco {bloco_id} diretamente…", progress)
+            if await _abrir_bloco_direto(page, url_direta, bloco_id, timeout):
+                return
+            _log("Link salvo do bloco foi rejeitado; voltando ao menu Blocos › Internos.", progress)
+            bloco_index.invalidar(settings, bloco_id)
+
+        _log("Abrindo menu Blocos › Internos…", progress)
+        await page.locator("a:has-text('Blocos')").first.click()
+        internos = page.locator("a:has-text('Internos')").first
+        with medir("menu_internos"):
+            await internos.wait_for(state="visible", timeout=timeout)
+        await internos.click()
+        with medir("lista_blocos"):
+            await page.wait_for_url("**acao=bloco_interno_listar**", timeout=timeout)
+        if use_bloco_index:
+            bloco_index.registrar_links(settings, await page.evaluate(bloco_index.LINKS_BLOCOS_JS))
+
+        bloco_link = page.locator("tr", has_text=str(bloco_id)).locator("a", has_text=str(bloco_id)).first
+        if await bloco_link.count() == 0:
+            raise RuntimeError(f"Bloco {bloco_id} não encontrado na lista.")
+
+        _log(f"Abrindo bloco {bloco_id}…", progress)
+        async with regular_async("navegacao"):
+            await bloco_link.click()
+            with medir("abrir_bloco"):
+                await page.wait_for_url(f"**id_bloco={bloco_id}**", timeout=timeout)
+                await page.wait_for_selector("table tr:nth-child(2)", timeout=timeout)
+
+
+async def extrair_linhas(page: Page, pagina: int = 1) -> list[LinhaProcesso]:
+    return linhas_de_dados(await page.evaluate(EXTRAIR_LINHAS_JS), pagina)
+
+
+async def total_registros(page: Page) -> int | None:
+    return await page.evaluate(TOTAL_REGISTROS_JS)
+
+
+async def _avancar_pagina(page: Page, next_button: Locator, wait_timeout_ms: int, progress) -> None:
+    assinatura = await page.evaluate(ASSINATURA_TABELA_JS)
+    async with regular_async("navegacao"):
+        await next_button.click()
+        with medir("proxima_pagina"):
+            try:
+                await page.wait_for_function(TABELA_MUDOU_JS, arg=assinatura, timeout=wait_timeout_ms)
+            except PlaywrightTimeoutError:
+                _log(f"Aviso: a tabela não mudou em {wait_timeout_ms} ms após avançar a página.", progress)
+
+
+async def _botao_proxima(page: Page) -> Locator | None:
+    next_button = page.locator(PROXIMA_PAGINA_SELECTOR).filter(has_text="Próxima")
+    if await next_button.count() == 0:
+        return None
+    classes = await next_button.first.get_attribute("class") or ""
+    if "Des" in classes or "disabled" in classes.lower():
+        return None
+    return next_button.first
+
+
+async def _ir_para_pagina(page: Page, pagina: int, wait_timeout_ms: int, progress) -> int:
+    _log(f"Retomando a partir da página {pagina}…", progress)
+    base = await page.evaluate(PAGINA_INFRA_JS)
+    if base is not None:
+        async with regular_async("navegacao"):
+            with medir("saltar_pagina"):
+                async with page.expect_navigation(wait_until="domcontentloaded", timeout=wait_timeout_ms):
+                    await page.evaluate(IR_PARA_PAGINA_JS, base + pagina - 1)
+                await page.wait_for_selector("table tr:nth-child(2)", timeout=wait_timeout_ms)
+        atual = await page.evaluate(PAGINA_INFRA_JS)
+        return pagina if atual is None else atual - base + 1
+
+    atual = 1
+    while atual < pagina and (next_button := await _botao_proxima(page)) is not None:
+        await _avancar_pagina(page, next_button, wait_timeout_ms, progress)
+        atual += 1
+    return atual
+
+
+async def iterar_registros(
+    page: Page,
+    progress: Callable[[str], None] | None = None,
+    *,
+    wait_timeout_ms: int = DEFAULT_WAIT_TIMEOUT_MS,
+    pagina_inicial: int = 1,
+) -> AsyncIterator[LinhaProcesso]:
+    visited_numbers: set[str] = set()
+    page_index = 1
+    if pagina_inicial > 1:
+        page_index = await _ir_para_pagina(page, pagina_inicial, wait_timeout_ms, progress)
+    while True:
+        _log(f"Processando página {page_index}…", progress)
+        inicio_pagina = time.perf_counter()
+        with medir("leitura_pagina"):
+            registros = await extrair_linhas(page, page_index)
+        if not registros:
+            break
+        emitir(PaginaLida(page_index, len(registros)))
+
+        page_has_new = False
+        for registro in registros:
+            if not registro.numero or registro.numero in visited_numbers:
+                continue
+            visited_numbers.add(registro.numero)
+            page_has_new = True
+            yield registro
+        # a página inteira: leitura e o processamento dos registros dela pelo chamador
+        registrar_desde("pagina", inicio_pagina)
+
+        next_button = await _botao_proxima(page)
+        if next_button is None:
+            break
+        try:
+            await _avancar_pagina(page, next_button, wait_timeout_ms, progress)
+            page_index += 1
+        except Exception:
+            break
+
+        if not page_has_new:
+            break
+
+
+async def iterar_paginas(
+    page: Page,
+    progress: Callable[[str], None] | None = None,
+    *,
+    wait_timeout_ms: int = DEFAULT_WAIT_TIMEOUT_MS,
+) -> AsyncIterator[tuple[Locator, str]]:
+    async for registro in iterar_registros(page, progress=progress, wait_timeout_ms=wait_timeout_ms):
+        yield registro.row(page), registro.numero
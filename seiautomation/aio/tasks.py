@@ -0,0 +1,1137 @@
+from __future__ import annotations
+
+import asyncio
+from contextlib import ExitStack, nullcontext
+from datetime import datetime
+from pathlib import Path
+
+from playwright.async_api import BrowserContext, Page, Request, TimeoutError
+
+from ..annotation_plan import (
+    AlteracaoAnotacao,
+    PlanoAnotacoes,
+    RegraAnotacao,
+    TextoConstante,
+    anotacao_confere,
+    planejar,
+)
+from ..browser import close_pool as _fechar_pool_da_thread
+from ..checkpoint import Checkpoint, CheckpointStore
+from ..config import Settings
+from ..export_formats import (
+    COLUNAS,
+    COLUNAS_INCREMENTAIS,
+    EscritorRelacao,
+    linha_da_relacao,
+    nome_do_arquivo,
+    pode_anexar,
+    validar_formato,
+)
+from ..http_listing import HttpResponse, eh_pagina_de_login
+from ..manifest import DownloadManifest, sanitizar_numero
+from ..navigation import DEFAULT_WAIT_TIMEOUT_MS
+from ..progress import EtapaIniciada, ExecucaoConcluida, ExecucaoIniciada, RegistrosProcessados, emitir
+from ..request_template import AtalhoRequisicao, valores_do_processo
+from ..retry import AgendadorRetentativas, ArquivosBaixados, PoliticaRetentativa, TotalAtualizado
+from ..snapshots import REMOVIDO, LeituraIncremental, SnapshotStore
+from ..tasks.annotate_ok import TEXTO_ANOTACAO
+from ..tasks.common import (
+    MAX_FALHAS_ATALHO,
+    TENTATIVAS_ZIP,
+    ProgressFn,
+    RetomadaExportacao,
+    RetomadaPipeline,
+    arquivo_relacao,
+    concorrencia_padrao,
+    eh_zip,
+    escopo_snapshot,
+    nome_zip,
+    registrar_download,
+    registrar_falha_anotacao,
+    registrar_falha_download,
+    validar_etapas,
+    valores_anotacao,
+)
+from ..tasks.export_relation import exportar_relacao_csv as _exportar_relacao_sincrona
+from ..tasks.pipeline import ResultadoPipeline
+from ..throttle import Regulador, regular_async, usar_regulador
+from ..timing import medir, salvar_trace, usar_recorder
+from ..zip_storage import ZipCorrompidoError, ZipSalvo, salvar_arquivo, salvar_bytes
+from .browser import ContextoReciclavel, launch_session
+from .navigation import extrair_linhas, iterar_registros, login_and_open_bloco, total_registros
+
+
+def _log(message: str, progress: ProgressFn) -> None:
+    if progress:
+        progress(message)
+    else:
+        print(message)
+
+
+async def _baixar_zip_direto(
+    context: BrowserContext, atalho: AtalhoRequisicao, numero: str, href: str, download_dir: Path, progress: ProgressFn
+) -> ZipSalvo | None:
+    requisicao = atalho.requisicao(valores_do_processo(numero, href))
+    if requisicao is None:
+        return None
+    url, kwargs = requisicao
+    try:
+        with medir("zip_direto"):
+            response = await context.request.fetch(url, **kwargs)
+            corpo = await response.body()
+    except Exception as exc:  # noqa: BLE001
+        atalho.registrar_resultado(False)
+        _log(f"Atalho do ZIP falhou para {numero} ({exc}); usando a interface.", progress)
+        return None
+    if not response.ok or not eh_zip(corpo):
+        atalho.registrar_resultado(False)
+        _log(f"Atalho do ZIP não retornou um ZIP para {numero} (HTTP {response.status}); usando a interface.", progress)
+        return None
+    destino = download_dir / nome_zip(numero, response.headers.get("content-disposition"))
+    try:
+        with medir("zip_gravar"):
+            salvo = await asyncio.to_thread(salvar_bytes, corpo, destino)
+    except ZipCorrompidoError as exc:
+        atalho.registrar_resultado(False)
+        _log(f"Atalho do ZIP retornou um arquivo corrompido para {numero} ({exc}); usando a interface.", progress)
+        return None
+    atalho.registrar_resultado(True)
+    _log(f"ZIP salvo: {salvo.arquivo}", progress)
+    return salvo
+
+
+async def _baixar_zip_do_popup(
+    popup: Page,
+    numero: str,
+    download_dir: Path,
+    progress: ProgressFn,
+    *,
+    atalho: AtalhoRequisicao | None = None,
+    href: str = "",
+) -> ZipSalvo | None:
+    """Gera e salva o ZIP do processo aberto em `popup` (a aba continua aberta; ver `_AbasProcesso`)."""
+    requisicoes: list[Request] = []
+
+    def anotar(request: Request) -> None:
+        requisicoes.append(request)
+
+    if atalho is not None and not atalho.disponivel:
+        popup.on("request", anotar)
+    try:
+        with medir("zip_carregar_processo"):
+            await popup.wait_for_load_state("domcontentloaded")
+
+            frame = popup.frame(name="ifrConteudoVisualizacao")
+            if frame is None:
+                raise RuntimeError("iframe ifrConteudoVisualizacao não encontrado ao abrir processo.")
+
+        with medir("zip_gerar"):
+            await frame.locator("img[title='Gerar Arquivo ZIP do Processo']").click()
+            zip_frame = popup.frame(name="ifrVisualizacao")
+            if zip_frame is None:
+                raise RuntimeError("iframe ifrVisualizacao não encontrado ao gerar ZIP.")
+
+            await zip_frame.wait_for_load_state("domcontentloaded")
+            radio = zip_frame.locator("label:has-text('Todos os documentos disponíveis') input[type='radio']")
+            if await radio.count() and not await radio.first.is_checked():
+                await radio.first.check()
+
+        with medir("zip_aguardar_download"):
+            async with popup.expect_download() as download_info:
+                await zip_frame.locator("a:has-text('Gerar'), button:has-text('Gerar')").first.click()
+            download = await download_info.value
+            origem = Path(await download.path())
+        if atalho is not None and requisicoes:
+            atalho.aprender(
+                next((r for r in reversed(requisicoes) if r.url == download.url), None),
+                valores_do_processo(numero, href),
+            )
+        suggested = download.suggested_filename.replace(" ", "_")
+        filename = f"{sanitizar_numero(numero)}_{suggested}"
+    finally:
+        popup.remove_listener("request", anotar)
+    with medir("zip_gravar"):
+        salvo = await asyncio.to_thread(salvar_arquivo, origem, download_dir / filename)
+    _log(f"ZIP salvo: {filename}", progress)
+    return salvo
+
+
+class _AbasProcesso:
+    """
+    Abas reaproveitadas para abrir os processos: cada download pega uma aba
+    livre (ou abre outra, se todas estiverem em uso) e a devolve no fim, em vez
+    de abrir e fechar uma aba por processo. Há no máximo tantas abas quanto
+    downloads simultâneos.
+    """
+
+    def __init__(self, context: BrowserContext) -> None:
+        self.context = context
+        self._livres: list[Page] = []
+
+    async def obter(self) -> Page:
+        while self._livres:
+            aba = self._livres.pop()
+            if not aba.is_closed():
+                return aba
+        return await self.context.new_page()
+
+    def devolver(self, aba: Page) -> None:
+        if not aba.is_closed():
+            self._livres.append(aba)
+
+    async def fechar(self) -> None:
+        abas, self._livres = self._livres, []
+        for aba in abas:
+            if not aba.is_closed():
+                await aba.close()
+
+
+async def _baixar_zip_por_link(
+    abas: _AbasProcesso,
+    url: str,
+    numero: str,
+    download_dir: Path,
+    progress: ProgressFn,
+    *,
+    atalho: AtalhoRequisicao | None = None,
+) -> ZipSalvo | None:
+    if atalho is not None:
+        salvo = await _baixar_zip_direto(abas.context, atalho, numero, url, download_dir, progress)
+        if salvo:
+            return salvo
+    popup = await abas.obter()
+    try:
+        with medir("zip_abrir_processo"):
+            await popup.goto(url, wait_until="domcontentloaded")
+        return await _baixar_zip_do_popup(popup, numero, download_dir, progress, atalho=atalho, href=url)
+    finally:
+        abas.devolver(popup)
+
+
+async def _baixar_verificado(
+    abas: _AbasProcesso, url: str, numero: str, download_dir: Path, progress: ProgressFn, atalho: AtalhoRequisicao | None
+) -> ZipSalvo | None:
+    for tentativa in range(1, TENTATIVAS_ZIP + 1):
+        try:
+            return await _baixar_zip_por_link(abas, url, numero, download_dir, progress, atalho=atalho)
+        except ZipCorrompidoError as exc:
+            if tentativa == TENTATIVAS_ZIP:
+                raise
+            _log(f"ZIP corrompido para {numero} ({exc}); baixando novamente ({tentativa + 1}/{TENTATIVAS_ZIP})…", progress)
+    return None
+
+
+async def _baixar_e_registrar(
+    abas: _AbasProcesso,
+    numero: str,
+    url: str,
+    manifesto: DownloadManifest,
+    bloco_id: int,
+    agendador: AgendadorRetentativas,
+    atalho: AtalhoRequisicao | None,
+    arquivos: list[str],
+    progress: ProgressFn,
+) -> None:
+    try:
+        async with regular_async("download", concorrente=True):
+            salvo = await _baixar_verificado(abas, url, numero, manifesto.download_dir, progress, atalho)
+    except Exception as exc:  # noqa: BLE001
+        registrar_falha_download(agendador, numero, exc, url, progress)
+        return
+    agendador.registrar_sucesso(numero)
+    if salvo:
+        registrar_download(manifesto, numero, salvo, bloco_id)
+        arquivos.append(salvo.arquivo)
+
+
+async def _repetir_downloads(
+    abas: _AbasProcesso,
+    manifesto: DownloadManifest,
+    bloco_id: int,
+    agendador: AgendadorRetentativas,
+    atalho: AtalhoRequisicao | None,
+    arquivos: list[str],
+    progress: ProgressFn,
+) -> None:
+    """Repete os downloads que falharam, cada um após o próprio backoff."""
+
+    async def repetir(numero: str, url: str) -> None:
+        await asyncio.sleep(agendador.espera_restante([numero]))
+        await _baixar_e_registrar(abas, numero, url, manifesto, bloco_id, agendador, atalho, arquivos, progress)
+
+    while falhas := agendador.pendentes():
+        _log(f"Repetindo {len(falhas)} processos que falharam…", progress)
+        await asyncio.gather(*(repetir(numero, url) for numero, url in falhas))
+
+
+async def _renovar_contexto(
+    sessao: ContextoReciclavel,
+    abas: _AbasProcesso,
+    pendentes: list[asyncio.Task[None]],
+    settings: Settings,
+    bloco_id: int,
+    pagina: int,
+    progress: ProgressFn,
+    auto_credentials: bool,
+) -> tuple[Page, _AbasProcesso]:
+    """
+    Espera os downloads em andamento no contexto atual, troca-o por um novo e
+    reabre o bloco na nova aba principal; devolve a aba e as abas de processo novas.
+    """
+    await asyncio.gather(*pendentes)
+    await abas.fechar()
+    _log(f"Renovando o contexto do navegador para liberar memória (retomando na página {pagina})…", progress)
+    await sessao.renovar()
+    await login_and_open_bloco(
+        sessao.page, settings, bloco_id=bloco_id, progress=progress, auto_credentials=auto_credentials
+    )
+    return sessao.page, _AbasProcesso(sessao.context)
+
+
+async def download_zip_lote(
+    settings: Settings,
+    *,
+    headless: bool = True,
+    progress: ProgressFn = None,
+    skip_existentes: bool = True,
+    limite: int | None = None,
+    auto_credentials: bool = True,
+    bloco_id: int | None = None,
+    concurrency: int | None = 1,
+    zip_direto: bool = True,
+    retentativas: PoliticaRetentativa | None = None,
+    incremental: bool = False,
+    resume: bool = False,
+) -> ArquivosBaixados:
+    """
+    Versão assíncrona de `seiautomation.tasks.download_zip_lote`.
+
+    Os downloads rodam em abas do mesmo contexto autenticado, até `concurrency`
+    ao mesmo tempo, enquanto a paginação do bloco continua na aba principal; as
+    abas são reaproveitadas entre processos. Os que falham são repetidos ao
+    final, cada um após o próprio backoff. Como no motor síncrono, o contexto é
+    renovado conforme `settings.recycle_after`/`settings.recycle_memory_mb`
+    (ver `ContextoReciclavel`), depois que os downloads em andamento terminam.
+    """
+    target_bloco = bloco_id or settings.bloco_id
+    workers = concorrencia_padrao() if concurrency is None else max(1, concurrency)
+    download_dir = settings.download_dir
+    arquivos: list[str] = []
+    atalho = AtalhoRequisicao(MAX_FALHAS_ATALHO) if zip_direto else None
+    agendador = AgendadorRetentativas(retentativas)
+    regulador = Regulador(taxa=settings.max_requests_per_second, maximo=workers, progress=progress)
+
+    with DownloadManifest(download_dir) as manifesto, usar_recorder() as tempos, usar_regulador(regulador), (
+        SnapshotStore(settings) if incremental else nullcontext()
+    ) as snapshots, CheckpointStore(settings) as checkpoints:
+        async with ContextoReciclavel(
+            headless=headless, limite=settings.recycle_after, memoria_mb=settings.recycle_memory_mb
+        ) as sessao:
+            page = sessao.page
+            await login_and_open_bloco(
+                page,
+                settings,
+                bloco_id=target_bloco,
+                progress=progress,
+                auto_credentials=auto_credentials,
+            )
+            emitir(ExecucaoIniciada("download", target_bloco))
+            emitir(EtapaIniciada("download", await total_registros(page)))
+            checkpoint = Checkpoint(checkpoints, "download", target_bloco, retomar=resume and skip_existentes)
+            pagina_inicial = checkpoint.pagina_inicial(lambda numero: numero in manifesto) if checkpoint.retomado else 1
+            if pagina_inicial > 1:
+                _log(f"Retomando a execução interrompida a partir da página {pagina_inicial}.", progress)
+            # a comparação incremental precisa da relação inteira
+            leitura = (
+                LeituraIncremental(snapshots, "download", target_bloco)
+                if snapshots is not None and pagina_inicial == 1
+                else None
+            )
+            if (
+                leitura is not None
+                and skip_existentes
+                and leitura.primeira_pagina_inalterada(await extrair_linhas(page), await total_registros(page))
+                and all(numero in manifesto for numero in leitura.processos_anteriores)
+            ):
+                _log(f"Bloco {target_bloco} sem alterações desde a última leitura; nada a baixar.", progress)
+                checkpoint.encerrar()
+                emitir(ExecucaoConcluida({"arquivos": 0, "falhas": 0}))
+                return ArquivosBaixados()
+
+            abas = _AbasProcesso(sessao.context)
+            pendentes: list[asyncio.Task[None]] = []
+            contador = 0
+            leitura_completa = True
+            # processos já vistos: ao renovar o contexto, a leitura recomeça na página em que estava
+            vistos: set[str] = set()
+            renovar = True
+            while renovar:
+                renovar = False
+                async for registro in iterar_registros(
+                    page, progress=progress, wait_timeout_ms=settings.wait_timeout_ms, pagina_inicial=pagina_inicial
+                ):
+                    if registro.numero in vistos:
+                        continue
+                    if limite is not None and contador >= limite:
+                        leitura_completa = False
+                        break
+                    vistos.add(registro.numero)
+                    contador += 1
+                    if leitura is not None:
+                        leitura.classificar(registro)
+                    checkpoint.registrar(registro, concluido=registro.numero in manifesto)
+                    if skip_existentes and registro.numero in manifesto:
+                        _log(f"Pulando {registro.numero} (já existe ZIP)", progress)
+                        emitir(RegistrosProcessados("download", "pulado"))
+                        continue
+                    pendentes.append(
+                        asyncio.create_task(
+                            _baixar_e_registrar(
+                                abas,
+                                registro.numero,
+                                registro.href,
+                                manifesto,
+                                target_bloco,
+                                agendador,
+                                atalho,
+                                arquivos,
+                                progress,
+                            )
+                        )
+                    )
+                    if await sessao.registrar_processo():
+                        pagina_inicial = registro.pagina
+                        renovar = True
+                        break
+                if renovar:
+                    page, abas = await _renovar_contexto(
+                        sessao, abas, pendentes, settings, target_bloco, pagina_inicial, progress, auto_credentials
+                    )
+
+            if leitura is not None and leitura_completa:
+                _log(f"Desde a última leitura: {leitura.concluir().resumo()}", progress)
+
+            await asyncio.gather(*pendentes)
+            await _repetir_downloads(abas, manifesto, target_bloco, agendador, atalho, arquivos, progress)
+            await abas.fechar()
+            if leitura_completa:
+                checkpoint.encerrar()
+
+    if agendador.relatorio():
+        _log(agendador.relatorio(), progress)
+    if regulador.relatorio():
+        _log(regulador.relatorio(), progress)
+    if tempos.relatorio():
+        _log(tempos.relatorio(), progress)
+    if settings.trace_dir is not None:
+        trace = salvar_trace(tempos, settings.trace_dir, f"download-{target_bloco}")
+        _log(f"Trace de tempos gravado em {trace}", progress)
+    emitir(ExecucaoConcluida({"arquivos": len(arquivos), "falhas": len(agendador.definitivas())}))
+    return ArquivosBaixados(arquivos, agendador.definitivas())
+
+
+async def _atualizar_anotacao(
+    row,
+    numero: str,
+    page: Page,
+    progress: ProgressFn,
+    *,
+    texto: str = TEXTO_ANOTACAO,
+    wait_timeout_ms: int = DEFAULT_WAIT_TIMEOUT_MS,
+    atalho: AtalhoRequisicao | None = None,
+    href: str = "",
+) -> bool:
+    await row.locator("td").nth(5).locator("img[title='Anotações']").first.click()
+    with medir("modal_abrir"):
+        await page.wait_for_selector("iframe[name='modal-frame']", state="attached", timeout=wait_timeout_ms)
+        modal = page.frame(name="modal-frame")
+        if modal is None:
+            raise RuntimeError("Frame modal-frame não encontrado após abrir anotações.")
+        await modal.wait_for_selector("#txtAnotacao", timeout=wait_timeout_ms)
+    await modal.fill("#txtAnotacao", texto)
+
+    requisicoes: list[Request] = []
+    ouvir = requisicoes.append
+    aprender = atalho is not None and not atalho.disponivel and bool(texto.strip())
+    if aprender:
+        page.on("request", ouvir)
+    try:
+        await modal.locator("button[name='sbmAlterarRelBlocoProtocolo']").click()
+        with medir("modal_fechar"):
+            await page.wait_for_selector("iframe[name='modal-frame']", state="detached", timeout=wait_timeout_ms)
+    except TimeoutError:
+        _log(f"Aviso: modal não fechou automaticamente para {numero}", progress)
+    finally:
+        if aprender:
+            page.remove_listener("request", ouvir)
+    if aprender:
+        envio = next((request for request in requisicoes if request.method != "GET"), None)
+        if atalho.aprender(envio, valores_do_processo(numero, href), {"anotacao": texto}):
+            _log("Envio da anotação aprendido; as demais alterações serão enviadas sem abrir o modal.", progress)
+    return True
+
+
+async def _enviar_direto(
+    context: BrowserContext, atalho: AtalhoRequisicao, regulador: Regulador, alteracao: AlteracaoAnotacao
+) -> None:
+    requisicao = atalho.requisicao(valores_anotacao(alteracao.numero, alteracao.href, alteracao.desejado))
+    if requisicao is None:
+        raise RuntimeError("envio direto indisponível")
+    url, kwargs = requisicao
+    try:
+        async with regulador.requisicao_async("anotacao_direta"):
+            with medir("anotacao_direta"):
+                response = await context.request.fetch(url, **kwargs)
+                resposta = HttpResponse(response.url, response.status, response.headers, await response.body())
+            if not resposta.ok or eh_pagina_de_login(resposta):
+                raise RuntimeError(f"HTTP {resposta.status}")
+    except Exception:
+        atalho.registrar_resultado(False)
+        raise
+    atalho.registrar_resultado(True)
+
+
+async def _aplicar_pelo_modal(
+    page: Page,
+    settings: Settings,
+    bloco_id: int,
+    alvos: dict[str, AlteracaoAnotacao],
+    agendador: AgendadorRetentativas,
+    progress: ProgressFn,
+    *,
+    auto_credentials: bool,
+    atalho: AtalhoRequisicao | None = None,
+) -> tuple[int, dict[str, AlteracaoAnotacao]]:
+    total = 0
+    restantes = dict(alvos)
+    await login_and_open_bloco(
+        page, settings, bloco_id=bloco_id, progress=progress, auto_credentials=auto_credentials
+    )
+    async for registro in iterar_registros(
+        page,
+        progress=progress,
+        wait_timeout_ms=settings.wait_timeout_ms,
+        pagina_inicial=min((alteracao.pagina for alteracao in alvos.values()), default=1),
+    ):
+        alteracao = restantes.pop(registro.numero, None)
+        if alteracao is None:
+            continue
+        numero = alteracao.numero
+        if anotacao_confere(registro.anotacao, alteracao.desejado):
+            agendador.registrar_sucesso(numero)
+            emitir(RegistrosProcessados("anotacao", "atualizado"))
+            total += 1
+        else:
+            try:
+                _log(f"Atualizando anotação de {numero}…", progress)
+                async with regular_async("anotacao", concorrente=True):
+                    with medir("anotacao_atualizar"):
+                        await _atualizar_anotacao(
+                            registro.row(page),
+                            numero,
+                            page,
+                            progress,
+                            texto=alteracao.desejado,
+                            wait_timeout_ms=settings.wait_timeout_ms,
+                            atalho=atalho,
+                            href=registro.href,
+                        )
+                agendador.registrar_sucesso(numero)
+                emitir(RegistrosProcessados("anotacao", "atualizado"))
+                total += 1
+            except Exception as exc:  # noqa: BLE001
+                registrar_falha_anotacao(agendador, numero, exc, progress)
+            finally:
+                await page.bring_to_front()
+        if not restantes or (atalho is not None and atalho.disponivel):
+            return total, restantes
+    for numero in restantes:
+        registrar_falha_anotacao(agendador, numero, "processo não encontrado no bloco", progress)
+    return total, {}
+
+
+async def _enviar_em_lote(
+    page: Page,
+    alteracoes: dict[str, AlteracaoAnotacao],
+    atalho: AtalhoRequisicao,
+    regulador: Regulador,
+    progress: ProgressFn,
+) -> None:
+    # a concorrência é limitada pelas vagas do regulador (maximo = concurrency)
+    _log(f"Enviando {len(alteracoes)} anotações diretamente…", progress)
+    resultados = await asyncio.gather(
+        *(_enviar_direto(page.context, atalho, regulador, alteracao) for alteracao in alteracoes.values()),
+        return_exceptions=True,
+    )
+    for numero, resultado in zip(alteracoes, resultados):
+        if isinstance(resultado, BaseException):
+            _log(f"Envio direto falhou para {numero} ({resultado}); será refeito pelo modal.", progress)
+
+
+async def _repetir_falhas(
+    page: Page,
+    settings: Settings,
+    bloco_id: int,
+    plano: PlanoAnotacoes,
+    agendador: AgendadorRetentativas,
+    progress: ProgressFn,
+    *,
+    auto_credentials: bool,
+) -> int:
+    total = 0
+    alteracoes = plano.por_numero
+    while pendentes := agendador.pendentes():
+        alvos = {numero: alteracoes[numero] for numero, _ in pendentes}
+        _log(f"Repetindo {len(alvos)} anotações que falharam…", progress)
+        await asyncio.sleep(agendador.espera_restante(alvos))
+        aplicados, _ = await _aplicar_pelo_modal(
+            page, settings, bloco_id, alvos, agendador, progress, auto_credentials=auto_credentials
+        )
+        total += aplicados
+    return total
+
+
+async def _aplicar_plano(
+    page: Page,
+    settings: Settings,
+    bloco_id: int,
+    plano: PlanoAnotacoes,
+    agendador: AgendadorRetentativas,
+    progress: ProgressFn,
+    *,
+    auto_credentials: bool,
+    atalho: AtalhoRequisicao | None,
+    regulador: Regulador,
+) -> int:
+    total, restantes = await _aplicar_pelo_modal(
+        page,
+        settings,
+        bloco_id,
+        plano.por_numero,
+        agendador,
+        progress,
+        auto_credentials=auto_credentials,
+        atalho=atalho,
+    )
+    if restantes and atalho is not None:
+        await _enviar_em_lote(page, restantes, atalho, regulador, progress)
+        _log(f"Conferindo {len(restantes)} anotações enviadas diretamente…", progress)
+        conferidos, _ = await _aplicar_pelo_modal(
+            page, settings, bloco_id, restantes, agendador, progress, auto_credentials=auto_credentials
+        )
+        total += conferidos
+    return total + await _repetir_falhas(
+        page, settings, bloco_id, plano, agendador, progress, auto_credentials=auto_credentials
+    )
+
+
+def _contar_lido() -> bool:
+    emitir(RegistrosProcessados("leitura", "lido"))
+    return True
+
+
+async def _ler_plano(
+    page: Page,
+    settings: Settings,
+    regra: RegraAnotacao,
+    progress: ProgressFn,
+    leitura: LeituraIncremental | None = None,
+    checkpoint: Checkpoint | None = None,
+    pagina_inicial: int = 1,
+) -> PlanoAnotacoes:
+    with medir("plano_anotacoes"):
+        registros = [
+            registro
+            async for registro in iterar_registros(
+                page, progress=progress, wait_timeout_ms=settings.wait_timeout_ms, pagina_inicial=pagina_inicial
+            )
+            if _contar_lido() and (leitura is None or leitura.classificar(registro))
+        ]
+        if checkpoint is None:
+            plano = planejar(registros, regra)
+        else:
+            plano = PlanoAnotacoes()
+            for registro in registros:
+                # processos sem alteração (ou já alterados numa execução interrompida) ficam concluídos
+                concluido = checkpoint.concluido(registro.numero) or plano.considerar(registro, regra) is None
+                checkpoint.registrar(registro, concluido=concluido)
+    _log(plano.relatorio(), progress)
+    return plano
+
+
+async def planejar_anotacoes(
+    settings: Settings,
+    regra: RegraAnotacao,
+    *,
+    headless: bool = True,
+    progress: ProgressFn = None,
+    auto_credentials: bool = True,
+    bloco_id: int | None = None,
+) -> PlanoAnotacoes:
+    """Versão assíncrona de `seiautomation.tasks.planejar_anotacoes`."""
+    target_bloco = bloco_id or settings.bloco_id
+    async with launch_session(headless=headless) as session:
+        page = session.page
+        await login_and_open_bloco(
+            page,
+            settings,
+            bloco_id=target_bloco,
+            progress=progress,
+            auto_credentials=auto_credentials,
+        )
+        return await _ler_plano(page, settings, regra, progress)
+
+
+async def atualizar_anotacoes(
+    settings: Settings,
+    regra: RegraAnotacao,
+    *,
+    headless: bool = True,
+    progress: ProgressFn = None,
+    auto_credentials: bool = True,
+    bloco_id: int | None = None,
+    dry_run: bool = False,
+    retentativas: PoliticaRetentativa | None = None,
+    direto: bool = True,
+    concurrency: int = 4,
+    incremental: bool = False,
+    resume: bool = False,
+) -> TotalAtualizado:
+    """Versão assíncrona de `seiautomation.tasks.atualizar_anotacoes`."""
+    total_atualizados = 0
+    target_bloco = bloco_id or settings.bloco_id
+    workers = max(1, concurrency)
+    agendador = AgendadorRetentativas(retentativas)
+    regulador = Regulador(taxa=settings.max_requests_per_second, maximo=workers, progress=progress)
+    atalho = AtalhoRequisicao(MAX_FALHAS_ATALHO) if direto else None
+    escopo = escopo_snapshot(regra)
+    with usar_recorder() as tempos, usar_regulador(regulador), (
+        SnapshotStore(settings) if incremental else nullcontext()
+    ) as snapshots, CheckpointStore(settings) as checkpoints:
+        async with launch_session(headless=headless) as session:
+            page = session.page
+            await login_and_open_bloco(
+                page,
+                settings,
+                bloco_id=target_bloco,
+                progress=progress,
+                auto_credentials=auto_credentials,
+            )
+            emitir(ExecucaoIniciada("anotacoes", target_bloco))
+            emitir(EtapaIniciada("leitura", await total_registros(page)))
+            checkpoint = Checkpoint(checkpoints, escopo, target_bloco, retomar=resume)
+            pagina_inicial = checkpoint.pagina_inicial() if checkpoint.retomado else 1
+            if pagina_inicial > 1:
+                _log(f"Retomando a execução interrompida a partir da página {pagina_inicial}.", progress)
+            # a comparação incremental precisa da relação inteira
+            leitura = (
+                LeituraIncremental(snapshots, escopo, target_bloco)
+                if snapshots is not None and pagina_inicial == 1
+                else None
+            )
+            if leitura is not None and leitura.primeira_pagina_inalterada(
+                await extrair_linhas(page), await total_registros(page)
+            ):
+                _log(f"Bloco {target_bloco} sem alterações desde a última execução; nada a planejar.", progress)
+                checkpoint.encerrar()
+                emitir(ExecucaoConcluida({"planejadas": 0, "atualizadas": 0, "falhas": 0}))
+                return TotalAtualizado(0)
+            plano = await _ler_plano(page, settings, regra, progress, leitura, checkpoint, pagina_inicial)
+            if leitura is not None and not dry_run:
+                _log(f"Desde a última execução: {leitura.concluir().resumo()}", progress)
+            if dry_run:
+                _log("Simulação: nenhuma anotação foi alterada.", progress)
+                checkpoint.encerrar()
+                emitir(ExecucaoConcluida({"planejadas": len(plano), "atualizadas": 0, "falhas": 0}))
+                return TotalAtualizado(0)
+            if not plano:
+                _log("Nenhuma anotação a alterar.", progress)
+                checkpoint.encerrar()
+                emitir(ExecucaoConcluida({"planejadas": 0, "atualizadas": 0, "falhas": 0}))
+                return TotalAtualizado(0)
+
+            emitir(EtapaIniciada("anotacao", len(plano)))
+            total_atualizados = await _aplicar_plano(
+                page,
+                settings,
+                target_bloco,
+                plano,
+                agendador,
+                progress,
+                auto_credentials=auto_credentials,
+                atalho=atalho,
+                regulador=regulador,
+            )
+            if snapshots is not None:
+                falhas = {falha.numero for falha in agendador.definitivas()}
+                snapshots.atualizar_anotacoes(
+                    escopo,
+                    target_bloco,
+                    {
+                        alteracao.numero: alteracao.desejado
+                        for alteracao in plano.alteracoes
+                        if alteracao.numero not in falhas
+                    },
+                    descartar=falhas,
+                )
+            checkpoint.encerrar()
+
+    _log(f"Total de anotações atualizadas: {total_atualizados} de {len(plano)}", progress)
+    if agendador.relatorio():
+        _log(agendador.relatorio(), progress)
+    if regulador.relatorio():
+        _log(regulador.relatorio(), progress)
+    if tempos.relatorio():
+        _log(tempos.relatorio(), progress)
+    if settings.trace_dir is not None:
+        trace = salvar_trace(tempos, settings.trace_dir, f"anotacoes-{target_bloco}")
+        _log(f"Trace de tempos gravado em {trace}", progress)
+    emitir(
+        ExecucaoConcluida(
+            {"planejadas": len(plano), "atualizadas": total_atualizados, "falhas": len(agendador.definitivas())}
+        )
+    )
+    return TotalAtualizado(total_atualizados, agendador.definitivas())
+
+
+async def preencher_anotacoes_ok(
+    settings: Settings,
+    *,
+    headless: bool = True,
+    progress: ProgressFn = None,
+    auto_credentials: bool = True,
+    bloco_id: int | None = None,
+    dry_run: bool = False,
+    retentativas: PoliticaRetentativa | None = None,
+    direto: bool = True,
+    concurrency: int = 4,
+    incremental: bool = False,
+    resume: bool = False,
+) -> TotalAtualizado:
+    """Versão assíncrona de `seiautomation.tasks.preencher_anotacoes_ok`."""
+    return await atualizar_anotacoes(
+        settings,
+        TextoConstante(TEXTO_ANOTACAO),
+        headless=headless,
+        progress=progress,
+        auto_credentials=auto_credentials,
+        bloco_id=bloco_id,
+        dry_run=dry_run,
+        retentativas=retentativas,
+        direto=direto,
+        concurrency=concurrency,
+        incremental=incremental,
+        resume=resume,
+    )
+
+
+def _exportar_por_http(settings: Settings, **kwargs) -> Path | None:
+    """
+    Exportação com listagem HTTP, para rodar numa thread: a leitura não usa o
+    navegador, e o login (se a sessão salva não servir) usa o motor síncrono,
+    cujo pool da thread é encerrado no fim.
+    """
+    try:
+        return _exportar_relacao_sincrona(settings, listagem="http", **kwargs)
+    finally:
+        _fechar_pool_da_thread()
+
+
+async def exportar_relacao_csv(
+    settings: Settings,
+    *,
+    headless: bool = True,
+    progress: ProgressFn = None,
+    bloco_id: int | None = None,
+    auto_credentials: bool = True,
+    listagem: str = "browser",
+    formato: str = "csv",
+    compressao: str | None = None,
+    incremental: bool = False,
+    resume: bool = False,
+) -> Path | None:
+    """
+    Versão assíncrona de `seiautomation.tasks.exportar_relacao_csv`.
+
+    Com `listagem="http"` a exportação síncrona roda numa thread (`asyncio.to_thread`),
+    já que a listagem HTTP não depende do Chromium.
+    """
+    if listagem not in {"browser", "http"}:
+        raise ValueError(f"Modo de listagem desconhecido: {listagem}")
+    if listagem == "http":
+        return await asyncio.to_thread(
+            _exportar_por_http,
+            settings,
+            headless=headless,
+            progress=progress,
+            bloco_id=bloco_id,
+            auto_credentials=auto_credentials,
+            formato=formato,
+            compressao=compressao,
+            incremental=incremental,
+            resume=resume,
+        )
+    validar_formato(formato, compressao)
+    target_bloco = bloco_id or settings.bloco_id
+    timestamp = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
+    sufixo = "alteracoes" if incremental else "relacao"
+    filename = nome_do_arquivo(settings.download_dir / f"bloco_{target_bloco}_{sufixo}_{timestamp}", formato, compressao)
+    colunas = COLUNAS_INCREMENTAIS if incremental else COLUNAS
+    leitura: LeituraIncremental | None = None
+    retomada: RetomadaExportacao | None = None
+    retomavel = pode_anexar(formato, compressao) and not incremental
+    if resume and not retomavel:
+        _log("Exportação incremental, comprimida ou em Parquet não pode ser retomada; recomeçando do zero.", progress)
+
+    emitir(ExecucaoIniciada("exportacao", target_bloco))
+    with ExitStack() as pilha:
+        tempos = pilha.enter_context(usar_recorder())
+        if retomavel:
+            checkpoints = pilha.enter_context(CheckpointStore(settings))
+            retomada = RetomadaExportacao(
+                Checkpoint(checkpoints, "exportacao", target_bloco, retomar=resume), filename, progress
+            )
+            filename = retomada.arquivo
+        anexar = retomada is not None and retomada.anexar
+        escritor = pilha.enter_context(EscritorRelacao(filename, formato, compressao, colunas=colunas, anexar=anexar))
+        if retomada is not None:
+            retomada.iniciar(escritor)
+        if incremental:
+            leitura = LeituraIncremental(pilha.enter_context(SnapshotStore(settings)), "exportacao", target_bloco)
+        try:
+            async with launch_session(headless=headless) as session:
+                page = session.page
+                await login_and_open_bloco(
+                    page,
+                    settings,
+                    bloco_id=target_bloco,
+                    progress=progress,
+                    auto_credentials=auto_credentials,
+                )
+                total = await total_registros(page)
+                emitir(EtapaIniciada("exportacao", total))
+                if leitura is None or not leitura.primeira_pagina_inalterada(await extrair_linhas(page), total):
+                    async for registro in iterar_registros(
+                        page,
+                        progress=progress,
+                        wait_timeout_ms=settings.wait_timeout_ms,
+                        pagina_inicial=retomada.pagina_inicial if retomada is not None else 1,
+                    ):
+                        if retomada is not None and retomada.ja_gravado(registro):
+                            emitir(RegistrosProcessados("exportacao", "ja_gravado"))
+                            continue
+                        if leitura is None:
+                            escritor.escrever(linha_da_relacao(registro))
+                            emitir(RegistrosProcessados("exportacao", "exportado"))
+                        elif mudanca := leitura.classificar(registro):
+                            escritor.escrever(linha_da_relacao(registro, mudanca))
+                            emitir(RegistrosProcessados("exportacao", "exportado"))
+                        else:
+                            emitir(RegistrosProcessados("exportacao", "inalterado"))
+        except Exception:
+            _log(f"Exportação interrompida; {escritor.linhas} linhas gravadas em {filename}", progress)
+            raise
+        if leitura is not None and not leitura.inalterado:
+            diferenca = leitura.concluir()
+            for removido in diferenca.removidos:
+                escritor.escrever(linha_da_relacao(removido, REMOVIDO))
+            _log(f"Desde a última exportação incremental: {diferenca.resumo()}", progress)
+        if retomada is not None:
+            retomada.checkpoint.encerrar()
+
+    if leitura is not None and leitura.inalterado:
+        filename.unlink(missing_ok=True)
+        _log(f"Bloco {target_bloco} sem alterações desde a última exportação incremental.", progress)
+        emitir(ExecucaoConcluida({"linhas": 0}))
+        return None
+    _log(f"Relação exportada para {filename} ({escritor.linhas} linhas)", progress)
+    if tempos.relatorio():
+        _log(tempos.relatorio(), progress)
+    if settings.trace_dir is not None:
+        trace = salvar_trace(tempos, settings.trace_dir, f"exportacao-{target_bloco}")
+        _log(f"Trace de tempos gravado em {trace}", progress)
+    emitir(ExecucaoConcluida({"linhas": escritor.linhas, "arquivo": str(filename)}))
+    return filename
+
+
+async def executar_pipeline(
+    settings: Settings,
+    *,
+    baixar: bool = False,
+    regra: RegraAnotacao | None = None,
+    exportar: bool = False,
+    headless: bool = True,
+    progress: ProgressFn = None,
+    auto_credentials: bool = True,
+    bloco_id: int | None = None,
+    concurrency: int = 4,
+    skip_existentes: bool = True,
+    zip_direto: bool = True,
+    direto: bool = True,
+    dry_run: bool = False,
+    retentativas: PoliticaRetentativa | None = None,
+    formato: str = "csv",
+    compressao: str | None = None,
+    resume: bool = False,
+) -> ResultadoPipeline:
+    """
+    Versão assíncrona de `seiautomation.tasks.executar_pipeline`.
+
+    Os downloads começam durante a leitura, em abas do mesmo contexto, e
+    continuam enquanto o plano de anotações é aplicado na aba principal.
+    """
+    validar_etapas(baixar, regra, exportar, formato, compressao)
+    target_bloco = bloco_id or settings.bloco_id
+    regulador = Regulador(taxa=settings.max_requests_per_second, maximo=max(1, concurrency), progress=progress)
+    falhas_download = AgendadorRetentativas(retentativas)
+    falhas_anotacao = AgendadorRetentativas(retentativas)
+    atalho_zip = AtalhoRequisicao(MAX_FALHAS_ATALHO) if zip_direto else None
+    atalho_anotacao = AtalhoRequisicao(MAX_FALHAS_ATALHO) if direto else None
+    plano = PlanoAnotacoes() if regra is not None else None
+    downloads: list[asyncio.Task[None]] = []
+    arquivos: list[str] = []
+    resultado = ResultadoPipeline()
+
+    with ExitStack() as pilha:
+        tempos = pilha.enter_context(usar_recorder())
+        pilha.enter_context(usar_regulador(regulador))
+        manifesto = pilha.enter_context(DownloadManifest(settings.download_dir)) if baixar else None
+        caminho = arquivo_relacao(settings, target_bloco, formato, compressao) if exportar else None
+        retomada = RetomadaPipeline(
+            pilha.enter_context(CheckpointStore(settings)),
+            target_bloco,
+            manifesto=manifesto,
+            regra=regra,
+            relacao=caminho,
+            formato=formato,
+            compressao=compressao,
+            skip_existentes=skip_existentes,
+            retomar=resume,
+            progress=progress,
+        )
+        escritor = None
+        if caminho is not None:
+            caminho = retomada.relacao or caminho
+            escritor = pilha.enter_context(EscritorRelacao(caminho, formato, compressao, anexar=retomada.anexar))
+            if retomada.exportacao is not None:
+                retomada.exportacao.iniciar(escritor)
+        async with ContextoReciclavel(
+            headless=headless, limite=settings.recycle_after, memoria_mb=settings.recycle_memory_mb
+        ) as sessao:
+            page = sessao.page
+            await login_and_open_bloco(
+                page,
+                settings,
+                bloco_id=target_bloco,
+                progress=progress,
+                auto_credentials=auto_credentials,
+            )
+            abas = _AbasProcesso(sessao.context)
+            emitir(ExecucaoIniciada("pipeline", target_bloco))
+            if manifesto is not None:
+                # os downloads começam durante a leitura, sem saber quantos serão
+                emitir(EtapaIniciada("download"))
+            emitir(EtapaIniciada("leitura", await total_registros(page)))
+            pagina_inicial = retomada.pagina_inicial
+            # processos já vistos: ao renovar o contexto, a leitura recomeça na página em que estava
+            vistos: set[str] = set()
+            try:
+                with medir("pipeline_leitura"):
+                    renovar = True
+                    while renovar:
+                        renovar = False
+                        async for registro in iterar_registros(
+                            page,
+                            progress=progress,
+                            wait_timeout_ms=settings.wait_timeout_ms,
+                            pagina_inicial=pagina_inicial,
+                        ):
+                            if registro.numero in vistos:
+                                continue
+                            vistos.add(registro.numero)
+                            emitir(RegistrosProcessados("leitura", "lido"))
+                            if escritor is not None and retomada.exportar(registro):
+                                escritor.escrever(linha_da_relacao(registro))
+                            if plano is not None:
+                                retomada.planejar(plano, registro, regra)
+                            if manifesto is None:
+                                continue
+                            retomada.baixar(registro)
+                            if skip_existentes and registro.numero in manifesto:
+                                _log(f"Pulando {registro.numero} (já existe ZIP)", progress)
+                                continue
+                            downloads.append(
+                                asyncio.create_task(
+                                    _baixar_e_registrar(
+                                        abas,
+                                        registro.numero,
+                                        registro.href,
+                                        manifesto,
+                                        target_bloco,
+                                        falhas_download,
+                                        atalho_zip,
+                                        arquivos,
+                                        progress,
+                                    )
+                                )
+                            )
+                            if await sessao.registrar_processo():
+                                pagina_inicial = registro.pagina
+                                renovar = True
+                                break
+                        if renovar:
+                            page, abas = await _renovar_contexto(
+                                sessao,
+                                abas,
+                                downloads,
+                                settings,
+                                target_bloco,
+                                pagina_inicial,
+                                progress,
+                                auto_credentials,
+                            )
+
+                if escritor is not None:
+                    escritor.close()
+                    resultado.relacao = escritor.path
+                    _log(f"Relação exportada para {escritor.path} ({escritor.linhas} linhas)", progress)
+
+                if plano is not None:
+                    _log(plano.relatorio(), progress)
+                    total = 0
+                    if dry_run:
+                        _log("Simulação: nenhuma anotação foi alterada.", progress)
+                    elif not plano:
+                        _log("Nenhuma anotação a alterar.", progress)
+                    else:
+                        emitir(EtapaIniciada("anotacao", len(plano)))
+                        total = await _aplicar_plano(
+                            page,
+                            settings,
+                            target_bloco,
+                            plano,
+                            falhas_anotacao,
+                            progress,
+                            auto_credentials=auto_credentials,
+                            atalho=atalho_anotacao,
+                            regulador=regulador,
+                        )
+                        _log(f"Total de anotações atualizadas: {total} de {len(plano)}", progress)
+                    resultado.anotacoes = TotalAtualizado(total, falhas_anotacao.definitivas())
+            finally:
+                await asyncio.gather(*downloads, return_exceptions=True)
+
+            if manifesto is not None:
+                await _repetir_downloads(abas, manifesto, target_bloco, falhas_download, atalho_zip, arquivos, progress)
+                resultado.arquivos = ArquivosBaixados(arquivos, falhas_download.definitivas())
+        retomada.encerrar()
+
+    for relatorio in (falhas_download.relatorio(), falhas_anotacao.relatorio(), regulador.relatorio(), tempos.relatorio()):
+        if relatorio:
+            _log(relatorio, progress)
+    if settings.trace_dir is not None:
+        trace = salvar_trace(tempos, settings.trace_dir, f"pipeline-{target_bloco}")
+        _log(f"Trace de tempos gravado em {trace}", progress)
+    _log(f"Pipeline concluído: {resultado.resumo()}", progress)
+    emitir(ExecucaoConcluida(resultado.estatisticas()))
+    return resultado
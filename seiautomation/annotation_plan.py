@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import csv
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from string import Formatter
+from typing import Iterable, Protocol
+
+from .navigation import LinhaProcesso
+
+_CAMPOS_MODELO = {"numero", "seq", "tipo", "anotacao"}
+
+
+class RegraAnotacao(Protocol):
+    """Decide o texto desejado para a anotação de um processo (None = não mexer)."""
+
+    def desejado(self, registro: LinhaProcesso) -> str | None: ...
+
+
+@dataclass(slots=True, frozen=True)
+class TextoConstante:
+    """O mesmo texto para todos os processos do bloco."""
+
+    texto: str
+
+    def desejado(self, registro: LinhaProcesso) -> str | None:
+        return self.texto
+
+
+@dataclass(slots=True, frozen=True)
+class ModeloAnotacao:
+    """
+    Texto montado com `str.format` a partir da linha da relação, ex.:
+    `"OK {seq}"` ou `"Conferido ({tipo})"`.
+
+    Campos disponíveis: `numero`, `seq`, `tipo` e `anotacao` (o texto atual).
+    Um modelo com `{anotacao}` não se estabiliza: `"{anotacao} — conferido"`
+    acrescenta o sufixo de novo a cada execução, então confira o plano com
+    `dry_run` antes de repeti-lo no mesmo bloco.
+    """
+
+    modelo: str
+
+    def __post_init__(self) -> None:
+        desconhecidos = {
+            nome for _, nome, _, _ in Formatter().parse(self.modelo) if nome is not None and nome not in _CAMPOS_MODELO
+        }
+        if desconhecidos:
+            raise ValueError(f"Campos desconhecidos no modelo de anotação: {', '.join(sorted(desconhecidos))}")
+
+    def desejado(self, registro: LinhaProcesso) -> str | None:
+        return self.modelo.format(
+            numero=registro.numero, seq=registro.seq, tipo=registro.tipo, anotacao=registro.anotacao
+        )
+
+
+@dataclass(slots=True, frozen=True)
+class TabelaAnotacoes:
+    """Texto por número de processo; processos fora da tabela não são alterados."""
+
+    textos: dict[str, str]
+
+    @classmethod
+    def carregar(cls, path: Path | str) -> "TabelaAnotacoes":
+        """
+        Lê um JSON (`{"processo": "texto"}`) ou um CSV com as colunas `processo` e
+        `anotacao` (ou `anotacoes`, como no CSV gerado por `exportar_relacao_csv`).
+
+        Raises:
+            ValueError: se o arquivo não tiver o formato esperado.
+        """
+        path = Path(path)
+        if path.suffix.lower() == ".json":
+            dados = json.loads(path.read_text(encoding="utf-8"))
+            if not isinstance(dados, dict):
+                raise ValueError(f"{path.name}: esperado um objeto JSON processo → texto")
+            return cls({str(numero).strip(): str(texto) for numero, texto in dados.items()})
+
+        with path.open(newline="", encoding="utf-8-sig") as arquivo:
+            leitor = csv.DictReader(arquivo)
+            colunas = set(leitor.fieldnames or ())
+            coluna_texto = next((nome for nome in ("anotacao", "anotacoes") if nome in colunas), None)
+            if "processo" not in colunas or coluna_texto is None:
+                raise ValueError(f"{path.name}: o CSV precisa das colunas 'processo' e 'anotacao'")
+            return cls(
+                {
+                    linha["processo"].strip(): linha[coluna_texto] or ""
+                    for linha in leitor
+                    if (linha["processo"] or "").strip()
+                }
+            )
+
+    def desejado(self, registro: LinhaProcesso) -> str | None:
+        return self.textos.get(registro.numero)
+
+
+def regra_das_opcoes(
+    texto: str | None = None, *, modelo: str | None = None, tabela: Path | str | dict[str, str] | None = None
+) -> RegraAnotacao | None:
+    """
+    Regra escolhida pelas opções da linha de comando ou da API: um texto fixo, um
+    `ModeloAnotacao` ou uma `TabelaAnotacoes` (arquivo ou dicionário processo → texto).
+
+    Returns:
+        A regra, ou None se nenhuma opção foi informada.
+
+    Raises:
+        ValueError: se mais de uma opção foi informada, ou se o modelo/tabela for inválido.
+    """
+    informadas = [opcao for opcao in (texto, modelo, tabela) if opcao is not None]
+    if len(informadas) > 1:
+        raise ValueError("Informe só uma regra de anotação: texto, modelo ou tabela.")
+    if texto is not None:
+        return TextoConstante(texto)
+    if modelo is not None:
+        return ModeloAnotacao(modelo)
+    if isinstance(tabela, dict):
+        return TabelaAnotacoes({str(numero).strip(): str(valor) for numero, valor in tabela.items()})
+    if tabela is not None:
+        return TabelaAnotacoes.carregar(tabela)
+    return None
+
+
+@dataclass(slots=True, frozen=True)
+class AlteracaoAnotacao:
+    numero: str
+    seq: str
+    atual: str
+    desejado: str
+    href: str = ""
+    pagina: int = 1
+
+
+@dataclass(slots=True)
+class PlanoAnotacoes:
+    """Resultado da fase de leitura: só os processos cuja anotação realmente muda."""
+
+    alteracoes: list[AlteracaoAnotacao] = field(default_factory=list)
+    lidos: int = 0
+    _vistos: set[str] = field(default_factory=set, repr=False, compare=False)
+
+    def __len__(self) -> int:
+        return len(self.alteracoes)
+
+    def __bool__(self) -> bool:
+        return bool(self.alteracoes)
+
+    def considerar(self, registro: LinhaProcesso, regra: RegraAnotacao) -> AlteracaoAnotacao | None:
+        """
+        Compara um registro lido com a anotação desejada pela regra e o inclui no
+        plano se ela muda (processos repetidos na listagem contam uma vez).
+        """
+        if registro.numero in self._vistos:
+            return None
+        self._vistos.add(registro.numero)
+        self.lidos += 1
+        desejado = regra.desejado(registro)
+        if desejado is None or anotacao_confere(registro.anotacao, desejado):
+            return None
+        alteracao = AlteracaoAnotacao(
+            numero=registro.numero,
+            seq=registro.seq,
+            atual=registro.anotacao,
+            desejado=desejado,
+            href=registro.href,
+            pagina=registro.pagina,
+        )
+        self.alteracoes.append(alteracao)
+        return alteracao
+
+    @property
+    def por_numero(self) -> dict[str, AlteracaoAnotacao]:
+        return {alteracao.numero: alteracao for alteracao in self.alteracoes}
+
+    def resumo(self) -> str:
+        return f"{len(self.alteracoes)} de {self.lidos} anotações a alterar"
+
+    def relatorio(self) -> str:
+        """Diferença planejada, uma linha por processo."""
+        linhas = [
+            f"  {alteracao.numero}: {alteracao.atual!r} → {alteracao.desejado!r}" for alteracao in self.alteracoes
+        ]
+        return "\n".join([f"Plano de anotações: {self.resumo()}", *linhas])
+
+
+def _normalizar(texto: str) -> str:
+    return " ".join(texto.split())
+
+
+def anotacao_confere(atual: str, desejado: str) -> bool:
+    """Diferenças apenas de espaços não contam como alteração."""
+    return _normalizar(atual) == _normalizar(desejado)
+
+
+def planejar(registros: Iterable[LinhaProcesso], regra: RegraAnotacao) -> PlanoAnotacoes:
+    """Compara a anotação atual de cada processo com a desejada pela regra (ver `PlanoAnotacoes.considerar`)."""
+    plano = PlanoAnotacoes()
+    for registro in registros:
+        plano.considerar(registro, regra)
+    return plano
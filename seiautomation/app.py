@@ -5,13 +5,19 @@ from urllib.parse import urlparse
 
 from PySide6 import QtCore, QtGui, QtWidgets
 
+from .browser import close_pool
 from .config import Settings
-from .tasks import download_zip_lote, preencher_anotacoes_ok, exportar_relacao_csv
+from .annotation_plan import TextoConstante
+from .batch import executar_lote, interpretar_blocos
+from .tasks import download_zip_lote, executar_pipeline, preencher_anotacoes_ok, exportar_relacao_csv
+from .tasks.annotate_ok import TEXTO_ANOTACAO
 from .devserver import is_devserver_running, start_devserver, stop_devserver
+from .progress import Andamento, EmissorProgresso, Evento, Mensagem, usar_emissor
 
 
 class Worker(QtCore.QThread):
     log_signal = QtCore.Signal(str)
+    progress_signal = QtCore.Signal(str)
     finished_signal = QtCore.Signal(bool, str)
 
     def __init__(
@@ -24,11 +30,24 @@ class Worker(QtCore.QThread):
         try:
             for name, task in self._tasks.items():
                 self.log_signal.emit(f"Iniciando: {name}")
-                task(lambda msg, prefix=name: self.log_signal.emit(f"{prefix}: {msg}"))
+                andamento = Andamento()
+
+                # um sinal por lote de eventos, e não por mensagem, para não travar a janela
+                def entregar(lote: list[Evento], prefix: str = name, andamento: Andamento = andamento) -> None:
+                    textos = [f"{prefix}: {evento.texto}" for evento in lote if isinstance(evento, Mensagem)]
+                    if textos:
+                        self.log_signal.emit("\n".join(textos))
+                    andamento.aplicar(lote)
+                    self.progress_signal.emit(andamento.resumo())
+
+                with EmissorProgresso(entregar) as emissor, usar_emissor(emissor):
+                    task(emissor.texto)
                 self.log_signal.emit(f"Concluído: {name}")
             self.finished_signal.emit(True, "Todas as tarefas foram concluídas.")
         except Exception as exc:  # noqa: BLE001
             self.finished_signal.emit(False, f"Erro: {exc}")
+        finally:
+            close_pool()
 
 
 class MainWindow(QtWidgets.QWidget):
@@ -55,6 +74,7 @@ class MainWindow(QtWidgets.QWidget):
 
         self.log = QtWidgets.QPlainTextEdit()
         self.log.setReadOnly(True)
+        self.progress_label = QtWidgets.QLabel()
 
         self.run_button = QtWidgets.QPushButton("Executar tarefas selecionadas")
         self.run_button.clicked.connect(self._start_tasks)
@@ -73,8 +93,11 @@ class MainWindow(QtWidgets.QWidget):
         bloco_layout = QtWidgets.QHBoxLayout()
         bloco_label = QtWidgets.QLabel("ID do bloco:")
         self.bloco_input = QtWidgets.QLineEdit(str(self.settings.bloco_id))
-        self.bloco_input.setMaximumWidth(120)
-        self.bloco_input.setValidator(QtGui.QIntValidator(1, 999999))
+        self.bloco_input.setMaximumWidth(180)
+        self.bloco_input.setToolTip('Um bloco ("55") ou vários ("10-20,31"), processados em paralelo.')
+        self.bloco_input.setValidator(
+            QtGui.QRegularExpressionValidator(QtCore.QRegularExpression(r"[0-9][0-9,;\- ]*"))
+        )
         bloco_layout.addWidget(bloco_label)
         bloco_layout.addWidget(self.bloco_input)
         bloco_layout.addStretch()
@@ -93,6 +116,7 @@ class MainWindow(QtWidgets.QWidget):
         devserver_layout.addStretch()
         layout.addLayout(devserver_layout)
         layout.addWidget(self.log)
+        layout.addWidget(self.progress_label)
         layout.addLayout(button_layout)
 
         self.worker: Worker | None = None
@@ -142,9 +166,10 @@ class MainWindow(QtWidgets.QWidget):
         headless = self.checkbox_headless.isChecked()
         auto_credentials = self.checkbox_auto_credentials.isChecked() and self.settings.is_admin
         dev_mode = self.checkbox_dev_mode.isChecked()
-        bloco_id = self._resolve_bloco_id()
-        if bloco_id is None:
+        blocos = self._resolve_blocos()
+        if blocos is None:
             return
+        bloco_id = blocos[0]
 
         effective_headless = headless
         if headless and not auto_credentials:
@@ -157,7 +182,33 @@ class MainWindow(QtWidgets.QWidget):
             self._append_log("Executando com navegador visível apenas para esta execução (login manual requerido).")
         runtime_settings = self.settings.with_dev_mode(dev_mode)
 
-        if self.checkbox_download.isChecked():
+        baixar = self.checkbox_download.isChecked()
+        anotar = self.checkbox_anotacoes.isChecked()
+        exportar = self.checkbox_export.isChecked()
+        if len(blocos) > 1 and (baixar or anotar or exportar):
+            tasks_to_run[f"Lote de {len(blocos)} blocos"] = lambda progress, cfg=runtime_settings: executar_lote(
+                cfg,
+                blocos,
+                baixar=baixar,
+                regra=TextoConstante(TEXTO_ANOTACAO) if anotar else None,
+                exportar=exportar,
+                headless=effective_headless,
+                progress=progress,
+                auto_credentials=auto_credentials,
+            )
+        elif baixar + anotar + exportar > 1:
+            # várias tarefas: um login e uma leitura do bloco para todas
+            tasks_to_run["Pipeline"] = lambda progress, cfg=runtime_settings: executar_pipeline(
+                cfg,
+                baixar=baixar,
+                regra=TextoConstante(TEXTO_ANOTACAO) if anotar else None,
+                exportar=exportar,
+                headless=effective_headless,
+                progress=progress,
+                auto_credentials=auto_credentials,
+                bloco_id=bloco_id,
+            )
+        elif baixar:
             tasks_to_run["Download de ZIPs"] = lambda progress, cfg=runtime_settings: download_zip_lote(
                 cfg,
                 headless=effective_headless,
@@ -165,7 +216,7 @@ class MainWindow(QtWidgets.QWidget):
                 auto_credentials=auto_credentials,
                 bloco_id=bloco_id,
             )
-        if self.checkbox_anotacoes.isChecked():
+        elif anotar:
             tasks_to_run["Atualização de anotações"] = lambda progress, cfg=runtime_settings: preencher_anotacoes_ok(
                 cfg,
                 headless=effective_headless,
@@ -173,7 +224,7 @@ class MainWindow(QtWidgets.QWidget):
                 auto_credentials=auto_credentials,
                 bloco_id=bloco_id,
             )
-        if self.checkbox_export.isChecked():
+        elif exportar:
             tasks_to_run["Exportar relação"] = lambda progress, cfg=runtime_settings: exportar_relacao_csv(
                 cfg,
                 headless=effective_headless,
@@ -192,6 +243,7 @@ class MainWindow(QtWidgets.QWidget):
         self.run_button.setEnabled(False)
         self.worker = Worker(tasks_to_run)
         self.worker.log_signal.connect(self._append_log)
+        self.worker.progress_signal.connect(self.progress_label.setText)
         self.worker.finished_signal.connect(self._on_tasks_finished)
         if dev_mode:
             self._append_log("Modo desenvolvedor ativo: utilizando servidor fake.")
@@ -208,17 +260,16 @@ class MainWindow(QtWidgets.QWidget):
         self.tray.showMessage("SEIAutomation", "Executando em segundo plano. Clique no ícone para reabrir.")
         event.ignore()
 
-    def _resolve_bloco_id(self) -> int | None:
+    def _resolve_blocos(self) -> list[int] | None:
         text = self.bloco_input.text().strip()
         if not text:
             QtWidgets.QMessageBox.warning(self, "SEIAutomation", "Informe o ID do bloco.")
             return None
         try:
-            bloco_id = int(text)
-        except ValueError:
-            QtWidgets.QMessageBox.warning(self, "SEIAutomation", "ID do bloco inválido.")
+            return interpretar_blocos(text)
+        except ValueError as exc:
+            QtWidgets.QMessageBox.warning(self, "SEIAutomation", str(exc))
             return None
-        return bloco_id
 
     def _on_dev_mode_changed(self, state: int) -> None:
         checked = state == QtCore.Qt.CheckState.Checked
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Iterable
+
+from . import aio
+from .annotation_plan import RegraAnotacao
+from .config import Settings
+from .tasks.pipeline import ResultadoPipeline
+
+ProgressFn = Callable[[str], None] | None
+
+
+def interpretar_blocos(texto: str) -> list[int]:
+    """
+    Converte `"55"`, `"10-12,31"` ou `"10 11 12"` na lista de IDs de bloco,
+    sem repetições e na ordem informada.
+
+    Raises:
+        ValueError: trecho que não é número nem intervalo `inicio-fim`.
+    """
+    blocos: list[int] = []
+    for trecho in texto.replace(";", ",").replace(" ", ",").split(","):
+        trecho = trecho.strip()
+        if not trecho:
+            continue
+        inicio, separador, fim = trecho.partition("-")
+        try:
+            primeiro = int(inicio)
+            ultimo = int(fim) if separador else primeiro
+        except ValueError:
+            raise ValueError(f"ID de bloco inválido: {trecho!r}") from None
+        if primeiro <= 0 or ultimo < primeiro:
+            raise ValueError(f"Intervalo de blocos inválido: {trecho!r}")
+        blocos.extend(bloco for bloco in range(primeiro, ultimo + 1) if bloco not in blocos)
+    if not blocos:
+        raise ValueError("Informe ao menos um ID de bloco.")
+    return blocos
+
+
+@dataclass(slots=True)
+class ResultadoBloco:
+    bloco_id: int
+    segundos: float
+    resultado: ResultadoPipeline | None = None
+    erro: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.erro is None
+
+
+@dataclass(slots=True)
+class ResultadoLote:
+    """Resultado e tempo de cada bloco, na ordem em que foram informados."""
+
+    blocos: list[ResultadoBloco] = field(default_factory=list)
+    segundos: float = 0.0
+
+    @property
+    def falhas(self) -> list[ResultadoBloco]:
+        return [bloco for bloco in self.blocos if not bloco.ok]
+
+    def relatorio(self) -> str:
+        linhas = [f"Lote de {len(self.blocos)} blocos em {self.segundos:.1f} s ({len(self.falhas)} com erro):"]
+        for bloco in self.blocos:
+            detalhe = bloco.resultado.resumo() if bloco.resultado is not None else f"erro: {bloco.erro}"
+            linhas.append(f"  bloco {bloco.bloco_id}: {bloco.segundos:.1f} s — {detalhe}")
+        return "\n".join(linhas)
+
+
+def _log(message: str, progress: ProgressFn) -> None:
+    if progress:
+        progress(message)
+    else:
+        print(message)
+
+
+async def executar_lote_async(
+    settings: Settings,
+    blocos: Iterable[int],
+    *,
+    baixar: bool = False,
+    regra: RegraAnotacao | None = None,
+    exportar: bool = False,
+    paralelos: int = 3,
+    headless: bool = True,
+    progress: ProgressFn = None,
+    auto_credentials: bool = True,
+    concurrency: int = 2,
+    dry_run: bool = False,
+    formato: str = "csv",
+    compressao: str | None = None,
+    resume: bool = False,
+) -> ResultadoLote:
+    """
+    Executa as etapas escolhidas (ver `seiautomation.aio.executar_pipeline`) em
+    vários blocos, até `paralelos` blocos ao mesmo tempo.
+
+    Todos os blocos usam o mesmo pool de navegadores do event loop e a mesma
+    sessão autenticada: o login é feito uma vez, antes de começar, e os demais
+    blocos apenas restauram a sessão salva. O erro de um bloco é registrado no
+    resultado dele e não interrompe os outros.
+
+    Args:
+        paralelos: blocos processados simultaneamente (cada um usa um contexto do pool).
+        concurrency: downloads/envios simultâneos dentro de cada bloco.
+        resume: retoma cada bloco a partir do checkpoint da execução interrompida.
+    """
+    blocos = list(blocos)
+    # cada bloco em andamento ocupa um contexto; o pool recusa passar do limite
+    paralelos = max(1, min(paralelos, aio.get_pool().max_size))
+    inicio = time.perf_counter()
+    async with aio.launch_session(headless=headless) as session:
+        await aio.garantir_login(session.page, settings, progress=progress, auto_credentials=auto_credentials)
+
+    limite = asyncio.Semaphore(paralelos)
+
+    async def processar(bloco_id: int) -> ResultadoBloco:
+        def log(message: str) -> None:
+            _log(f"[bloco {bloco_id}] {message}", progress)
+
+        async with limite:
+            comeco = time.perf_counter()
+            try:
+                resultado = await aio.executar_pipeline(
+                    settings,
+                    baixar=baixar,
+                    regra=regra,
+                    exportar=exportar,
+                    headless=headless,
+                    progress=log,
+                    auto_credentials=auto_credentials,
+                    bloco_id=bloco_id,
+                    concurrency=concurrency,
+                    dry_run=dry_run,
+                    formato=formato,
+                    compressao=compressao,
+                    resume=resume,
+                )
+            except Exception as exc:  # noqa: BLE001
+                log(f"Erro: {exc}")
+                return ResultadoBloco(bloco_id, time.perf_counter() - comeco, erro=str(exc) or type(exc).__name__)
+            return ResultadoBloco(bloco_id, time.perf_counter() - comeco, resultado=resultado)
+
+    _log(f"Processando {len(blocos)} blocos, até {paralelos} ao mesmo tempo…", progress)
+    resultados = await asyncio.gather(*(processar(bloco_id) for bloco_id in blocos))
+    lote = ResultadoLote(list(resultados), time.perf_counter() - inicio)
+    _log(lote.relatorio(), progress)
+    return lote
+
+
+def executar_lote(settings: Settings, blocos: Iterable[int], **kwargs) -> ResultadoLote:
+    """Versão síncrona de `executar_lote_async` (roda o próprio event loop e fecha o pool ao terminar)."""
+    async def executar() -> ResultadoLote:
+        try:
+            return await executar_lote_async(settings, blocos, **kwargs)
+        finally:
+            await aio.close_pool()
+
+    return asyncio.run(executar())
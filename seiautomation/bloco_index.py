@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+from .config import Settings
+
+
+# Coleta os links da listagem de blocos internos (bloco_interno_listar).
+LINKS_BLOCOS_JS = """
+() => Array.from(document.querySelectorAll("a[href*='rel_bloco_protocolo_listar']")).map((a) => a.href)
+"""
+
+
+def _index_path(settings: Settings) -> Path:
+    return settings.cache_dir / "blocos" / f"{settings.cache_key}.json"
+
+
+def _carregar(settings: Settings) -> dict[str, dict]:
+    try:
+        return json.loads(_index_path(settings).read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _gravar(settings: Settings, indice: dict[str, dict]) -> None:
+    path = _index_path(settings)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(indice), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _id_do_link(url: str) -> int | None:
+    valores = parse_qs(urlparse(url).query).get("id_bloco")
+    if not valores:
+        return None
+    try:
+        return int(valores[0])
+    except ValueError:
+        return None
+
+
+def registrar_links(settings: Settings, urls: list[str]) -> int:
+    """
+    Atualiza o índice bloco → URL da relação a partir dos links da listagem.
+
+    Returns:
+        Quantidade de blocos registrados.
+    """
+    indice = _carregar(settings)
+    agora = time.time()
+    registrados = 0
+    for url in urls:
+        bloco_id = _id_do_link(url)
+        if bloco_id is None:
+            continue
+        indice[str(bloco_id)] = {"url": url, "learned_at": agora}
+        registrados += 1
+    if registrados:
+        _gravar(settings, indice)
+    return registrados
+
+
+def url_do_bloco(settings: Settings, bloco_id: int) -> str | None:
+    entrada = _carregar(settings).get(str(bloco_id))
+    return entrada["url"] if entrada else None
+
+
+def invalidar(settings: Settings, bloco_id: int | None = None) -> None:
+    """Remove um bloco do índice (ou o índice inteiro quando `bloco_id` é None)."""
+    if bloco_id is None:
+        try:
+            _index_path(settings).unlink()
+        except FileNotFoundError:
+            pass
+        return
+    indice = _carregar(settings)
+    if indice.pop(str(bloco_id), None) is not None:
+        _gravar(settings, indice)
@@ -1,10 +1,23 @@
 from __future__ import annotations
 
+import atexit
+import os
+import threading
+import time
 from contextlib import contextmanager
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from pathlib import Path
 from typing import Iterator
 
-from playwright.sync_api import Browser, BrowserContext, Page, sync_playwright
+from playwright.sync_api import Browser, BrowserContext, Page, Playwright, sync_playwright
+
+
+CHROMIUM_ARGS = [
+    "--disable-dev-shm-usage",
+    "--no-sandbox",
+]
+# processos entre duas medições de memória do Chromium (ler /proc custa alguns milissegundos)
+INTERVALO_MEMORIA = 10
 
 
 @dataclass(slots=True)
@@ -14,21 +27,291 @@ class BrowserSession:
     page: Page
 
 
-@contextmanager
-def launch_session(headless: bool = True) -> Iterator[BrowserSession]:
-    with sync_playwright() as p:
-        browser = p.chromium.launch(
-            headless=headless,
-            args=[
-                "--disable-dev-shm-usage",
-                "--no-sandbox",
-            ],
-        )
+@dataclass(slots=True)
+class _PooledContext:
+    headless: bool
+    context: BrowserContext
+    released_at: float = field(default_factory=time.monotonic)
+
+
+class BrowserPool:
+    """
+    Mantém navegadores Chromium e contextos prontos para reutilização.
+
+    Os objetos da API síncrona do Playwright ficam presos à thread que os criou,
+    por isso cada thread usa o seu próprio pool (veja `get_pool`).
+
+    Args:
+        max_size: quantidade máxima de contextos (em uso + ociosos).
+        idle_timeout: segundos que um contexto ocioso permanece disponível.
+    """
+
+    def __init__(self, *, max_size: int = 4, idle_timeout: float = 300.0) -> None:
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self._playwright: Playwright | None = None
+        self._browsers: dict[bool, Browser] = {}
+        self._idle: list[_PooledContext] = []
+        self._in_use: dict[int, _PooledContext] = {}
+        self._owner = threading.get_ident()
+
+    @property
+    def size(self) -> int:
+        return len(self._idle) + len(self._in_use)
+
+    def _check_thread(self) -> None:
+        if threading.get_ident() != self._owner:
+            raise RuntimeError("BrowserPool só pode ser utilizado pela thread que o criou.")
+
+    def _browser(self, headless: bool) -> Browser:
+        browser = self._browsers.get(headless)
+        if browser is not None and browser.is_connected():
+            return browser
+        if self._playwright is None:
+            self._playwright = sync_playwright().start()
+        try:
+            browser = self._playwright.chromium.launch(headless=headless, args=CHROMIUM_ARGS)
+        except Exception:
+            if not self._browsers:
+                self._playwright.stop()
+                self._playwright = None
+            raise
+        self._browsers[headless] = browser
+        return browser
+
+    def _healthy(self, pooled: _PooledContext) -> bool:
+        browser = pooled.context.browser
+        return browser is not None and browser.is_connected()
+
+    def _discard(self, pooled: _PooledContext) -> None:
+        try:
+            pooled.context.close()
+        except Exception:  # noqa: BLE001
+            pass
+
+    def evict_idle(self) -> None:
+        """Fecha contextos ociosos expirados e navegadores sem contextos."""
+        now = time.monotonic()
+        keep: list[_PooledContext] = []
+        for pooled in self._idle:
+            if now - pooled.released_at > self.idle_timeout or not self._healthy(pooled):
+                self._discard(pooled)
+            else:
+                keep.append(pooled)
+        self._idle = keep
+
+        in_use = {pooled.headless for pooled in self._in_use.values()} | {pooled.headless for pooled in keep}
+        for headless in list(self._browsers):
+            if headless not in in_use:
+                browser = self._browsers.pop(headless)
+                try:
+                    browser.close()
+                except Exception:  # noqa: BLE001
+                    pass
+        if not self._browsers and self._playwright is not None:
+            self._playwright.stop()
+            self._playwright = None
+
+    def acquire(self, headless: bool = True) -> BrowserSession:
+        self._check_thread()
+        self.evict_idle()
+
+        while True:
+            pooled = next((item for item in reversed(self._idle) if item.headless == headless), None)
+            if pooled is None:
+                break
+            self._idle.remove(pooled)
+            try:
+                page = pooled.context.new_page()
+            except Exception:  # noqa: BLE001
+                self._discard(pooled)
+                continue
+            self._in_use[id(pooled.context)] = pooled
+            return BrowserSession(browser=pooled.context.browser, context=pooled.context, page=page)
+
+        if self.size >= self.max_size:
+            if not self._idle:
+                raise RuntimeError(f"Limite de {self.max_size} contextos do navegador atingido.")
+            # libera espaço descartando o contexto ocioso mais antigo (de outro modo headless)
+            self._discard(self._idle.pop(0))
+
+        browser = self._browser(headless)
         context = browser.new_context(accept_downloads=True)
-        page = context.new_page()
+        pooled = _PooledContext(headless=headless, context=context)
+        self._in_use[id(context)] = pooled
+        return BrowserSession(browser=browser, context=context, page=context.new_page())
+
+    def release(self, session: BrowserSession, *, discard: bool = False) -> None:
+        """Devolve o contexto ao pool; com `discard=True` ele é fechado em vez de reaproveitado."""
+        self._check_thread()
+        pooled = self._in_use.pop(id(session.context), None)
+        if pooled is None:
+            return
+        if discard:
+            self._discard(pooled)
+            return
         try:
-            yield BrowserSession(browser=browser, context=context, page=page)
-        finally:
-            context.close()
-            browser.close()
+            for page in list(session.context.pages):
+                page.close()
+            session.context.clear_cookies()
+        except Exception:  # noqa: BLE001
+            self._discard(pooled)
+            return
+        if not self._healthy(pooled):
+            self._discard(pooled)
+            return
+        pooled.released_at = time.monotonic()
+        self._idle.append(pooled)
+        self.evict_idle()
+
+    def close(self) -> None:
+        """Fecha todos os contextos e navegadores do pool."""
+        for pooled in [*self._idle, *self._in_use.values()]:
+            self._discard(pooled)
+        self._idle.clear()
+        self._in_use.clear()
+        for browser in self._browsers.values():
+            try:
+                browser.close()
+            except Exception:  # noqa: BLE001
+                pass
+        self._browsers.clear()
+        if self._playwright is not None:
+            self._playwright.stop()
+            self._playwright = None
+
+
+_local = threading.local()
+
+
+def get_pool() -> BrowserPool:
+    """Retorna o pool de navegadores da thread atual, criando-o se necessário."""
+    pool: BrowserPool | None = getattr(_local, "pool", None)
+    if pool is None:
+        pool = BrowserPool()
+        _local.pool = pool
+        if threading.current_thread() is threading.main_thread():
+            atexit.register(pool.close)
+    return pool
+
+
+def close_pool() -> None:
+    """Encerra o pool da thread atual (chamar ao final de threads de trabalho)."""
+    pool: BrowserPool | None = getattr(_local, "pool", None)
+    if pool is not None:
+        pool.close()
+        _local.pool = None
+
+
+@contextmanager
+def launch_session(headless: bool = True, *, pool: BrowserPool | None = None) -> Iterator[BrowserSession]:
+    pool = pool or get_pool()
+    session = pool.acquire(headless=headless)
+    try:
+        yield session
+    finally:
+        pool.release(session)
+
+
+def memoria_chromium_mb() -> float | None:
+    """
+    Memória residente (RSS) somada dos processos descendentes deste processo
+    Python — os navegadores Chromium — em MB. None fora do Linux.
+    """
+    proc = Path("/proc")
+    if not proc.is_dir():
+        return None
+    tamanho_pagina = os.sysconf("SC_PAGE_SIZE")
+    filhos: dict[int, list[int]] = {}
+    rss: dict[int, int] = {}
+    for entrada in proc.iterdir():
+        if not entrada.name.isdigit():
+            continue
+        try:
+            stat = (entrada / "stat").read_text()
+            statm = (entrada / "statm").read_text()
+        except OSError:
+            continue
+        pid = int(entrada.name)
+        # "pid (comando) estado ppid …": o comando pode conter espaços e parênteses
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        filhos.setdefault(ppid, []).append(pid)
+        rss[pid] = int(statm.split()[1]) * tamanho_pagina
+    total = 0
+    pendentes = list(filhos.get(os.getpid(), []))
+    while pendentes:
+        pid = pendentes.pop()
+        total += rss.get(pid, 0)
+        pendentes.extend(filhos.get(pid, []))
+    return total / (1024 * 1024)
+
+
+class ContextoReciclavel:
+    """
+    Sessão do pool que é trocada por um contexto novo depois de `limite`
+    processos ou quando a memória do Chromium passa de `memoria_mb`, para que
+    execuções longas não acumulem memória. Os processos são abertos numa única
+    aba reaproveitada (`aba_processo`), em vez de um popup por processo.
+
+    Uso: `registrar_processo` após cada processo; quando devolver True, chamar
+    `renovar` e refazer o login/abertura do bloco na nova `page`.
+
+    Args:
+        limite: processos por contexto; 0 desativa.
+        memoria_mb: RSS total do Chromium deste processo (ver `memoria_chromium_mb`)
+            que dispara a renovação; 0 desativa. Medido a cada 10 processos.
+    """
+
+    def __init__(
+        self, *, headless: bool = True, limite: int = 0, memoria_mb: int = 0, pool: BrowserPool | None = None
+    ) -> None:
+        self.headless = headless
+        self.limite = limite
+        self.memoria_mb = memoria_mb
+        self.renovacoes = 0
+        self._pool = pool or get_pool()
+        self._processos = 0
+        self._aba: Page | None = None
+        self.session: BrowserSession | None = None
+
+    @property
+    def page(self) -> Page:
+        return self.session.page
+
+    @property
+    def context(self) -> BrowserContext:
+        return self.session.context
+
+    def aba_processo(self) -> Page:
+        """Aba usada para abrir cada processo, criada na primeira vez e reaproveitada."""
+        if self._aba is None or self._aba.is_closed():
+            self._aba = self.session.context.new_page()
+        return self._aba
+
+    def registrar_processo(self) -> bool:
+        """Conta um processo; True quando é hora de renovar o contexto."""
+        self._processos += 1
+        if self.limite and self._processos >= self.limite:
+            return True
+        if self.memoria_mb and self._processos % INTERVALO_MEMORIA == 0:
+            memoria = memoria_chromium_mb()
+            return memoria is not None and memoria >= self.memoria_mb
+        return False
+
+    def renovar(self) -> BrowserSession:
+        """Fecha o contexto atual (com as abas) e abre outro; o login precisa ser refeito."""
+        self._pool.release(self.session, discard=True)
+        self._aba = None
+        self._processos = 0
+        self.renovacoes += 1
+        self.session = self._pool.acquire(headless=self.headless)
+        return self.session
+
+    def __enter__(self) -> "ContextoReciclavel":
+        self.session = self._pool.acquire(headless=self.headless)
+        return self
 
+    def __exit__(self, *exc) -> None:
+        if self.session is not None:
+            self._pool.release(self.session)
+            self.session = None
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from .config import Settings
+from .navigation import LinhaProcesso
+
+
+class CheckpointStore:
+    """
+    Progresso das execuções em andamento (SQLite em `SEI_CACHE_DIR/checkpoints`),
+    gravado durante a execução para que uma execução interrompida possa ser retomada.
+
+    Por tarefa e bloco guarda a última página lida, cada processo lido (com a
+    página em que aparece e se já foi concluído) e dados livres da tarefa
+    (ex.: o arquivo da exportação).
+    """
+
+    def __init__(self, settings: Settings) -> None:
+        self.path = _checkpoint_path(settings)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS execucoes (
+                tarefa TEXT NOT NULL,
+                bloco_id INTEGER NOT NULL,
+                pagina INTEGER NOT NULL,
+                dados TEXT NOT NULL,
+                atualizado_em REAL NOT NULL,
+                PRIMARY KEY (tarefa, bloco_id)
+            );
+            CREATE TABLE IF NOT EXISTS itens (
+                tarefa TEXT NOT NULL,
+                bloco_id INTEGER NOT NULL,
+                numero TEXT NOT NULL,
+                pagina INTEGER NOT NULL,
+                concluido INTEGER NOT NULL,
+                PRIMARY KEY (tarefa, bloco_id, numero)
+            );
+            """
+        )
+
+    def carregar(self, tarefa: str, bloco_id: int) -> tuple[int, dict[str, Any], dict[str, tuple[int, bool]]] | None:
+        """Página, dados e itens (número → (página, concluído)) da execução, ou None se não houver."""
+        with self._lock:
+            execucao = self._conn.execute(
+                "SELECT pagina, dados FROM execucoes WHERE tarefa = ? AND bloco_id = ?", (tarefa, bloco_id)
+            ).fetchone()
+            if execucao is None:
+                return None
+            itens = self._conn.execute(
+                "SELECT numero, pagina, concluido FROM itens WHERE tarefa = ? AND bloco_id = ?", (tarefa, bloco_id)
+            ).fetchall()
+        estados = {numero: (pagina, bool(concluido)) for numero, pagina, concluido in itens}
+        return execucao[0], json.loads(execucao[1]), estados
+
+    def gravar_execucao(self, tarefa: str, bloco_id: int, pagina: int, dados: dict[str, Any]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO execucoes VALUES (?, ?, ?, ?, ?)",
+                (tarefa, bloco_id, pagina, json.dumps(dados), time.time()),
+            )
+
+    def gravar_itens(self, tarefa: str, bloco_id: int, itens: Iterable[tuple[str, int, bool]]) -> None:
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO itens VALUES (?, ?, ?, ?, ?)",
+                [(tarefa, bloco_id, numero, pagina, int(concluido)) for numero, pagina, concluido in itens],
+            )
+
+    def descartar(self, tarefa: str, bloco_id: int) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM itens WHERE tarefa = ? AND bloco_id = ?", (tarefa, bloco_id))
+            self._conn.execute("DELETE FROM execucoes WHERE tarefa = ? AND bloco_id = ?", (tarefa, bloco_id))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> "CheckpointStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _checkpoint_path(settings: Settings) -> Path:
+    return settings.cache_dir / "checkpoints" / f"{settings.cache_key}.sqlite3"
+
+
+class Checkpoint:
+    """
+    Progresso de uma tarefa num bloco.
+
+    Sem `retomar`, o progresso anterior é descartado e a execução começa do
+    zero (mas continua registrando o seu). Com `retomar`, `pagina_inicial`
+    indica onde recomeçar — a primeira página com algum processo lido e não
+    concluído, ou a página em que a leitura parou — e `concluido` diz quais
+    processos pular. `encerrar` apaga o checkpoint quando a tarefa termina.
+    """
+
+    def __init__(self, store: CheckpointStore, tarefa: str, bloco_id: int, *, retomar: bool) -> None:
+        self.store = store
+        self.tarefa = tarefa
+        self.bloco_id = bloco_id
+        self._lock = threading.Lock()
+        anterior = store.carregar(tarefa, bloco_id) if retomar else None
+        self.retomado = anterior is not None
+        if anterior is None:
+            self.recomecar()
+        else:
+            self._pagina, self.dados, self._itens = anterior
+
+    def recomecar(self) -> None:
+        """Descarta o progresso anterior (ex.: o arquivo a continuar não existe mais) e começa do zero."""
+        with self._lock:
+            self.retomado = False
+            self._pagina, self.dados, self._itens = 1, {}, {}
+            self.store.descartar(self.tarefa, self.bloco_id)
+            self.store.gravar_execucao(self.tarefa, self.bloco_id, 1, {})
+
+    def pagina_inicial(self, concluido: Callable[[str], bool] | None = None) -> int:
+        """
+        Args:
+            concluido: critério extra de conclusão (ex.: o processo já está no manifesto de downloads).
+        """
+        pendentes = [
+            pagina
+            for numero, (pagina, feito) in self._itens.items()
+            if not feito and not (concluido is not None and concluido(numero))
+        ]
+        return min([*pendentes, self._pagina])
+
+    def concluido(self, numero: str) -> bool:
+        item = self._itens.get(numero)
+        return item is not None and item[1]
+
+    def registrar(self, registro: LinhaProcesso, *, concluido: bool = False) -> None:
+        """Marca o processo como lido (e, se `concluido`, como concluído) e a página como a atual da leitura."""
+        with self._lock:
+            self._itens[registro.numero] = (registro.pagina, concluido or self.concluido(registro.numero))
+            self.store.gravar_itens(self.tarefa, self.bloco_id, [(registro.numero, *self._itens[registro.numero])])
+            if registro.pagina != self._pagina:
+                self._pagina = registro.pagina
+                self.store.gravar_execucao(self.tarefa, self.bloco_id, self._pagina, self.dados)
+
+    def concluir(self, numeros: Iterable[str]) -> None:
+        with self._lock:
+            concluidos = []
+            for numero in numeros:
+                pagina = self._itens.get(numero, (self._pagina, False))[0]
+                self._itens[numero] = (pagina, True)
+                concluidos.append((numero, pagina, True))
+            self.store.gravar_itens(self.tarefa, self.bloco_id, concluidos)
+
+    def gravar_dados(self, **dados: Any) -> None:
+        with self._lock:
+            self.dados.update(dados)
+            self.store.gravar_execucao(self.tarefa, self.bloco_id, self._pagina, self.dados)
+
+    def encerrar(self) -> None:
+        """Execução concluída: não há o que retomar."""
+        self.store.descartar(self.tarefa, self.bloco_id)
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import argparse
+
+from .annotation_plan import regra_das_opcoes
+from .batch import executar_lote, interpretar_blocos
+from .config import Settings
+from .export_formats import COMPRESSOES, FORMATOS
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="seiautomation", description="Automação de tarefas do SEI.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    lote_parser = subparsers.add_parser("lote", help="Executar tarefas em vários blocos")
+    lote_parser.add_argument("blocos", help='IDs dos blocos, ex.: "55", "10-20,31"')
+    lote_parser.add_argument("--baixar", action="store_true", help="Baixar os ZIPs dos processos")
+    regra_anotacao = lote_parser.add_mutually_exclusive_group()
+    regra_anotacao.add_argument(
+        "--anotar", metavar="TEXTO", nargs="?", const="OK", help='Preencher as anotações com TEXTO (padrão: "OK")'
+    )
+    regra_anotacao.add_argument(
+        "--modelo", metavar="MODELO", help='Anotar com um modelo, ex.: "OK {seq}" (campos: numero, seq, tipo, anotacao)'
+    )
+    regra_anotacao.add_argument(
+        "--tabela", metavar="ARQUIVO", help="Anotar conforme um CSV (processo, anotacao) ou JSON {processo: texto}"
+    )
+    lote_parser.add_argument("--exportar", action="store_true", help="Exportar a relação de cada bloco")
+    lote_parser.add_argument("--formato", choices=FORMATOS, default="csv", help="Formato da exportação")
+    lote_parser.add_argument("--compressao", choices=COMPRESSOES, help="Compressão da exportação")
+    lote_parser.add_argument("--paralelos", type=int, default=3, help="Blocos processados ao mesmo tempo")
+    lote_parser.add_argument("--concurrency", type=int, default=2, help="Downloads/envios simultâneos por bloco")
+    lote_parser.add_argument("--resume", action="store_true", help="Retomar a execução interrompida de cada bloco")
+    lote_parser.add_argument("--dry-run", action="store_true", help="Apenas mostrar o plano de anotações")
+    lote_parser.add_argument("--login-manual", action="store_true", help="Abrir o navegador para login manual")
+    lote_parser.add_argument("--dev", action="store_true", help="Usar o servidor fake (modo desenvolvedor)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "lote":
+        try:
+            blocos = interpretar_blocos(args.blocos)
+        except ValueError as exc:
+            parser.error(str(exc))
+        try:
+            regra = regra_das_opcoes(args.anotar, modelo=args.modelo, tabela=args.tabela)
+        except (ValueError, OSError) as exc:
+            parser.error(str(exc))
+        if not (args.baixar or regra is not None or args.exportar):
+            parser.error("Escolha ao menos uma etapa: --baixar, --anotar/--modelo/--tabela ou --exportar.")
+        settings = Settings.load()
+        if args.dev:
+            settings = settings.with_dev_mode(True)
+        resultado = executar_lote(
+            settings,
+            blocos,
+            baixar=args.baixar,
+            regra=regra,
+            exportar=args.exportar,
+            paralelos=args.paralelos,
+            headless=not args.login_manual,
+            auto_credentials=not args.login_manual,
+            concurrency=args.concurrency,
+            dry_run=args.dry_run,
+            formato=args.formato,
+            compressao=args.compressao,
+            resume=args.resume,
+        )
+        return 1 if resultado.falhas else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import hashlib
 import os
 from dataclasses import dataclass, replace
 from pathlib import Path
@@ -10,6 +11,10 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+# ver `seiautomation.routing`
+PERFIS_ROTEAMENTO = ("minimal", "no-media", "full")
+
+
 @dataclass(slots=True, frozen=True)
 class Settings:
     username: str
@@ -20,6 +25,14 @@ class Settings:
     is_admin: bool
     dev_mode: bool
     dev_base_url: str
+    cache_dir: Path = Path.home() / ".seiautomation"
+    session_ttl_minutes: int = 480
+    wait_timeout_ms: int = 15000
+    max_requests_per_second: float = 4.0
+    routing_profile: str = "no-media"
+    recycle_after: int = 200
+    recycle_memory_mb: int = 0
+    trace_dir: Path | None = None
 
     @staticmethod
     def load() -> "Settings":
@@ -40,6 +53,17 @@ class Settings:
         dev_base_url = os.getenv("SEI_DEV_BASE_URL", "http://127.0.0.1:8001/sei/").strip()
         if dev_base_url:
             dev_base_url = dev_base_url.rstrip("/") + "/"
+        cache_dir = Path(os.getenv("SEI_CACHE_DIR", str(Path.home() / ".seiautomation"))).expanduser()
+        session_ttl_minutes = int(os.getenv("SEI_SESSION_TTL_MINUTES", "480"))
+        wait_timeout_ms = int(os.getenv("SEI_WAIT_TIMEOUT_MS", "15000"))
+        max_requests_per_second = float(os.getenv("SEI_MAX_REQUESTS_PER_SECOND", "4"))
+        routing_profile = os.getenv("SEI_ROUTING_PROFILE", "no-media").strip().lower()
+        recycle_after = int(os.getenv("SEI_RECYCLE_AFTER", "200"))
+        recycle_memory_mb = int(os.getenv("SEI_RECYCLE_MEMORY_MB", "0"))
+        trace_dir_env = os.getenv("SEI_TRACE_DIR", "").strip()
+        trace_dir = Path(trace_dir_env).expanduser() if trace_dir_env else None
+        if routing_profile not in PERFIS_ROTEAMENTO:
+            raise ValueError(f"SEI_ROUTING_PROFILE inválido: {routing_profile} (use {', '.join(PERFIS_ROTEAMENTO)})")
 
         return Settings(
             username=username,
@@ -50,12 +74,26 @@ class Settings:
             is_admin=is_admin,
             dev_mode=dev_mode,
             dev_base_url=dev_base_url,
+            cache_dir=cache_dir,
+            session_ttl_minutes=session_ttl_minutes,
+            wait_timeout_ms=wait_timeout_ms,
+            max_requests_per_second=max_requests_per_second,
+            routing_profile=routing_profile,
+            recycle_after=recycle_after,
+            recycle_memory_mb=recycle_memory_mb,
+            trace_dir=trace_dir,
         )
 
     @property
     def target_base_url(self) -> str:
         return self.dev_base_url if self.dev_mode and self.dev_base_url else self.base_url
 
+    @property
+    def cache_key(self) -> str:
+        """Identifica o par usuário/URL base nos caches locais."""
+        key = f"{self.username}|{self.target_base_url}".encode("utf-8")
+        return hashlib.sha256(key).hexdigest()[:16]
+
     def with_dev_mode(self, enabled: bool) -> "Settings":
         if enabled == self.dev_mode:
             return self
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import csv
+import gzip
+import io
+import json
+import os
+from pathlib import Path
+from typing import IO, Any, Sequence
+
+from .navigation import LinhaProcesso
+from .snapshots import ProcessoSnapshot
+
+COLUNAS = ("sequencia", "processo", "tipo", "anotacoes")
+# exportação incremental: "adicionado", "alterado" ou "removido" em relação ao snapshot anterior
+COLUNAS_INCREMENTAIS = (*COLUNAS, "mudanca")
+FORMATOS = ("csv", "jsonl", "parquet")
+COMPRESSOES = ("gzip", "zstd")
+
+_EXTENSOES = {"csv": ".csv", "jsonl": ".jsonl", "parquet": ".parquet"}
+_SUFIXOS = {"gzip": ".gz", "zstd": ".zst"}
+# linhas entre descargas para o disco (CSV/JSONL) e por row group (Parquet)
+_LOTE_TEXTO = 100
+_LOTE_PARQUET = 10_000
+
+
+def linha_da_relacao(registro: LinhaProcesso | ProcessoSnapshot, mudanca: str | None = None) -> dict[str, str]:
+    linha = {
+        "sequencia": registro.seq,
+        "processo": registro.numero,
+        "tipo": registro.tipo,
+        "anotacoes": registro.anotacao,
+    }
+    if mudanca is not None:
+        linha["mudanca"] = mudanca
+    return linha
+
+
+def validar_formato(formato: str, compressao: str | None) -> None:
+    """
+    Raises:
+        ValueError: formato ou compressão desconhecidos.
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato de exportação desconhecido: {formato}")
+    if compressao is not None and compressao not in COMPRESSOES:
+        raise ValueError(f"Compressão desconhecida: {compressao}")
+
+
+def nome_do_arquivo(base: Path, formato: str, compressao: str | None = None) -> Path:
+    """`base` + extensão do formato; CSV/JSONL comprimidos ganham `.gz`/`.zst` (no Parquet a compressão é interna)."""
+    nome = base.name + _EXTENSOES[formato]
+    if compressao and formato != "parquet":
+        nome += _SUFIXOS[compressao]
+    return base.with_name(nome)
+
+
+def pode_anexar(formato: str, compressao: str | None) -> bool:
+    """Formatos em que uma exportação interrompida pode ser continuada no mesmo arquivo."""
+    return formato in ("csv", "jsonl") and compressao is None
+
+
+def _abrir_binario(path: Path, compressao: str | None) -> IO[bytes]:
+    if compressao == "gzip":
+        return gzip.open(path, "wb")
+    if compressao == "zstd":
+        try:
+            import zstandard
+        except ImportError as exc:
+            raise RuntimeError("Compressão zstd requer o pacote 'zstandard' (pip install zstandard).") from exc
+        return zstandard.ZstdCompressor().stream_writer(path.open("wb"), closefd=True)
+    return path.open("wb")
+
+
+class EscritorRelacao:
+    """
+    Grava as linhas da relação à medida que são lidas, sem acumular o bloco em memória.
+
+    CSV e JSON Lines são escritos direto no arquivo final e descarregados a cada
+    `_LOTE_TEXTO` linhas: se a execução cair, o que já foi lido fica no disco.
+    O Parquet só é legível com o rodapé, então é gravado em `.<nome>.part` e
+    renomeado ao fechar.
+
+    Com `anexar=True` (retomada de uma exportação interrompida), as linhas são
+    acrescentadas ao arquivo existente, sem repetir o cabeçalho.
+
+    Raises:
+        ValueError: `anexar` com Parquet ou compressão (o arquivo não pode ser continuado).
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        formato: str,
+        compressao: str | None = None,
+        *,
+        colunas: Sequence[str] = COLUNAS,
+        anexar: bool = False,
+    ) -> None:
+        validar_formato(formato, compressao)
+        if anexar and not pode_anexar(formato, compressao):
+            raise ValueError("Só é possível continuar exportações CSV ou JSON Lines sem compressão.")
+        self.path = path
+        self.formato = formato
+        self.linhas = 0
+        self._pendentes: list[dict[str, str]] = []
+        self._texto: io.TextIOWrapper | None = None
+        self._csv: csv.DictWriter | None = None
+        self._parquet: Any = None
+        if formato == "parquet":
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError as exc:
+                raise RuntimeError("Exportação em Parquet requer o pacote 'pyarrow' (pip install pyarrow).") from exc
+            self._pa = pa
+            self._temporario = path.with_name(f".{path.name}.part")
+            schema = pa.schema([(coluna, pa.string()) for coluna in colunas])
+            self._parquet = pq.ParquetWriter(self._temporario, schema, compression=compressao or "snappy")
+        else:
+            binario = path.open("ab") if anexar else _abrir_binario(path, compressao)
+            self._texto = io.TextIOWrapper(binario, encoding="utf-8", newline="")
+            if formato == "csv":
+                self._csv = csv.DictWriter(self._texto, fieldnames=list(colunas))
+                if not anexar:
+                    self._csv.writeheader()
+
+    def escrever(self, linha: dict[str, str]) -> None:
+        self.linhas += 1
+        if self._csv is not None:
+            self._csv.writerow(linha)
+        elif self._texto is not None:
+            self._texto.write(json.dumps(linha, ensure_ascii=False) + "\n")
+        else:
+            self._pendentes.append(linha)
+        lote = _LOTE_PARQUET if self._parquet is not None else _LOTE_TEXTO
+        if self.linhas % lote == 0:
+            self.descarregar()
+
+    def descarregar(self) -> None:
+        if self._texto is not None:
+            self._texto.flush()
+        elif self._pendentes:
+            tabela = self._pa.Table.from_pylist(self._pendentes, schema=self._parquet.schema)
+            self._parquet.write_table(tabela)
+            self._pendentes.clear()
+
+    def close(self) -> None:
+        if self._texto is not None:
+            self._texto.close()
+            self._texto = None
+        elif self._parquet is not None:
+            self.descarregar()
+            self._parquet.close()
+            self._parquet = None
+            os.replace(self._temporario, self.path)
+
+    def __enter__(self) -> "EscritorRelacao":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
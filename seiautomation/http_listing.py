@@ -0,0 +1,387 @@
+from __future__ import annotations
+
+import gzip
+import http.client
+import queue
+import threading
+from dataclasses import dataclass, replace
+from html.parser import HTMLParser
+from http.cookies import SimpleCookie
+from typing import Callable, Iterable, Iterator
+from urllib.parse import urlencode, urljoin, urlparse
+
+from .config import Settings
+from .navigation import LinhaProcesso
+from .progress import PaginaLida, emitir
+from .session_cache import carregar_sessao
+
+ProgressFn = Callable[[str], None] | None
+
+_USER_AGENT = "Mozilla/5.0 (SEIAutomation)"
+
+
+def _log(message: str, progress: ProgressFn) -> None:
+    if progress:
+        progress(message)
+    else:
+        print(message)
+
+
+class SessaoExpiradaError(RuntimeError):
+    """O SEI redirecionou para a tela de login: os cookies não são mais válidos."""
+
+
+@dataclass(slots=True)
+class HttpResponse:
+    url: str
+    status: int
+    headers: dict[str, str]
+    body: bytes
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+    @property
+    def text(self) -> str:
+        content_type = self.headers.get("content-type", "")
+        charset = None
+        for parte in content_type.split(";"):
+            chave, _, valor = parte.strip().partition("=")
+            if chave.lower() == "charset" and valor:
+                charset = valor.strip('"')
+        try:
+            return self.body.decode(charset or "utf-8")
+        except (LookupError, UnicodeDecodeError):
+            return self.body.decode("iso-8859-1")
+
+
+class HttpClient:
+    """
+    Cliente HTTP mínimo com conexões keep-alive reutilizadas por host.
+
+    Pode ser compartilhado entre threads: cada requisição pega uma conexão do
+    pool do host e a devolve ao terminar.
+
+    Args:
+        cookies: cookies no formato do Playwright (`context.cookies()` / storage_state).
+        max_connections: conexões mantidas abertas por host.
+    """
+
+    def __init__(
+        self,
+        cookies: Iterable[dict] = (),
+        *,
+        max_connections: int = 4,
+        timeout: float = 30.0,
+    ) -> None:
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._cookies: dict[str, str] = {}
+        self._cookie_domains: dict[str, str] = {}
+        for cookie in cookies:
+            self._cookies[cookie["name"]] = cookie["value"]
+            self._cookie_domains[cookie["name"]] = cookie.get("domain", "").lstrip(".")
+        self._pools: dict[tuple[str, str, int], queue.LifoQueue[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+
+    def _pool(self, chave: tuple[str, str, int]) -> queue.LifoQueue[http.client.HTTPConnection]:
+        with self._lock:
+            return self._pools.setdefault(chave, queue.LifoQueue(maxsize=self.max_connections))
+
+    def _conexao(self, chave: tuple[str, str, int]) -> http.client.HTTPConnection:
+        try:
+            return self._pool(chave).get_nowait()
+        except queue.Empty:
+            scheme, host, port = chave
+            if scheme == "https":
+                return http.client.HTTPSConnection(host, port, timeout=self.timeout)
+            return http.client.HTTPConnection(host, port, timeout=self.timeout)
+
+    def _devolver(self, chave: tuple[str, str, int], conexao: http.client.HTTPConnection) -> None:
+        try:
+            self._pool(chave).put_nowait(conexao)
+        except queue.Full:
+            conexao.close()
+
+    def _cookie_header(self, host: str) -> str:
+        with self._lock:
+            itens = [
+                f"{nome}={valor}"
+                for nome, valor in self._cookies.items()
+                if not self._cookie_domains.get(nome) or host.endswith(self._cookie_domains[nome])
+            ]
+        return "; ".join(itens)
+
+    def _guardar_cookies(self, host: str, valores: list[str]) -> None:
+        with self._lock:
+            for valor in valores:
+                cookie = SimpleCookie()
+                try:
+                    cookie.load(valor)
+                except Exception:  # noqa: BLE001
+                    continue
+                for nome, morsel in cookie.items():
+                    self._cookies[nome] = morsel.value
+                    self._cookie_domains[nome] = (morsel["domain"] or host).lstrip(".")
+
+    def _enviar(self, method: str, url: str, body: bytes | None, headers: dict[str, str]) -> HttpResponse:
+        parsed = urlparse(url)
+        scheme = parsed.scheme or "http"
+        host = parsed.hostname or ""
+        chave = (scheme, host, parsed.port or (443 if scheme == "https" else 80))
+        path = parsed.path or "/"
+        if parsed.query:
+            path += "?" + parsed.query
+
+        enviados = {
+            "User-Agent": _USER_AGENT,
+            "Accept-Encoding": "gzip",
+            "Connection": "keep-alive",
+            **headers,
+        }
+        cookie_header = self._cookie_header(host)
+        if cookie_header:
+            enviados["Cookie"] = cookie_header
+
+        for tentativa in range(2):
+            conexao = self._conexao(chave)
+            try:
+                conexao.request(method, path, body=body, headers=enviados)
+                resposta = conexao.getresponse()
+                dados = resposta.read()
+            except (http.client.HTTPException, OSError):
+                conexao.close()
+                if tentativa:
+                    raise
+                continue  # conexão keep-alive encerrada pelo servidor; tenta com uma nova
+            response_headers = {nome.lower(): valor for nome, valor in resposta.getheaders()}
+            self._guardar_cookies(host, resposta.headers.get_all("Set-Cookie") or [])
+            if resposta.will_close:
+                conexao.close()
+            else:
+                self._devolver(chave, conexao)
+            if response_headers.get("content-encoding") == "gzip":
+                dados = gzip.decompress(dados)
+            return HttpResponse(url=url, status=resposta.status, headers=response_headers, body=dados)
+        raise RuntimeError("unreachable")
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        body: bytes | None = None,
+        headers: dict[str, str] | None = None,
+        max_redirects: int = 5,
+    ) -> HttpResponse:
+        headers = dict(headers or {})
+        for _ in range(max_redirects + 1):
+            response = self._enviar(method, url, body, headers)
+            if response.status not in {301, 302, 303, 307, 308} or "location" not in response.headers:
+                return response
+            url = urljoin(url, response.headers["location"])
+            if response.status in {301, 302, 303}:
+                method, body = "GET", None
+                headers.pop("Content-Type", None)
+        return response
+
+    def get(self, url: str, **kwargs) -> HttpResponse:
+        return self.request("GET", url, **kwargs)
+
+    def post_form(self, url: str, campos: dict[str, str], **kwargs) -> HttpResponse:
+        headers = {"Content-Type": "application/x-www-form-urlencoded", **kwargs.pop("headers", {})}
+        return self.request("POST", url, body=urlencode(campos).encode("utf-8"), headers=headers, **kwargs)
+
+    def close(self) -> None:
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for pool in pools:
+            while True:
+                try:
+                    pool.get_nowait().close()
+                except queue.Empty:
+                    break
+
+
+class _ListagemParser(HTMLParser):
+    """Extrai de uma página `rel_bloco_protocolo_listar` as mesmas colunas de `EXTRAIR_LINHAS_JS`."""
+
+    def __init__(self, base_url: str) -> None:
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.linhas: list[LinhaProcesso] = []
+        self.proxima: dict[str, str] | None = None
+        self.formularios: list[dict] = []
+        self._indice = -1
+        self._celulas: list[list[str]] | None = None
+        self._hrefs: list[str] = []
+        self._em_td = False
+        self._link: dict[str, str] | None = None
+        self._texto_link: list[str] = []
+        self._form: dict | None = None
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        atributos = {chave: valor or "" for chave, valor in attrs}
+        if tag == "tr":
+            self._fechar_linha()
+            self._indice += 1
+            self._celulas = []
+            self._hrefs = []
+        elif tag == "td" and self._celulas is not None:
+            self._celulas.append([])
+            self._hrefs.append("")
+            self._em_td = True
+        elif tag == "br" and self._em_td and self._celulas:
+            self._celulas[-1].append("\n")
+        elif tag == "a":
+            self._link = atributos
+            self._texto_link = []
+            if self._em_td and self._hrefs and not self._hrefs[-1] and atributos.get("href"):
+                self._hrefs[-1] = urljoin(self.base_url, atributos["href"])
+        elif tag == "form":
+            self._form = {"action": urljoin(self.base_url, atributos.get("action", "")), "campos": {}}
+            self.formularios.append(self._form)
+        elif tag == "input" and self._form is not None and atributos.get("name"):
+            if atributos.get("type", "text").lower() not in {"checkbox", "radio", "submit", "button", "image"}:
+                self._form["campos"][atributos["name"]] = atributos.get("value", "")
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "td":
+            self._em_td = False
+        elif tag == "tr":
+            self._fechar_linha()
+        elif tag == "table":
+            self._fechar_linha()
+        elif tag == "a" and self._link is not None:
+            texto = "".join(self._texto_link).strip()
+            if "Próxima" in texto or "Próxima" in self._link.get("title", ""):
+                self.proxima = {**self._link, "texto": texto}
+            self._link = None
+        elif tag == "form":
+            self._form = None
+
+    def handle_data(self, data: str) -> None:
+        if self._em_td and self._celulas:
+            self._celulas[-1].append(data)
+        if self._link is not None:
+            self._texto_link.append(data)
+
+    def _fechar_linha(self) -> None:
+        if self._celulas is None:
+            return
+        textos = [" ".join("".join(partes).split()) for partes in self._celulas]
+
+        def texto(i: int) -> str:
+            return textos[i] if i < len(textos) else ""
+
+        if self._indice > 0:
+            self.linhas.append(
+                LinhaProcesso(
+                    indice=self._indice,
+                    seq=texto(1),
+                    numero=texto(2),
+                    tipo=texto(3),
+                    anotacao=texto(4),
+                    href=self._hrefs[2] if len(self._hrefs) > 2 else "",
+                )
+            )
+        self._celulas = None
+        self._em_td = False
+
+    def close(self) -> None:
+        super().close()
+        self._fechar_linha()
+
+
+def eh_pagina_de_login(response: HttpResponse) -> bool:
+    """Indica se o SEI devolveu a tela de login (sessão expirada) em vez da página pedida."""
+    return "procedimento_controlar" in response.url or 'id="txtUsuario"' in response.text
+
+
+def _salto_requisicao(parser: _ListagemParser, url_atual: str, paginas: int) -> tuple[str, dict[str, str]] | None:
+    """Requisição que avança `paginas` páginas de uma vez pelo campo de paginação do SEI, se ele existir."""
+    for form in parser.formularios:
+        campos = form["campos"]
+        if "hdnInfraPaginaAtual" in campos:
+            try:
+                atual = int(campos["hdnInfraPaginaAtual"] or 0)
+            except ValueError:
+                return None
+            return form["action"] or url_atual, {**campos, "hdnInfraPaginaAtual": str(atual + paginas)}
+    return None
+
+
+def _proxima_requisicao(parser: _ListagemParser, url_atual: str) -> tuple[str, dict[str, str] | None] | None:
+    proxima = parser.proxima
+    if proxima is None:
+        return None
+    classes = proxima.get("class", "")
+    if "Des" in classes or "disabled" in classes.lower():
+        return None
+    href = proxima.get("href", "")
+    if href and href != "#" and not href.lower().startswith("javascript:"):
+        return urljoin(url_atual, href), None
+    # paginação do framework infra: o link apenas altera hdnInfraPaginaAtual e submete o formulário
+    return _salto_requisicao(parser, url_atual, 1)
+
+
+def iterar_registros_http(
+    client: HttpClient, url: str, progress: ProgressFn = None, *, pagina_inicial: int = 1
+) -> Iterator[LinhaProcesso]:
+    """
+    Equivalente de `navigation.iterar_registros` sem navegador: baixa e interpreta
+    as páginas da relação do bloco, seguindo a paginação.
+
+    Com `pagina_inicial`, salta direto para essa página quando o SEI usa o campo
+    de paginação; senão percorre as anteriores sem produzir os registros delas.
+
+    Raises:
+        SessaoExpiradaError: se o SEI devolver a tela de login.
+    """
+    visited_numbers: set[str] = set()
+    page_index = 1
+    requisicao: tuple[str, dict[str, str] | None] | None = (url, None)
+    while requisicao is not None:
+        pulando = page_index < pagina_inicial
+        _log(f"{'Pulando' if pulando else 'Processando'} página {page_index} (HTTP)…", progress)
+        destino, campos = requisicao
+        response = client.get(destino) if campos is None else client.post_form(destino, campos)
+        if eh_pagina_de_login(response):
+            raise SessaoExpiradaError("O SEI solicitou novo login ao listar o bloco.")
+        if not response.ok:
+            raise RuntimeError(f"Falha HTTP {response.status} ao listar o bloco.")
+
+        parser = _ListagemParser(response.url)
+        parser.feed(response.text)
+        parser.close()
+
+        if pulando:
+            if page_index == 1 and (salto := _salto_requisicao(parser, response.url, pagina_inicial - 1)):
+                requisicao, page_index = salto, pagina_inicial
+            else:
+                requisicao, page_index = _proxima_requisicao(parser, response.url), page_index + 1
+            continue
+
+        emitir(PaginaLida(page_index, len(parser.linhas)))
+        page_has_new = False
+        for registro in parser.linhas:
+            if not registro.numero or registro.numero in visited_numbers:
+                continue
+            visited_numbers.add(registro.numero)
+            page_has_new = True
+            yield replace(registro, pagina=page_index)
+
+        if not page_has_new:
+            break
+        requisicao = _proxima_requisicao(parser, response.url)
+        page_index += 1
+
+
+def cliente_da_sessao_salva(settings: Settings) -> HttpClient | None:
+    """Cria um cliente com os cookies da sessão salva, sem abrir o navegador."""
+    data = carregar_sessao(settings)
+    if not data:
+        return None
+    return HttpClient(data.get("storage_state", {}).get("cookies", []))
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from .zip_storage import zip_valido
+
+
+MANIFEST_FILENAME = ".seiautomation-manifest.sqlite3"
+
+
+def sanitizar_numero(numero: str) -> str:
+    return numero.replace("/", "_").replace(".", "_").replace("-", "_")
+
+
+@dataclass(slots=True, frozen=True)
+class EntradaManifesto:
+    sanitizado: str
+    numero: str
+    arquivo: str
+    tamanho: int
+    sha256: str | None
+    baixado_em: float
+    bloco_id: int | None = None
+
+
+class DownloadManifest:
+    """
+    Registro persistente (SQLite) dos ZIPs salvos em `download_dir`.
+
+    Carregado uma vez por execução em memória, de modo que a verificação
+    "já baixado?" é uma consulta O(1) em vez de listar a pasta a cada processo.
+    Cada gravação é uma transação própria, então uma execução interrompida não
+    deixa o manifesto inconsistente.
+    """
+
+    def __init__(self, download_dir: Path) -> None:
+        self.download_dir = download_dir
+        self.path = download_dir / MANIFEST_FILENAME
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS downloads (
+                sanitizado TEXT PRIMARY KEY,
+                numero TEXT NOT NULL,
+                arquivo TEXT NOT NULL,
+                tamanho INTEGER NOT NULL,
+                sha256 TEXT,
+                baixado_em REAL NOT NULL,
+                bloco_id INTEGER
+            )
+            """
+        )
+        self._entradas: dict[str, EntradaManifesto] = {
+            row[0]: EntradaManifesto(*row)
+            for row in self._conn.execute(
+                "SELECT sanitizado, numero, arquivo, tamanho, sha256, baixado_em, bloco_id FROM downloads"
+            )
+        }
+        self._legados = self._indexar_legados()
+
+    def _indexar_legados(self) -> dict[str, str]:
+        """
+        Indexa, com uma única listagem da pasta, ZIPs que ainda não estão no
+        manifesto (ex.: baixados por versões anteriores).
+
+        Os nomes seguem "<número sanitizado>_<nome sugerido>.zip"; como o número
+        sanitizado também contém "_", cada prefixo possível aponta para o arquivo.
+        """
+        conhecidos = {entrada.arquivo for entrada in self._entradas.values()}
+        legados: dict[str, str] = {}
+        for entry in os.scandir(self.download_dir):
+            if not entry.name.endswith(".zip") or entry.name in conhecidos or not entry.is_file():
+                continue
+            partes = entry.name.split("_")
+            for fim in range(1, len(partes)):
+                legados.setdefault("_".join(partes[:fim]), entry.name)
+        return legados
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    def __contains__(self, numero: str) -> bool:
+        return self.obter(numero) is not None
+
+    def obter(self, numero: str) -> EntradaManifesto | None:
+        """Entrada do processo, desde que o arquivo ainda exista com o tamanho registrado."""
+        sanitizado = sanitizar_numero(numero)
+        entrada = self._entradas.get(sanitizado)
+        if entrada is None:
+            legado = self._legados.pop(sanitizado, None)
+            # ZIPs antigos foram gravados sem verificação: um arquivo truncado não conta como baixado
+            if legado is None or not zip_valido(self.download_dir / legado):
+                return None
+            return self.registrar(numero, legado)
+        try:
+            tamanho = (self.download_dir / entrada.arquivo).stat().st_size
+        except FileNotFoundError:
+            self.remover(numero)
+            return None
+        if tamanho != entrada.tamanho:
+            return None
+        return entrada
+
+    def registrar(
+        self,
+        numero: str,
+        arquivo: str,
+        *,
+        tamanho: int | None = None,
+        sha256: str | None = None,
+        baixado_em: float | None = None,
+        bloco_id: int | None = None,
+    ) -> EntradaManifesto:
+        if tamanho is None:
+            tamanho = (self.download_dir / arquivo).stat().st_size
+        entrada = EntradaManifesto(
+            sanitizado=sanitizar_numero(numero),
+            numero=numero,
+            arquivo=arquivo,
+            tamanho=tamanho,
+            sha256=sha256,
+            baixado_em=baixado_em if baixado_em is not None else time.time(),
+            bloco_id=bloco_id,
+        )
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO downloads VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    entrada.sanitizado,
+                    entrada.numero,
+                    entrada.arquivo,
+                    entrada.tamanho,
+                    entrada.sha256,
+                    entrada.baixado_em,
+                    entrada.bloco_id,
+                ),
+            )
+            self._entradas[entrada.sanitizado] = entrada
+        return entrada
+
+    def remover(self, numero: str) -> None:
+        sanitizado = sanitizar_numero(numero)
+        with self._lock:
+            self._conn.execute("DELETE FROM downloads WHERE sanitizado = ?", (sanitizado,))
+            self._entradas.pop(sanitizado, None)
+
+    def entradas(self, bloco_id: int | None = None) -> list[EntradaManifesto]:
+        with self._lock:
+            itens = list(self._entradas.values())
+        if bloco_id is not None:
+            itens = [entrada for entrada in itens if entrada.bloco_id == bloco_id]
+        return sorted(itens, key=lambda entrada: entrada.baixado_em)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> "DownloadManifest":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -1,11 +1,107 @@
 from __future__ import annotations
 
 import time
-from typing import Callable, Tuple
+from dataclasses import dataclass
+from typing import Callable, Iterator, Tuple
 
-from playwright.sync_api import Page, TimeoutError as PlaywrightTimeoutError
+from playwright.sync_api import Locator, Page, TimeoutError as PlaywrightTimeoutError
 
+from . import bloco_index
 from .config import Settings
+from .progress import PaginaLida, emitir
+from .routing import instalar_roteamento
+from .session_cache import aplicar_sessao, descartar_sessao, salvar_sessao
+from .throttle import regular
+from .timing import medir, registrar_desde
+
+
+PROXIMA_PAGINA_SELECTOR = "a[title*='Próxima'], a:has-text('Próxima'), a:has-text('Próximo')"
+DEFAULT_WAIT_TIMEOUT_MS = 15000
+
+# Assinatura da página atual (números dos processos) usada para detectar a troca de página.
+ASSINATURA_TABELA_JS = """
+() => Array.from(document.querySelectorAll("table tr td:nth-child(3)")).map((td) => td.innerText.trim()).join("|")
+"""
+TABELA_MUDOU_JS = """
+(anterior) => {
+    const atual = Array.from(document.querySelectorAll("table tr td:nth-child(3)"))
+        .map((td) => td.innerText.trim())
+        .join("|");
+    return atual !== "" && atual !== anterior;
+}
+"""
+
+# Lê toda a grade `table tr` em uma única chamada ao navegador.
+EXTRAIR_LINHAS_JS = """
+() => Array.from(document.querySelectorAll("table tr")).map((tr, indice) => {
+    const tds = tr.querySelectorAll("td");
+    const texto = (i) => (tds[i] ? tds[i].innerText.trim() : "");
+    const link = tds[2] ? tds[2].querySelector("a") : null;
+    return {
+        indice: indice,
+        seq: texto(1),
+        numero: texto(2),
+        tipo: texto(3),
+        anotacao: texto(4),
+        href: link ? link.href : "",
+    };
+})
+"""
+
+# Total de processos informado na legenda da tabela ("Lista de Processos (N registros):").
+TOTAL_REGISTROS_JS = """
+() => {
+    const legenda = document.querySelector("table caption");
+    const achado = legenda ? legenda.innerText.match(/(\\d+)\\s+registro/) : null;
+    return achado ? parseInt(achado[1], 10) : null;
+}
+"""
+
+
+# Paginação do framework infra: a página atual fica em hdnInfraPaginaAtual e os links só submetem o formulário.
+PAGINA_INFRA_JS = """
+() => {
+    const campo = document.querySelector("input[name='hdnInfraPaginaAtual']");
+    return campo && campo.form ? parseInt(campo.value || "0", 10) : null;
+}
+"""
+IR_PARA_PAGINA_JS = """
+(valor) => {
+    const campo = document.querySelector("input[name='hdnInfraPaginaAtual']");
+    campo.value = String(valor);
+    campo.form.submit();
+}
+"""
+
+
+@dataclass(slots=True, frozen=True)
+class LinhaProcesso:
+    """Dados de uma linha da relação do bloco, lidos em lote (sem manter o DOM)."""
+
+    indice: int
+    seq: str
+    numero: str
+    tipo: str
+    anotacao: str
+    href: str
+    # página da relação em que a linha foi lida (1 = primeira)
+    pagina: int = 1
+
+    def row(self, page) -> Locator:
+        """Locator da linha viva na página atual, para interagir com ela."""
+        return page.locator("table tr").nth(self.indice)
+
+
+def linhas_de_dados(brutas: list[dict], pagina: int = 1) -> list[LinhaProcesso]:
+    return [LinhaProcesso(**dados, pagina=pagina) for dados in brutas if dados["indice"] > 0]
+
+
+def login_url(settings: Settings) -> str:
+    return f"{settings.target_base_url}controlador.php?acao=procedimento_controlar&id_procedimento=0"
+
+
+def base_host(settings: Settings) -> str:
+    return settings.target_base_url.split("//", 1)[-1].split("/", 1)[0]
 
 
 def _log(message: str, progress: Callable[[str], None] | None) -> None:
@@ -25,19 +121,33 @@ def _select_active_page(page: Page, base_host: str) -> Tuple[Page, bool]:
     return page, False
 
 
-def login_and_open_bloco(
+def _restaurar_sessao(page: Page, settings: Settings, progress: Callable[[str], None] | None) -> bool:
+    home_url = aplicar_sessao(page.context, settings)
+    if not home_url:
+        return False
+    _log("Reutilizando sessão autenticada salva…", progress)
+    try:
+        page.goto(home_url, wait_until="domcontentloaded")
+    except PlaywrightTimeoutError:
+        pass
+    if "infra_unidade_atual" in (page.url or "") and page.locator("#txtUsuario").count() == 0:
+        return True
+    _log("Sessão salva rejeitada pelo SEI; efetuando novo login…", progress)
+    descartar_sessao(settings)
+    page.context.clear_cookies()
+    return False
+
+
+def _efetuar_login(
     page: Page,
     settings: Settings,
-    bloco_id: int,
     *,
-    progress: Callable[[str], None] | None = None,
-    auto_credentials: bool = True,
-) -> None:
-    base = settings.target_base_url
-    login_url = f"{base}controlador.php?acao=procedimento_controlar&id_procedimento=0"
-    base_host = settings.target_base_url.split("//", 1)[-1].split("/", 1)[0]
+    progress: Callable[[str], None] | None,
+    auto_credentials: bool,
+) -> Page:
+    host = base_host(settings)
     _log("Acessando página de login…", progress)
-    page.goto(login_url, wait_until="domcontentloaded")
+    page.goto(login_url(settings), wait_until="domcontentloaded")
     if auto_credentials:
         _log("Efetuando login automático…", progress)
         page.fill("#txtUsuario", settings.username)
@@ -53,7 +163,7 @@ def login_and_open_bloco(
         active_page = page
         manual_detected = False
         while time.time() < deadline:
-            active_page, switched = _select_active_page(active_page, base_host)
+            active_page, switched = _select_active_page(active_page, host)
             if switched:
                 page = active_page
             url = active_page.url or ""
@@ -65,7 +175,8 @@ def login_and_open_bloco(
             raise PlaywrightTimeoutError("Timeout aguardando conclusão do login manual.")
     else:
         try:
-            page.wait_for_url("**infra_unidade_atual**", timeout=wait_timeout, wait_until="domcontentloaded")
+            with medir("login"):
+                page.wait_for_url("**infra_unidade_atual**", timeout=wait_timeout, wait_until="domcontentloaded")
         except PlaywrightTimeoutError as exc:
             if "infra_unidade_atual" not in page.url:
                 raise exc
@@ -75,61 +186,213 @@ def login_and_open_bloco(
             )
 
     if page.is_closed():
-        page, _ = _select_active_page(page, base_host)
+        page, _ = _select_active_page(page, host)
+    return page
 
-    page.bring_to_front()
 
-    _log("Abrindo menu Blocos › Internos…", progress)
-    page.locator("a:has-text('Blocos')").first.click()
-    page.wait_for_timeout(300)
-    page.locator("a:has-text('Internos')").first.click()
-    page.wait_for_url("**acao=bloco_interno_listar**")
+def garantir_login(
+    page: Page,
+    settings: Settings,
+    *,
+    progress: Callable[[str], None] | None = None,
+    auto_credentials: bool = True,
+    reuse_session: bool = True,
+) -> Page:
+    """
+    Autentica a página, reaproveitando a sessão salva quando possível. Antes,
+    aplica ao contexto o perfil de roteamento (`SEI_ROUTING_PROFILE`).
 
-    bloco_link = page.locator("tr", has_text=str(bloco_id)).locator("a", has_text=str(bloco_id)).first
-    if bloco_link.count() == 0:
-        raise RuntimeError(f"Bloco {bloco_id} não encontrado na lista.")
+    Returns:
+        Página ativa após o login (pode mudar durante o login manual).
+    """
+    instalar_roteamento(page.context, settings)
+    if reuse_session and _restaurar_sessao(page, settings, progress):
+        return page
+    page = _efetuar_login(page, settings, progress=progress, auto_credentials=auto_credentials)
+    if reuse_session:
+        salvar_sessao(settings, page.context, page.url)
+    return page
 
-    _log(f"Abrindo bloco {bloco_id}…", progress)
-    bloco_link.click()
-    page.wait_for_url(f"**id_bloco={bloco_id}**")
-    page.wait_for_selector("table tr:nth-child(2)")
 
+def _abrir_bloco_direto(page: Page, url: str, bloco_id: int, timeout: int) -> bool:
+    try:
+        with regular("navegacao"), medir("abrir_bloco_direto"):
+            response = page.goto(url, wait_until="domcontentloaded", timeout=timeout)
+            if response is not None and not response.ok:
+                return False
+            if f"id_bloco={bloco_id}" not in (page.url or "") or page.locator("#txtUsuario").count():
+                return False
+            page.wait_for_selector("table tr:nth-child(2)", timeout=timeout)
+    except PlaywrightTimeoutError:
+        return False
+    return True
 
-def iterar_paginas(page: Page, progress: Callable[[str], None] | None = None):
+
+def login_and_open_bloco(
+    page: Page,
+    settings: Settings,
+    bloco_id: int,
+    *,
+    progress: Callable[[str], None] | None = None,
+    auto_credentials: bool = True,
+    reuse_session: bool = True,
+    use_bloco_index: bool = True,
+) -> None:
+    with medir("login_e_abertura_bloco"):
+        page = garantir_login(
+            page,
+            settings,
+            progress=progress,
+            auto_credentials=auto_credentials,
+            reuse_session=reuse_session,
+        )
+        page.bring_to_front()
+
+        timeout = settings.wait_timeout_ms
+        url_direta = bloco_index.url_do_bloco(settings, bloco_id) if use_bloco_index else None
+        if url_direta:
+            _log(f"Abrindo bloco {bloco_id} diretamente…", progress)
+            if _abrir_bloco_direto(page, url_direta, bloco_id, timeout):
+                return
+            _log("Link salvo do bloco foi rejeitado; voltando ao menu Blocos › Internos.", progress)
+            bloco_index.invalidar(settings, bloco_id)
+
+        _log("Abrindo menu Blocos › Internos…", progress)
+        page.locator("a:has-text('Blocos')").first.click()
+        internos = page.locator("a:has-text('Internos')").first
+        with medir("menu_internos"):
+            internos.wait_for(state="visible", timeout=timeout)
+        internos.click()
+        with medir("lista_blocos"):
+            page.wait_for_url("**acao=bloco_interno_listar**", timeout=timeout)
+        if use_bloco_index:
+            bloco_index.registrar_links(settings, page.evaluate(bloco_index.LINKS_BLOCOS_JS))
+
+        bloco_link = page.locator("tr", has_text=str(bloco_id)).locator("a", has_text=str(bloco_id)).first
+        if bloco_link.count() == 0:
+            raise RuntimeError(f"Bloco {bloco_id} não encontrado na lista.")
+
+        _log(f"Abrindo bloco {bloco_id}…", progress)
+        with regular("navegacao"):
+            bloco_link.click()
+            with medir("abrir_bloco"):
+                page.wait_for_url(f"**id_bloco={bloco_id}**", timeout=timeout)
+                page.wait_for_selector("table tr:nth-child(2)", timeout=timeout)
+
+
+def extrair_linhas(page: Page, pagina: int = 1) -> list[LinhaProcesso]:
+    return linhas_de_dados(page.evaluate(EXTRAIR_LINHAS_JS), pagina)
+
+
+def total_registros(page: Page) -> int | None:
+    """Total de processos do bloco segundo a legenda da tabela, ou None se ela não existir."""
+    return page.evaluate(TOTAL_REGISTROS_JS)
+
+
+def _avancar_pagina(page: Page, next_button: Locator, wait_timeout_ms: int, progress) -> None:
+    assinatura = page.evaluate(ASSINATURA_TABELA_JS)
+    with regular("navegacao"):
+        next_button.click()
+        with medir("proxima_pagina"):
+            try:
+                page.wait_for_function(TABELA_MUDOU_JS, arg=assinatura, timeout=wait_timeout_ms)
+            except PlaywrightTimeoutError:
+                _log(f"Aviso: a tabela não mudou em {wait_timeout_ms} ms após avançar a página.", progress)
+
+
+def _botao_proxima(page: Page) -> Locator | None:
+    next_button = page.locator(PROXIMA_PAGINA_SELECTOR).filter(has_text="Próxima")
+    if next_button.count() == 0:
+        return None
+    classes = next_button.first.get_attribute("class") or ""
+    if "Des" in classes or "disabled" in classes.lower():
+        return None
+    return next_button.first
+
+
+def _ir_para_pagina(page: Page, pagina: int, wait_timeout_ms: int, progress) -> int:
+    """
+    Vai da primeira página direto para `pagina`, sem ler as intermediárias: pelo
+    campo de paginação do SEI quando ele existe; senão avançando página a página
+    sem extrair as linhas.
+
+    Returns:
+        A página alcançada (menor que `pagina` se o bloco tiver menos páginas).
+    """
+    _log(f"Retomando a partir da página {pagina}…", progress)
+    base = page.evaluate(PAGINA_INFRA_JS)
+    if base is not None:
+        with regular("navegacao"), medir("saltar_pagina"):
+            with page.expect_navigation(wait_until="domcontentloaded", timeout=wait_timeout_ms):
+                page.evaluate(IR_PARA_PAGINA_JS, base + pagina - 1)
+            page.wait_for_selector("table tr:nth-child(2)", timeout=wait_timeout_ms)
+        atual = page.evaluate(PAGINA_INFRA_JS)
+        return pagina if atual is None else atual - base + 1
+
+    atual = 1
+    while atual < pagina and (next_button := _botao_proxima(page)) is not None:
+        _avancar_pagina(page, next_button, wait_timeout_ms, progress)
+        atual += 1
+    return atual
+
+
+def iterar_registros(
+    page: Page,
+    progress: Callable[[str], None] | None = None,
+    *,
+    wait_timeout_ms: int = DEFAULT_WAIT_TIMEOUT_MS,
+    pagina_inicial: int = 1,
+) -> Iterator[LinhaProcesso]:
+    """
+    Percorre todas as páginas do bloco com uma leitura em lote por página.
+
+    Os registros de cada página são produzidos enquanto ela está aberta, então
+    `registro.row(page)` aponta para a linha viva. A troca de página espera a
+    tabela mudar de conteúdo (no máximo `wait_timeout_ms`).
+
+    Com `pagina_inicial`, as páginas anteriores não são lidas (retomada de uma execução interrompida).
+    """
     visited_numbers: set[str] = set()
     page_index = 1
+    if pagina_inicial > 1:
+        page_index = _ir_para_pagina(page, pagina_inicial, wait_timeout_ms, progress)
     while True:
         _log(f"Processando página {page_index}…", progress)
-        rows = page.locator("table tr")
-        row_count = rows.count()
-        if row_count <= 1:
+        inicio_pagina = time.perf_counter()
+        with medir("leitura_pagina"):
+            registros = extrair_linhas(page, page_index)
+        if not registros:
             break
+        emitir(PaginaLida(page_index, len(registros)))
 
         page_has_new = False
-        for idx in range(1, row_count):
-            row = rows.nth(idx)
-            numero = row.locator("td").nth(2).inner_text(timeout=5000).strip()
-            if not numero or numero in visited_numbers:
+        for registro in registros:
+            if not registro.numero or registro.numero in visited_numbers:
                 continue
-            visited_numbers.add(numero)
+            visited_numbers.add(registro.numero)
             page_has_new = True
-            yield row, numero
+            yield registro
+        # a página inteira: leitura e o processamento dos registros dela pelo chamador
+        registrar_desde("pagina", inicio_pagina)
 
-        # identifica botão próxima página
-        next_button = page.locator("a[title*='Próxima'], a:has-text('Próxima'), a:has-text('Próximo')").filter(
-            has_text="Próxima"
-        )
-        if next_button.count() == 0:
-            break
-        classes = next_button.first.get_attribute("class") or ""
-        if "Des" in classes or "disabled" in classes.lower():
+        next_button = _botao_proxima(page)
+        if next_button is None:
             break
         try:
-            next_button.first.click()
-            page.wait_for_timeout(1200)
+            _avancar_pagina(page, next_button, wait_timeout_ms, progress)
             page_index += 1
         except Exception:
             break
 
         if not page_has_new:
             break
+
+
+def iterar_paginas(
+    page: Page,
+    progress: Callable[[str], None] | None = None,
+    *,
+    wait_timeout_ms: int = DEFAULT_WAIT_TIMEOUT_MS,
+) -> Iterator[tuple[Locator, str]]:
+    for registro in iterar_registros(page, progress=progress, wait_timeout_ms=wait_timeout_ms):
+        yield registro.row(page), registro.numero
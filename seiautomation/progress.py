@@ -0,0 +1,332 @@
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, ClassVar, Iterable, Iterator
+
+
+@dataclass(slots=True)
+class Evento:
+    """Evento de progresso de uma execução; `momento` é o `time.time()` em que ocorreu."""
+
+    tipo: ClassVar[str] = "evento"
+    momento: float = field(default_factory=time.time, kw_only=True)
+
+    def para_dict(self) -> dict[str, Any]:
+        return {"tipo": self.tipo, **asdict(self)}
+
+
+@dataclass(slots=True)
+class Mensagem(Evento):
+    """Texto livre do `progress` (ver `EmissorProgresso.texto`)."""
+
+    tipo: ClassVar[str] = "mensagem"
+    texto: str
+
+
+@dataclass(slots=True)
+class ExecucaoIniciada(Evento):
+    tipo: ClassVar[str] = "execucao_iniciada"
+    tarefa: str
+    bloco_id: int | None = None
+
+
+@dataclass(slots=True)
+class EtapaIniciada(Evento):
+    """Início de uma etapa (leitura, download, anotação…) com quantos registros ela deve processar, se souber."""
+
+    tipo: ClassVar[str] = "etapa_iniciada"
+    etapa: str
+    total: int | None = None
+
+
+@dataclass(slots=True)
+class PaginaLida(Evento):
+    tipo: ClassVar[str] = "pagina_lida"
+    pagina: int
+    registros: int
+
+
+@dataclass(slots=True)
+class RegistrosProcessados(Evento):
+    """`quantidade` processos da `etapa` terminaram com `situacao` (ex.: "baixado", "pulado", "atualizado")."""
+
+    tipo: ClassVar[str] = "registros_processados"
+    etapa: str
+    situacao: str
+    quantidade: int = 1
+
+
+@dataclass(slots=True)
+class BytesBaixados(Evento):
+    tipo: ClassVar[str] = "bytes_baixados"
+    tamanho: int
+    arquivos: int = 1
+
+
+@dataclass(slots=True)
+class Retentativa(Evento):
+    tipo: ClassVar[str] = "retentativa"
+    numero: str
+    tentativa: int
+    espera: float
+    erro: str
+
+
+@dataclass(slots=True)
+class ErroProcesso(Evento):
+    """Processo que esgotou as tentativas."""
+
+    tipo: ClassVar[str] = "erro"
+    numero: str
+    erro: str
+
+
+@dataclass(slots=True)
+class ExecucaoConcluida(Evento):
+    tipo: ClassVar[str] = "execucao_concluida"
+    estatisticas: dict[str, Any] = field(default_factory=dict)
+
+
+# eventos entregues na hora, sem esperar o intervalo
+_IMEDIATOS = (ExecucaoIniciada, EtapaIniciada, ExecucaoConcluida)
+
+
+def _agrupar(lote: list[Evento], evento: Evento) -> None:
+    """
+    Acrescenta `evento` ao lote, juntando-o a um evento equivalente: só a página
+    mais recente fica, os bytes são somados e os registros processados são
+    somados por etapa e situação.
+    """
+    for indice in range(len(lote) - 1, -1, -1):
+        anterior = lote[indice]
+        if isinstance(evento, PaginaLida) and isinstance(anterior, PaginaLida):
+            del lote[indice]
+            break
+        if isinstance(evento, BytesBaixados) and isinstance(anterior, BytesBaixados):
+            anterior.tamanho += evento.tamanho
+            anterior.arquivos += evento.arquivos
+            anterior.momento = evento.momento
+            return
+        if (
+            isinstance(evento, RegistrosProcessados)
+            and isinstance(anterior, RegistrosProcessados)
+            and (anterior.etapa, anterior.situacao) == (evento.etapa, evento.situacao)
+        ):
+            anterior.quantidade += evento.quantidade
+            anterior.momento = evento.momento
+            return
+        if isinstance(anterior, _IMEDIATOS):
+            # não junta eventos de etapas diferentes
+            break
+    lote.append(evento)
+
+
+class EmissorProgresso:
+    """
+    Entrega os eventos de uma execução em lotes compactos, no máximo um lote a
+    cada `intervalo` segundos (eventos de início/fim de execução e de etapa
+    saem na hora). Dentro do lote, eventos equivalentes são agrupados (ver
+    `_agrupar`); mensagens e eventos mantêm a ordem.
+
+    Pode ser usado por várias threads. `texto` adapta o emissor ao parâmetro
+    `progress` das tarefas: cada mensagem vira um `Mensagem`.
+
+    Uso:
+        with EmissorProgresso(consumidor) as emissor, usar_emissor(emissor):
+            download_zip_lote(settings, progress=emissor.texto)
+    """
+
+    def __init__(self, consumidor: Callable[[list[Evento]], None], *, intervalo: float = 0.5) -> None:
+        self.consumidor = consumidor
+        self.intervalo = intervalo
+        self._lote: list[Evento] = []
+        self._ultima_entrega = 0.0
+        self._agendado: threading.Timer | None = None
+        self._fechado = False
+        self._lock = threading.Lock()
+        # entrega um lote de cada vez, na ordem (reentrante: o consumidor pode emitir)
+        self._entrega = threading.RLock()
+
+    def emitir(self, evento: Evento) -> None:
+        with self._lock:
+            _agrupar(self._lote, evento)
+            espera = self._ultima_entrega + self.intervalo - time.monotonic()
+            if espera > 0 and not isinstance(evento, _IMEDIATOS) and not self._fechado:
+                if self._agendado is None:
+                    # o que chegar depois de um silêncio não fica parado até o próximo evento
+                    self._agendado = threading.Timer(espera, self.descarregar)
+                    self._agendado.daemon = True
+                    self._agendado.start()
+                return
+        self.descarregar()
+
+    def texto(self, mensagem: str) -> None:
+        self.emitir(Mensagem(mensagem))
+
+    def descarregar(self) -> None:
+        """Entrega agora o que estiver acumulado."""
+        with self._entrega:
+            with self._lock:
+                lote, self._lote = self._lote, []
+                self._ultima_entrega = time.monotonic()
+                if self._agendado is not None:
+                    self._agendado.cancel()
+                    self._agendado = None
+            if lote:
+                self.consumidor(lote)
+
+    def fechar(self) -> None:
+        with self._lock:
+            self._fechado = True
+        self.descarregar()
+
+    def __enter__(self) -> "EmissorProgresso":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.fechar()
+
+
+@dataclass(slots=True)
+class Etapa:
+    nome: str
+    total: int | None
+    inicio: float
+    processados: int = 0
+    situacoes: dict[str, int] = field(default_factory=dict)
+
+
+class Andamento:
+    """
+    Estado de uma execução montado a partir dos seus eventos: etapa atual,
+    processos por situação, bytes, retentativas e erros, com taxa e tempo
+    restante estimado da etapa em andamento.
+    """
+
+    def __init__(self) -> None:
+        self.tarefa: str | None = None
+        self.bloco_id: int | None = None
+        self.iniciado_em: float | None = None
+        self.concluido_em: float | None = None
+        self.etapas: dict[str, Etapa] = {}
+        self.etapa_atual: str | None = None
+        self.pagina: int | None = None
+        self.bytes = 0
+        self.arquivos = 0
+        self.retentativas = 0
+        self.erros = 0
+        self.estatisticas: dict[str, Any] = {}
+
+    def aplicar(self, eventos: Iterable[Evento]) -> None:
+        for evento in eventos:
+            if self.iniciado_em is None:
+                self.iniciado_em = evento.momento
+            if isinstance(evento, ExecucaoIniciada):
+                self.tarefa, self.bloco_id, self.iniciado_em = evento.tarefa, evento.bloco_id, evento.momento
+            elif isinstance(evento, EtapaIniciada):
+                self.etapas[evento.etapa] = Etapa(evento.etapa, evento.total, evento.momento)
+                self.etapa_atual = evento.etapa
+            elif isinstance(evento, PaginaLida):
+                self.pagina = evento.pagina
+            elif isinstance(evento, RegistrosProcessados):
+                etapa = self.etapas.get(evento.etapa)
+                if etapa is None:
+                    etapa = self.etapas[evento.etapa] = Etapa(evento.etapa, None, evento.momento)
+                etapa.processados += evento.quantidade
+                etapa.situacoes[evento.situacao] = etapa.situacoes.get(evento.situacao, 0) + evento.quantidade
+            elif isinstance(evento, BytesBaixados):
+                self.bytes += evento.tamanho
+                self.arquivos += evento.arquivos
+            elif isinstance(evento, Retentativa):
+                self.retentativas += 1
+            elif isinstance(evento, ErroProcesso):
+                self.erros += 1
+            elif isinstance(evento, ExecucaoConcluida):
+                self.concluido_em = evento.momento
+                self.estatisticas = dict(evento.estatisticas)
+
+    def _agora(self) -> float:
+        return self.concluido_em if self.concluido_em is not None else time.time()
+
+    def taxa(self, etapa: str | None = None) -> float | None:
+        """Processos por segundo na etapa (padrão: a atual)."""
+        dados = self.etapas.get(etapa or self.etapa_atual or "")
+        if dados is None or not dados.processados:
+            return None
+        decorrido = self._agora() - dados.inicio
+        return dados.processados / decorrido if decorrido > 0 else None
+
+    def eta(self, etapa: str | None = None) -> float | None:
+        """Segundos estimados até o fim da etapa (padrão: a atual); None sem total ou sem taxa."""
+        dados = self.etapas.get(etapa or self.etapa_atual or "")
+        taxa = self.taxa(etapa)
+        if dados is None or dados.total is None or not taxa:
+            return None
+        return max(0, dados.total - dados.processados) / taxa
+
+    def para_dict(self) -> dict[str, Any]:
+        return {
+            "tarefa": self.tarefa,
+            "bloco_id": self.bloco_id,
+            "iniciado_em": self.iniciado_em,
+            "concluido_em": self.concluido_em,
+            "etapa_atual": self.etapa_atual,
+            "pagina": self.pagina,
+            "etapas": {
+                nome: {
+                    "total": etapa.total,
+                    "processados": etapa.processados,
+                    "situacoes": dict(etapa.situacoes),
+                    "taxa": self.taxa(nome),
+                    "eta": self.eta(nome),
+                }
+                for nome, etapa in self.etapas.items()
+            },
+            "bytes": self.bytes,
+            "arquivos": self.arquivos,
+            "retentativas": self.retentativas,
+            "erros": self.erros,
+            "estatisticas": self.estatisticas,
+        }
+
+    def resumo(self) -> str:
+        """Linha curta para barras de status: etapa, contagem, taxa e tempo restante."""
+        if self.etapa_atual is None:
+            return ""
+        etapa = self.etapas[self.etapa_atual]
+        partes = [f"{etapa.nome}: {etapa.processados}" + (f"/{etapa.total}" if etapa.total is not None else "")]
+        if (taxa := self.taxa()) is not None:
+            partes.append(f"{taxa:.1f}/s")
+        if (eta := self.eta()) is not None:
+            partes.append(f"faltam ~{eta:.0f} s")
+        if self.erros:
+            partes.append(f"{self.erros} erros")
+        return " — ".join(partes)
+
+
+_emissor_atual: ContextVar[EmissorProgresso | None] = ContextVar("seiautomation_progresso", default=None)
+
+
+def emissor_atual() -> EmissorProgresso | None:
+    return _emissor_atual.get()
+
+
+@contextmanager
+def usar_emissor(emissor: EmissorProgresso | None) -> Iterator[EmissorProgresso | None]:
+    """Ativa o emissor para o contexto atual (thread ou task asyncio); None desativa."""
+    token = _emissor_atual.set(emissor)
+    try:
+        yield emissor
+    finally:
+        _emissor_atual.reset(token)
+
+
+def emitir(evento: Evento) -> None:
+    """Envia o evento ao emissor ativo; sem emissor ativo não faz nada."""
+    emissor = _emissor_atual.get()
+    if emissor is not None:
+        emissor.emitir(evento)
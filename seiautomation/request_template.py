@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import json
+import re
+import threading
+from dataclasses import dataclass
+from email.message import Message
+from typing import Any, Protocol
+from urllib.parse import parse_qsl, quote, quote_plus, urlparse
+
+# valores curtos ("1", "on"…) aparecem por acaso em qualquer URL; não viram parâmetros
+_TAMANHO_MINIMO = 3
+_MARCADOR = re.compile(r"\x00(\w+):(raw|quote|plus|json)\x00")
+_CODIFICADORES = {
+    "raw": lambda valor: valor,
+    "quote": lambda valor: quote(valor, safe=""),
+    "plus": lambda valor: quote_plus(valor, safe=""),
+}
+_SUBSTITUICOES = {**_CODIFICADORES, "json": lambda valor: json.dumps(valor, ensure_ascii=False)}
+# assinatura do SEI (própria de cada processo e ação) que ficou com o valor literal, sem marcador
+_ASSINATURA_FIXA = re.compile(r"""infra_hash["']?\s*[=:]\s*["']?[^\s&"',}]""")
+
+
+def valores_do_processo(numero: str, href: str = "") -> dict[str, str]:
+    """Identificadores de um processo: o número e os parâmetros do link da relação do bloco."""
+    valores = {"numero": numero}
+    for chave, valor in parse_qsl(urlparse(href).query):
+        if re.fullmatch(r"\w+", chave) and chave != "numero":
+            valores.setdefault(chave, valor)
+    return valores
+
+
+def _parametrizar(texto: str, valores: dict[str, str]) -> tuple[str, set[str]]:
+    usados: set[str] = set()
+    candidatos = [
+        (codificado, chave, modo)
+        for chave, valor in valores.items()
+        if len(valor) >= _TAMANHO_MINIMO
+        for modo, codificar in _CODIFICADORES.items()
+        if (codificado := codificar(valor))
+    ]
+    # substitui os mais longos primeiro para um valor não "comer" parte de outro
+    for codificado, chave, modo in sorted(candidatos, key=lambda item: len(item[0]), reverse=True):
+        if codificado in texto:
+            texto = texto.replace(codificado, f"\x00{chave}:{modo}\x00")
+            usados.add(chave)
+    return texto, usados
+
+
+def _parametrizar_campos(body: str, content_type: str | None, campos: dict[str, str]) -> tuple[str, set[str]]:
+    """
+    Troca por marcadores os campos do corpo cujo valor é exatamente um dos `campos`
+    (ex.: o texto da anotação, curto demais para a busca por substring).
+    """
+    if not campos:
+        return body, set()
+    usados: set[str] = set()
+    tipo = (content_type or "").split(";")[0].strip().lower()
+    if tipo == "application/json":
+        try:
+            dados = json.loads(body)
+        except ValueError:
+            return body, set()
+        if not isinstance(dados, dict):
+            return body, set()
+        sentinelas: dict[str, str] = {}
+        for chave, valor in list(dados.items()):
+            for nome, esperado in campos.items():
+                if valor == esperado:
+                    sentinela = f"__seiautomation_{nome}__"
+                    dados[chave] = sentinela
+                    sentinelas[json.dumps(sentinela)] = f"\x00{nome}:json\x00"
+                    usados.add(nome)
+                    break
+        texto = json.dumps(dados, ensure_ascii=False)
+        for sentinela, marcador in sentinelas.items():
+            texto = texto.replace(sentinela, marcador)
+        return texto, usados
+    if tipo == "application/x-www-form-urlencoded":
+        partes = []
+        for chave, valor in parse_qsl(body, keep_blank_values=True):
+            nome = next((nome for nome, esperado in campos.items() if valor == esperado), None)
+            if nome is None:
+                partes.append(f"{quote_plus(chave)}={quote_plus(valor)}")
+            else:
+                partes.append(f"{quote_plus(chave)}=\x00{nome}:plus\x00")
+                usados.add(nome)
+        return "&".join(partes), usados
+    return body, set()
+
+
+@dataclass(slots=True, frozen=True)
+class RequestTemplate:
+    """
+    Requisição observada no navegador para um processo, com os identificadores
+    do processo trocados por marcadores, pronta para ser repetida para outros.
+    """
+
+    method: str
+    url: str
+    body: str | None
+    content_type: str | None
+    parametros: frozenset[str]
+
+    @classmethod
+    def aprender(
+        cls,
+        method: str,
+        url: str,
+        body: str | None,
+        valores: dict[str, str],
+        *,
+        content_type: str | None = None,
+        campos: dict[str, str] | None = None,
+    ) -> "RequestTemplate | None":
+        """
+        Args:
+            valores: identificadores do processo, procurados em qualquer ponto da URL e do corpo.
+            campos: valores procurados apenas como campo inteiro do corpo (formulário ou JSON).
+
+        Returns:
+            O modelo, ou None se nenhum identificador do processo aparece na
+            requisição (repeti-la afetaria sempre o mesmo processo) ou se ela
+            leva um `infra_hash` que não vem do link do processo: essa
+            assinatura vale só para o processo observado e o SEI recusaria a
+            requisição para os demais.
+        """
+        url_modelo, usados_url = _parametrizar(url, valores)
+        body_modelo, usados_campos = _parametrizar_campos(body, content_type, campos or {}) if body else (body, set())
+        body_modelo, usados_body = _parametrizar(body_modelo, valores) if body_modelo else (body_modelo, set())
+        if not usados_url | usados_body:
+            return None
+        if any(_ASSINATURA_FIXA.search(_MARCADOR.sub("", texto)) for texto in (url_modelo, body_modelo) if texto):
+            return None
+        usados = usados_url | usados_body | usados_campos
+        return cls(
+            method=method.upper(),
+            url=url_modelo,
+            body=body_modelo,
+            content_type=content_type,
+            parametros=frozenset(usados),
+        )
+
+    def montar(self, valores: dict[str, str]) -> tuple[str, str | None]:
+        """
+        Raises:
+            KeyError: se o processo não tiver algum dos identificadores usados pelo modelo.
+        """
+        faltando = self.parametros - valores.keys()
+        if faltando:
+            raise KeyError(", ".join(sorted(faltando)))
+
+        def preencher(texto: str) -> str:
+            return _MARCADOR.sub(lambda m: _SUBSTITUICOES[m.group(2)](valores[m.group(1)]), texto)
+
+        return preencher(self.url), preencher(self.body) if self.body is not None else None
+
+
+class RequisicaoObservada(Protocol):
+    """O que é usado de `playwright.{sync,async}_api.Request`."""
+
+    method: str
+    url: str
+    post_data: str | None
+    headers: dict[str, str]
+
+
+class AtalhoRequisicao:
+    """
+    Requisição aprendida na primeira vez que uma ação é feita pela interface e
+    repetida diretamente, com os cookies da sessão, para os demais processos.
+
+    Compartilhável entre threads e tasks: guarda apenas o modelo e o contador de
+    falhas; após `max_falhas` falhas seguidas deixa de ser usada até ser reaprendida.
+    """
+
+    def __init__(self, max_falhas: int = 3) -> None:
+        self.max_falhas = max_falhas
+        self.modelo: RequestTemplate | None = None
+        self._falhas = 0
+        self._lock = threading.Lock()
+
+    @property
+    def disponivel(self) -> bool:
+        return self.modelo is not None and self._falhas < self.max_falhas
+
+    def aprender(
+        self,
+        request: RequisicaoObservada | None,
+        valores: dict[str, str],
+        campos: dict[str, str] | None = None,
+    ) -> bool:
+        if request is None or self.disponivel:
+            return False
+        modelo = RequestTemplate.aprender(
+            request.method,
+            request.url,
+            request.post_data,
+            valores,
+            content_type=request.headers.get("content-type"),
+            campos=campos,
+        )
+        # um campo que não virou parâmetro seria repetido com o mesmo valor para todos
+        if modelo is None or not (campos or {}).keys() <= modelo.parametros:
+            return False
+        with self._lock:
+            self.modelo = modelo
+            self._falhas = 0
+        return True
+
+    def requisicao(self, valores: dict[str, str]) -> tuple[str, dict[str, Any]] | None:
+        """
+        URL e argumentos (`method`, `data`, `headers`, como em `APIRequestContext.fetch`)
+        para o processo, ou None se o atalho não se aplica.
+        """
+        modelo = self.modelo
+        if modelo is None or not self.disponivel:
+            return None
+        try:
+            url, body = modelo.montar(valores)
+        except KeyError:
+            return None
+        kwargs: dict[str, Any] = {"method": modelo.method}
+        if body is not None:
+            kwargs["data"] = body
+        if modelo.content_type:
+            kwargs["headers"] = {"content-type": modelo.content_type}
+        return url, kwargs
+
+    def registrar_resultado(self, sucesso: bool) -> None:
+        with self._lock:
+            self._falhas = 0 if sucesso else self._falhas + 1
+
+
+def nome_do_anexo(content_disposition: str | None, padrao: str) -> str:
+    """Nome do arquivo informado em `Content-Disposition` (inclusive `filename*=`), ou `padrao`."""
+    if not content_disposition:
+        return padrao
+    mensagem = Message()
+    mensagem["content-disposition"] = content_disposition
+    nome = mensagem.get_filename()
+    if not nome:
+        return padrao
+    return nome.replace("/", "_").replace("\\", "_")
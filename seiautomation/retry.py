@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+from .progress import ErroProcesso, Evento, Retentativa, emitir
+
+
+@dataclass(slots=True, frozen=True)
+class PoliticaRetentativa:
+    """
+    Backoff exponencial com jitter para processos que falharam.
+
+    Args:
+        tentativas: total de tentativas por processo (incluindo a primeira).
+        base: espera, em segundos, antes da primeira nova tentativa.
+        fator: multiplicador da espera a cada nova falha.
+        maximo: teto da espera, em segundos.
+        jitter: fração da espera sorteada para baixo, evitando rajadas sincronizadas.
+    """
+
+    tentativas: int = 3
+    base: float = 2.0
+    fator: float = 2.0
+    maximo: float = 60.0
+    jitter: float = 0.5
+
+    def espera(self, falhas: int) -> float:
+        atraso = min(self.maximo, self.base * self.fator ** max(0, falhas - 1))
+        return random.uniform(atraso * (1 - self.jitter), atraso)
+
+
+@dataclass(slots=True)
+class FalhaProcesso:
+    numero: str
+    tentativas: int
+    erro: str
+
+
+class AgendadorRetentativas:
+    """
+    Acompanha as falhas de cada processo durante uma execução e decide quando
+    (e se) ele deve ser tentado de novo.
+
+    Pode ser compartilhado entre threads e tasks asyncio; não dorme por conta
+    própria — quem chama usa `espera_restante` com `time.sleep`/`asyncio.sleep`.
+    """
+
+    def __init__(self, politica: PoliticaRetentativa | None = None) -> None:
+        self.politica = politica or PoliticaRetentativa()
+        self._falhas: dict[str, FalhaProcesso] = {}
+        self._dados: dict[str, Any] = {}
+        self._liberado_em: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def registrar_falha(self, numero: str, erro: BaseException | str, dados: Any = None) -> bool:
+        """
+        Returns:
+            True se o processo ainda tem tentativas; False se foi para a lista de falhas definitivas.
+        """
+        with self._lock:
+            falha = self._falhas.get(numero)
+            if falha is None:
+                falha = self._falhas[numero] = FalhaProcesso(numero=numero, tentativas=0, erro="")
+            falha.tentativas += 1
+            falha.erro = str(erro) or type(erro).__name__
+            if dados is not None:
+                self._dados[numero] = dados
+            restam = falha.tentativas < self.politica.tentativas
+            if restam:
+                espera = self.politica.espera(falha.tentativas)
+                self._liberado_em[numero] = time.monotonic() + espera
+                evento: Evento = Retentativa(numero, falha.tentativas, espera, falha.erro)
+            else:
+                self._liberado_em.pop(numero, None)
+                evento = ErroProcesso(numero, falha.erro)
+        emitir(evento)
+        return restam
+
+    def registrar_sucesso(self, numero: str) -> None:
+        with self._lock:
+            self._falhas.pop(numero, None)
+            self._dados.pop(numero, None)
+            self._liberado_em.pop(numero, None)
+
+    def incorporar(self, falhas: Iterable[FalhaProcesso]) -> None:
+        """Acrescenta falhas definitivas registradas em outro agendador (ex.: de outro processo)."""
+        with self._lock:
+            for falha in falhas:
+                self._falhas[falha.numero] = FalhaProcesso(falha.numero, falha.tentativas, falha.erro)
+                self._liberado_em.pop(falha.numero, None)
+
+    def pendentes(self) -> list[tuple[str, Any]]:
+        """Processos que ainda serão tentados de novo, com os dados informados na falha."""
+        with self._lock:
+            ordem = sorted(self._liberado_em, key=self._liberado_em.__getitem__)
+            return [(numero, self._dados.get(numero)) for numero in ordem]
+
+    def espera_restante(self, numeros: Iterable[str] | None = None) -> float:
+        """Segundos até que todos os `numeros` (padrão: todos os pendentes) possam ser tentados."""
+        with self._lock:
+            chaves = self._liberado_em.keys() if numeros is None else numeros
+            prazos = [self._liberado_em[numero] for numero in chaves if numero in self._liberado_em]
+        if not prazos:
+            return 0.0
+        return max(0.0, max(prazos) - time.monotonic())
+
+    def definitivas(self) -> list[FalhaProcesso]:
+        """Lista de falhas definitivas (dead letter): processos sem tentativas restantes."""
+        with self._lock:
+            return [
+                FalhaProcesso(falha.numero, falha.tentativas, falha.erro)
+                for numero, falha in self._falhas.items()
+                if numero not in self._liberado_em
+            ]
+
+    def relatorio(self) -> str:
+        falhas = self.definitivas()
+        if not falhas:
+            return ""
+        linhas = [f"  {falha.numero}: {falha.tentativas} tentativas — {falha.erro}" for falha in falhas]
+        return f"Falhas definitivas ({len(falhas)}):\n" + "\n".join(linhas)
+
+
+class ArquivosBaixados(list):
+    """Nomes dos ZIPs salvos; `falhas` traz os processos que esgotaram as tentativas."""
+
+    def __init__(self, arquivos: Iterable[str] = (), falhas: Iterable[FalhaProcesso] = ()) -> None:
+        super().__init__(arquivos)
+        self.falhas = list(falhas)
+
+
+class TotalAtualizado(int):
+    """Quantidade de processos atualizados; `falhas` traz os que esgotaram as tentativas."""
+
+    falhas: list[FalhaProcesso]
+
+    def __new__(cls, total: int, falhas: Iterable[FalhaProcesso] = ()) -> "TotalAtualizado":
+        valor = super().__new__(cls, total)
+        valor.falhas = list(falhas)
+        return valor
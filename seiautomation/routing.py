@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import weakref
+from dataclasses import dataclass
+from typing import Any
+from urllib.parse import urlsplit
+
+from playwright.async_api import BrowserContext as AsyncBrowserContext
+from playwright.async_api import Response as AsyncResponse
+from playwright.async_api import Route as AsyncRoute
+from playwright.sync_api import BrowserContext, Response, Route
+
+from .config import Settings
+from .timing import TimingRecorder, recorder_atual
+
+# tipos de recurso (`Request.resource_type`) que cada perfil de `config.PERFIS_ROTEAMENTO` não carrega
+_TIPOS_BLOQUEADOS: dict[str, frozenset[str]] = {
+    "full": frozenset(),
+    "no-media": frozenset({"image", "media", "font"}),
+    "minimal": frozenset({"image", "media", "font", "stylesheet", "texttrack", "manifest"}),
+}
+
+
+@dataclass(slots=True)
+class _Roteamento:
+    perfil: str
+    hosts: frozenset[str]
+    recorder: TimingRecorder | None
+
+    def bloquear(self, url: str, tipo: str) -> str | None:
+        """Motivo do bloqueio (o tipo do recurso ou "terceiros"), ou None se a requisição segue."""
+        if self.perfil == "full":
+            return None
+        if tipo in _TIPOS_BLOQUEADOS[self.perfil]:
+            return tipo
+        host = urlsplit(url).hostname
+        if host and host not in self.hosts:
+            return "terceiros"
+        return None
+
+    def contar(self, nome: str, quantidade: int = 1) -> None:
+        if self.recorder is not None:
+            self.recorder.contar(nome, quantidade)
+
+    def contar_resposta(self, response: Response | AsyncResponse) -> None:
+        try:
+            tamanho = int(response.headers.get("content-length", ""))
+        except ValueError:
+            return
+        self.contar("navegador_bytes_recebidos", tamanho)
+
+
+# contexto → roteamento instalado; contextos do pool são reaproveitados entre execuções
+_instalados: "weakref.WeakKeyDictionary[Any, _Roteamento]" = weakref.WeakKeyDictionary()
+
+
+def _hosts_do_sei(settings: Settings) -> frozenset[str]:
+    return frozenset(
+        host for url in (settings.base_url, settings.target_base_url) if (host := urlsplit(url).hostname)
+    )
+
+
+def _atualizar(context: Any, settings: Settings) -> _Roteamento | None:
+    """
+    Atualiza o roteamento já instalado no contexto (perfil e recorder da
+    execução atual). None se ainda não há roteamento e não é preciso instalar.
+    """
+    roteamento = _instalados.get(context)
+    if roteamento is not None:
+        roteamento.perfil = settings.routing_profile
+        roteamento.hosts = _hosts_do_sei(settings)
+        roteamento.recorder = recorder_atual()
+    return roteamento
+
+
+def instalar_roteamento(context: BrowserContext, settings: Settings) -> None:
+    """
+    Aplica ao contexto o perfil `settings.routing_profile`: "no-media" não
+    carrega imagens, vídeos e fontes; "minimal" também dispensa folhas de estilo;
+    ambos recusam hosts que não sejam o do SEI. "full" carrega tudo (e não
+    intercepta nada, preservando o cache HTTP do navegador).
+
+    As requisições permitidas e as bloqueadas (por motivo), além dos bytes
+    recebidos, vão para os contadores do recorder ativo (ver `timing`).
+    Pode ser chamada a cada login: num contexto já roteado só atualiza o perfil.
+    """
+    if _atualizar(context, settings) is not None or settings.routing_profile == "full":
+        return
+    roteamento = _Roteamento(settings.routing_profile, _hosts_do_sei(settings), recorder_atual())
+
+    def rotear(route: Route) -> None:
+        motivo = roteamento.bloquear(route.request.url, route.request.resource_type)
+        if motivo is None:
+            roteamento.contar("navegador_permitidas")
+            route.continue_()
+        else:
+            roteamento.contar(f"navegador_bloqueadas_{motivo}")
+            route.abort("blockedbyclient")
+
+    context.route("**/*", rotear)
+    context.on("response", roteamento.contar_resposta)
+    _instalados[context] = roteamento
+
+
+async def instalar_roteamento_async(context: AsyncBrowserContext, settings: Settings) -> None:
+    """Versão assíncrona de `instalar_roteamento`."""
+    if _atualizar(context, settings) is not None or settings.routing_profile == "full":
+        return
+    roteamento = _Roteamento(settings.routing_profile, _hosts_do_sei(settings), recorder_atual())
+
+    async def rotear(route: AsyncRoute) -> None:
+        motivo = roteamento.bloquear(route.request.url, route.request.resource_type)
+        if motivo is None:
+            roteamento.contar("navegador_permitidas")
+            await route.continue_()
+        else:
+            roteamento.contar(f"navegador_bloqueadas_{motivo}")
+            await route.abort("blockedbyclient")
+
+    await context.route("**/*", rotear)
+    context.on("response", roteamento.contar_resposta)
+    _instalados[context] = roteamento
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any
+
+from playwright.sync_api import BrowserContext
+
+from .config import Settings
+
+
+def _cache_path(settings: Settings) -> Path:
+    return settings.cache_dir / "sessions" / f"{settings.cache_key}.json"
+
+
+def _cookies_expirados(cookies: list[dict[str, Any]], agora: float) -> bool:
+    # cookies de sessão usam expires = -1; só consideramos os que têm validade explícita
+    return any(0 < cookie.get("expires", -1) <= agora for cookie in cookies)
+
+
+def carregar_sessao(settings: Settings) -> dict[str, Any] | None:
+    """
+    Lê o estado autenticado salvo para o usuário e a URL base atuais.
+
+    Returns:
+        Dicionário com `home_url` e `storage_state`, ou None se não existir ou estiver expirado.
+    """
+    path = _cache_path(settings)
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return None
+
+    agora = time.time()
+    if agora - float(data.get("saved_at", 0)) > settings.session_ttl_minutes * 60:
+        descartar_sessao(settings)
+        return None
+    if _cookies_expirados(data.get("storage_state", {}).get("cookies", []), agora):
+        descartar_sessao(settings)
+        return None
+    return data
+
+
+def salvar_sessao(settings: Settings, context: BrowserContext, home_url: str) -> None:
+    gravar_sessao(settings, context.storage_state(), home_url)
+
+
+def gravar_sessao(settings: Settings, storage_state: dict[str, Any], home_url: str) -> None:
+    path = _cache_path(settings)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "saved_at": time.time(),
+        "home_url": home_url,
+        "storage_state": storage_state,
+    }
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(payload), encoding="utf-8")
+    os.chmod(tmp, 0o600)
+    os.replace(tmp, path)
+
+
+def descartar_sessao(settings: Settings) -> None:
+    try:
+        _cache_path(settings).unlink()
+    except FileNotFoundError:
+        pass
+
+
+def aplicar_sessao(context: BrowserContext, settings: Settings) -> str | None:
+    """
+    Injeta os cookies salvos no contexto, permitindo que vários contextos
+    compartilhem o mesmo login.
+
+    Returns:
+        URL da página inicial autenticada, ou None se não houver sessão válida.
+    """
+    data = carregar_sessao(settings)
+    if not data:
+        return None
+    cookies = data.get("storage_state", {}).get("cookies", [])
+    if cookies:
+        context.add_cookies(cookies)
+    return data.get("home_url")
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from dataclasses import dataclass
+from typing import Any, Callable, Generic, Sequence, TypeVar
+
+from .progress import EmissorProgresso, emissor_atual, usar_emissor
+
+ProgressFn = Callable[[str], None] | None
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# fila de progresso herdada por cada processo do pool (ver `_iniciar_shard`)
+_fila_progresso: Any = None
+
+
+def shards_padrao() -> int:
+    """Um shard por núcleo, deixando um para o processo principal."""
+    return max(1, (os.cpu_count() or 2) - 1)
+
+
+def particionar(itens: Sequence[T], partes: int) -> list[list[T]]:
+    """
+    Divide `itens` em até `partes` fatias contíguas de tamanhos equilibrados
+    (contíguas para que cada shard percorra um trecho próximo da relação).
+    """
+    partes = max(1, min(partes, len(itens)))
+    tamanho, sobra = divmod(len(itens), partes)
+    fatias: list[list[T]] = []
+    inicio = 0
+    for indice in range(partes):
+        fim = inicio + tamanho + (1 if indice < sobra else 0)
+        fatias.append(list(itens[inicio:fim]))
+        inicio = fim
+    return [fatia for fatia in fatias if fatia]
+
+
+@dataclass(slots=True)
+class ResultadoShard(Generic[T, R]):
+    indice: int
+    itens: list[T]
+    resultado: R | None = None
+    erro: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.erro is None
+
+
+def _log(message: str, progress: ProgressFn) -> None:
+    if progress:
+        progress(message)
+    else:
+        print(message)
+
+
+def _iniciar_shard(fila: Any) -> None:
+    global _fila_progresso
+    _fila_progresso = fila
+
+
+def _executar_shard(indice: int, funcao: Callable[..., R], itens: list, kwargs: dict[str, Any]) -> R:
+    def progress(message: str) -> None:
+        _fila_progresso.put((indice, message))
+
+    # os eventos de progresso (ver `seiautomation.progress`) seguem pela mesma fila, em lotes
+    with EmissorProgresso(lambda lote: _fila_progresso.put((indice, lote))) as emissor, usar_emissor(emissor):
+        return funcao(itens, progress=progress, **kwargs)
+
+
+def executar_em_shards(
+    funcao: Callable[..., R],
+    partes: list[list[T]],
+    *,
+    progress: ProgressFn = None,
+    **kwargs: Any,
+) -> list[ResultadoShard[T, R]]:
+    """
+    Executa `funcao(parte, progress=..., **kwargs)` para cada parte num processo
+    próprio (cada um com o seu navegador), todos ao mesmo tempo.
+
+    `funcao` precisa estar no nível do módulo e os argumentos precisam ser
+    serializáveis (os processos são iniciados com "spawn"; o Playwright não
+    sobrevive a um fork). As mensagens de progresso dos processos chegam a
+    `progress` prefixadas com `[shard N]`, e os eventos de progresso vão para o
+    emissor ativo. O erro de um shard (inclusive a morte do processo) fica no
+    resultado dele e não interrompe os outros.
+    """
+    contexto = multiprocessing.get_context("spawn")
+    fila = contexto.Queue()
+    emissor = emissor_atual()
+
+    def repassar() -> None:
+        while (mensagem := fila.get()) is not None:
+            indice, conteudo = mensagem
+            if isinstance(conteudo, str):
+                _log(f"[shard {indice}] {conteudo}", progress)
+            elif emissor is not None:
+                for evento in conteudo:
+                    emissor.emitir(evento)
+
+    leitor = threading.Thread(target=repassar, name="shards-progresso", daemon=True)
+    leitor.start()
+    resultados = [ResultadoShard(indice, parte) for indice, parte in enumerate(partes, start=1)]
+    try:
+        # um pool por shard: a morte de um processo quebra só o pool dele, não os dos outros
+        with ExitStack() as pilha:
+            futuros = []
+            for resultado in resultados:
+                pool = pilha.enter_context(
+                    ProcessPoolExecutor(
+                        max_workers=1, mp_context=contexto, initializer=_iniciar_shard, initargs=(fila,)
+                    )
+                )
+                futuros.append(pool.submit(_executar_shard, resultado.indice, funcao, resultado.itens, kwargs))
+            for resultado, futuro in zip(resultados, futuros):
+                try:
+                    resultado.resultado = futuro.result()
+                except Exception as exc:  # noqa: BLE001
+                    resultado.erro = str(exc) or type(exc).__name__
+                    _log(f"[shard {resultado.indice}] Interrompido: {resultado.erro}", progress)
+    finally:
+        fila.put(None)
+        leitor.join()
+        fila.close()
+    return resultados
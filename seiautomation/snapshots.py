@@ -0,0 +1,297 @@
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable
+
+from .config import Settings
+from .navigation import LinhaProcesso
+
+ADICIONADO = "adicionado"
+ALTERADO = "alterado"
+REMOVIDO = "removido"
+
+
+def _impressao(numero: str, seq: str, tipo: str, anotacao: str) -> str:
+    conteudo = "\x1f".join((numero, seq, tipo, anotacao))
+    return hashlib.sha1(conteudo.encode("utf-8")).hexdigest()
+
+
+def impressao(registro: LinhaProcesso) -> str:
+    """Impressão digital do que a relação mostra de um processo (o link muda a cada sessão e fica de fora)."""
+    return _impressao(registro.numero, registro.seq, registro.tipo, registro.anotacao)
+
+
+def impressao_pagina(registros: Iterable[LinhaProcesso]) -> str:
+    digest = hashlib.sha1()
+    for registro in registros:
+        if registro.numero:
+            digest.update(impressao(registro).encode("ascii"))
+    return digest.hexdigest()
+
+
+@dataclass(slots=True, frozen=True)
+class ProcessoSnapshot:
+    numero: str
+    seq: str
+    tipo: str
+    anotacao: str
+    href: str
+    impressao: str
+
+    @classmethod
+    def de_registro(cls, registro: LinhaProcesso) -> "ProcessoSnapshot":
+        return cls(
+            numero=registro.numero,
+            seq=registro.seq,
+            tipo=registro.tipo,
+            anotacao=registro.anotacao,
+            href=registro.href,
+            impressao=impressao(registro),
+        )
+
+
+@dataclass(slots=True, frozen=True)
+class SnapshotBloco:
+    escopo: str
+    bloco_id: int
+    processos: dict[str, ProcessoSnapshot]
+    primeira_pagina: str | None
+    total: int
+    lido_em: float
+
+
+@dataclass(slots=True)
+class DiferencaBloco:
+    adicionados: list[ProcessoSnapshot] = field(default_factory=list)
+    removidos: list[ProcessoSnapshot] = field(default_factory=list)
+    alterados: list[tuple[ProcessoSnapshot, ProcessoSnapshot]] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.adicionados or self.removidos or self.alterados)
+
+    def resumo(self) -> str:
+        return (
+            f"{len(self.adicionados)} adicionados, {len(self.alterados)} alterados, "
+            f"{len(self.removidos)} removidos"
+        )
+
+
+class SnapshotStore:
+    """
+    Último conteúdo lido de cada bloco (SQLite em `SEI_CACHE_DIR/snapshots`),
+    para comparar uma leitura nova com a anterior.
+
+    Cada tarefa usa o próprio `escopo` ("exportacao", "download", …): o que
+    mudou desde a última exportação não é o mesmo que mudou desde o último download.
+    """
+
+    def __init__(self, settings: Settings) -> None:
+        self.path = _snapshot_path(settings)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS blocos (
+                escopo TEXT NOT NULL,
+                bloco_id INTEGER NOT NULL,
+                primeira_pagina TEXT,
+                total INTEGER NOT NULL,
+                lido_em REAL NOT NULL,
+                PRIMARY KEY (escopo, bloco_id)
+            );
+            CREATE TABLE IF NOT EXISTS processos (
+                escopo TEXT NOT NULL,
+                bloco_id INTEGER NOT NULL,
+                numero TEXT NOT NULL,
+                seq TEXT NOT NULL,
+                tipo TEXT NOT NULL,
+                anotacao TEXT NOT NULL,
+                href TEXT NOT NULL,
+                impressao TEXT NOT NULL,
+                PRIMARY KEY (escopo, bloco_id, numero)
+            );
+            """
+        )
+
+    def carregar(self, escopo: str, bloco_id: int) -> SnapshotBloco | None:
+        with self._lock:
+            bloco = self._conn.execute(
+                "SELECT primeira_pagina, total, lido_em FROM blocos WHERE escopo = ? AND bloco_id = ?",
+                (escopo, bloco_id),
+            ).fetchone()
+            if bloco is None:
+                return None
+            linhas = self._conn.execute(
+                "SELECT numero, seq, tipo, anotacao, href, impressao FROM processos WHERE escopo = ? AND bloco_id = ?",
+                (escopo, bloco_id),
+            ).fetchall()
+        processos = {linha[0]: ProcessoSnapshot(*linha) for linha in linhas}
+        return SnapshotBloco(escopo, bloco_id, processos, bloco[0], bloco[1], bloco[2])
+
+    def gravar(
+        self,
+        escopo: str,
+        bloco_id: int,
+        processos: Iterable[ProcessoSnapshot],
+        *,
+        primeira_pagina: str | None,
+        lido_em: float | None = None,
+    ) -> None:
+        """Substitui o snapshot do bloco numa única transação."""
+        processos = list(processos)
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute("DELETE FROM processos WHERE escopo = ? AND bloco_id = ?", (escopo, bloco_id))
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO processos VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (escopo, bloco_id, p.numero, p.seq, p.tipo, p.anotacao, p.href, p.impressao)
+                        for p in processos
+                    ],
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO blocos VALUES (?, ?, ?, ?, ?)",
+                    (
+                        escopo,
+                        bloco_id,
+                        primeira_pagina,
+                        len(processos),
+                        lido_em if lido_em is not None else time.time(),
+                    ),
+                )
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def atualizar_anotacoes(
+        self, escopo: str, bloco_id: int, anotacoes: dict[str, str], *, descartar: Iterable[str] = ()
+    ) -> None:
+        """
+        Registra anotações gravadas pela própria automação, para não aparecerem
+        como alteração na próxima leitura. Processos em `descartar` (ex.: falhas)
+        saem do snapshot e voltam como adicionados na próxima leitura.
+        """
+        descartar = set(descartar)
+        snapshot = self.carregar(escopo, bloco_id)
+        if snapshot is None or not (anotacoes or descartar):
+            return
+        processos = []
+        for processo in snapshot.processos.values():
+            if processo.numero in descartar:
+                continue
+            anotacao = anotacoes.get(processo.numero)
+            if anotacao is not None:
+                processo = ProcessoSnapshot(
+                    processo.numero,
+                    processo.seq,
+                    processo.tipo,
+                    anotacao,
+                    processo.href,
+                    _impressao(processo.numero, processo.seq, processo.tipo, anotacao),
+                )
+            processos.append(processo)
+        # a primeira página também pode ter mudado: deixa de valer para a detecção rápida
+        self.gravar(escopo, bloco_id, processos, primeira_pagina=None, lido_em=snapshot.lido_em)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> "SnapshotStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _snapshot_path(settings: Settings) -> Path:
+    return settings.cache_dir / "snapshots" / f"{settings.cache_key}.sqlite3"
+
+
+class LeituraIncremental:
+    """
+    Compara uma leitura do bloco, registro a registro, com o snapshot anterior
+    e grava o novo snapshot ao concluir.
+
+    Uso: `primeira_pagina_inalterada` logo após abrir o bloco (permite encerrar
+    sem paginar), `classificar` para cada registro lido e `concluir` quando a
+    leitura chegar ao fim — uma leitura interrompida não substitui o snapshot.
+    """
+
+    def __init__(self, store: SnapshotStore, escopo: str, bloco_id: int) -> None:
+        self.store = store
+        self.escopo = escopo
+        self.bloco_id = bloco_id
+        self.anterior = store.carregar(escopo, bloco_id)
+        self.inalterado = False
+        self._primeira_pagina: str | None = None
+        self._lendo_primeira: list[LinhaProcesso] | None = []
+        self._atuais: dict[str, ProcessoSnapshot] = {}
+        self.diferenca = DiferencaBloco()
+
+    @property
+    def processos_anteriores(self) -> dict[str, ProcessoSnapshot]:
+        return self.anterior.processos if self.anterior is not None else {}
+
+    def primeira_pagina_inalterada(self, registros: list[LinhaProcesso], total: int | None) -> bool:
+        """
+        True se a primeira página é idêntica à do snapshot e o total de
+        processos também confere (lido da legenda da tabela ou, num bloco de
+        uma página só, o próprio número de linhas).
+        """
+        anterior = self.anterior
+        if anterior is None or anterior.primeira_pagina != impressao_pagina(registros):
+            return False
+        if total is None:
+            total = len([registro for registro in registros if registro.numero])
+        self.inalterado = anterior.total == total
+        return self.inalterado
+
+    def _acompanhar_primeira_pagina(self, registro: LinhaProcesso) -> None:
+        # os índices das linhas recomeçam a cada página
+        lendo = self._lendo_primeira
+        if lendo is None:
+            return
+        if lendo and registro.indice <= lendo[-1].indice:
+            self._fechar_primeira_pagina()
+        else:
+            lendo.append(registro)
+
+    def _fechar_primeira_pagina(self) -> None:
+        if self._lendo_primeira is not None:
+            self._primeira_pagina = impressao_pagina(self._lendo_primeira)
+            self._lendo_primeira = None
+
+    def classificar(self, registro: LinhaProcesso) -> str | None:
+        """`ADICIONADO`, `ALTERADO` ou None (igual ao snapshot) para o registro lido."""
+        atual = ProcessoSnapshot.de_registro(registro)
+        if atual.numero in self._atuais:
+            return None
+        self._acompanhar_primeira_pagina(registro)
+        self._atuais[atual.numero] = atual
+        antigo = self.processos_anteriores.get(atual.numero)
+        if antigo is None:
+            self.diferenca.adicionados.append(atual)
+            return ADICIONADO
+        if antigo.impressao != atual.impressao:
+            self.diferenca.alterados.append((antigo, atual))
+            return ALTERADO
+        return None
+
+    def concluir(self) -> DiferencaBloco:
+        """Fecha a comparação (processos não vistos viram removidos) e grava o novo snapshot."""
+        self._fechar_primeira_pagina()
+        self.diferenca.removidos = [
+            processo for numero, processo in self.processos_anteriores.items() if numero not in self._atuais
+        ]
+        self.store.gravar(self.escopo, self.bloco_id, self._atuais.values(), primeira_pagina=self._primeira_pagina)
+        return self.diferenca
@@ -1,7 +1,16 @@
 """Coleção de tarefas automatizadas do SEIAutomation."""
 
 from .download_zip import download_zip_lote
-from .annotate_ok import preencher_anotacoes_ok
+from .annotate_ok import atualizar_anotacoes, planejar_anotacoes, preencher_anotacoes_ok
 from .export_relation import exportar_relacao_csv
+from .pipeline import ResultadoPipeline, executar_pipeline
 
-__all__ = ["download_zip_lote", "preencher_anotacoes_ok", "exportar_relacao_csv"]
+__all__ = [
+    "download_zip_lote",
+    "atualizar_anotacoes",
+    "planejar_anotacoes",
+    "preencher_anotacoes_ok",
+    "exportar_relacao_csv",
+    "executar_pipeline",
+    "ResultadoPipeline",
+]
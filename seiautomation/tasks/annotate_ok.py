@@ -1,15 +1,46 @@
 from __future__ import annotations
 
-from typing import Callable
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Callable, Iterable, Iterator
 
-from playwright.sync_api import TimeoutError
+from playwright.sync_api import Page, Request, TimeoutError
 
-from ..browser import launch_session
+from ..annotation_plan import (
+    AlteracaoAnotacao,
+    PlanoAnotacoes,
+    RegraAnotacao,
+    TextoConstante,
+    anotacao_confere,
+    planejar,
+)
+from ..browser import close_pool, launch_session
+from ..checkpoint import Checkpoint, CheckpointStore
 from ..config import Settings
-from ..navigation import iterar_paginas, login_and_open_bloco
+from ..http_listing import HttpClient, eh_pagina_de_login
+from ..navigation import (
+    DEFAULT_WAIT_TIMEOUT_MS,
+    LinhaProcesso,
+    extrair_linhas,
+    iterar_registros,
+    login_and_open_bloco,
+    total_registros,
+)
+from ..progress import EtapaIniciada, ExecucaoConcluida, ExecucaoIniciada, RegistrosProcessados, emitir
+from ..request_template import AtalhoRequisicao, valores_do_processo
+from ..retry import AgendadorRetentativas, FalhaProcesso, PoliticaRetentativa, TotalAtualizado
+from ..shards import executar_em_shards, particionar, shards_padrao
+from ..snapshots import LeituraIncremental, SnapshotStore
+from ..throttle import Regulador, regular, usar_regulador
+from ..timing import medir, salvar_trace, usar_recorder
+from .common import MAX_FALHAS_ATALHO, escopo_snapshot, registrar_falha_anotacao, valores_anotacao
 
 ProgressFn = Callable[[str], None] | None
 
+TEXTO_ANOTACAO = "OK"
+
 
 def _log(message: str, progress: ProgressFn) -> None:
     if progress:
@@ -18,40 +49,451 @@ def _log(message: str, progress: ProgressFn) -> None:
         print(message)
 
 
-def _atualizar_anotacao(row, numero: str, page, progress: ProgressFn) -> bool:
+def _atualizar_anotacao(
+    row,
+    numero: str,
+    page,
+    progress: ProgressFn,
+    *,
+    texto: str = TEXTO_ANOTACAO,
+    wait_timeout_ms: int = DEFAULT_WAIT_TIMEOUT_MS,
+    atalho: AtalhoRequisicao | None = None,
+    href: str = "",
+) -> bool:
     icon = row.locator("td").nth(5).locator("img[title='Anotações']").first
     icon.click()
-    page.wait_for_timeout(250)
-    modal = page.frame(name="modal-frame")
-    if modal is None:
-        raise RuntimeError("Frame modal-frame não encontrado após abrir anotações.")
-    modal.fill("#txtAnotacao", "OK")
+    with medir("modal_abrir"):
+        page.wait_for_selector("iframe[name='modal-frame']", state="attached", timeout=wait_timeout_ms)
+        modal = page.frame(name="modal-frame")
+        if modal is None:
+            raise RuntimeError("Frame modal-frame não encontrado após abrir anotações.")
+        modal.wait_for_selector("#txtAnotacao", timeout=wait_timeout_ms)
+    modal.fill("#txtAnotacao", texto)
+
+    requisicoes: list[Request] = []
+    ouvir = requisicoes.append
+    # texto vazio não identifica o campo da anotação no formulário
+    aprender = atalho is not None and not atalho.disponivel and bool(texto.strip())
+    if aprender:
+        page.on("request", ouvir)
     try:
         modal.locator("button[name='sbmAlterarRelBlocoProtocolo']").click()
-        page.wait_for_selector("iframe[name='modal-frame']", state="detached", timeout=10000)
+        with medir("modal_fechar"):
+            page.wait_for_selector("iframe[name='modal-frame']", state="detached", timeout=wait_timeout_ms)
     except TimeoutError:
         _log(f"Aviso: modal não fechou automaticamente para {numero}", progress)
-    page.wait_for_timeout(200)
+    finally:
+        if aprender:
+            page.remove_listener("request", ouvir)
+    if aprender:
+        envio = next((request for request in requisicoes if request.method != "GET"), None)
+        if atalho.aprender(envio, valores_do_processo(numero, href), {"anotacao": texto}):
+            _log("Envio da anotação aprendido; as demais alterações serão enviadas sem abrir o modal.", progress)
     return True
 
 
-def preencher_anotacoes_ok(
+def _enviar_direto(
+    client: HttpClient, atalho: AtalhoRequisicao, regulador: Regulador, alteracao: AlteracaoAnotacao
+) -> None:
+    """Repete o envio do modal para o processo; levanta exceção se o SEI não aceitar."""
+    requisicao = atalho.requisicao(valores_anotacao(alteracao.numero, alteracao.href, alteracao.desejado))
+    if requisicao is None:
+        raise RuntimeError("envio direto indisponível")
+    url, kwargs = requisicao
+    body = kwargs.get("data")
+    try:
+        with regulador.requisicao("anotacao_direta"), medir("anotacao_direta"):
+            response = client.request(
+                kwargs["method"],
+                url,
+                body=body.encode("utf-8") if body is not None else None,
+                headers=kwargs.get("headers"),
+            )
+            if not response.ok or eh_pagina_de_login(response):
+                raise RuntimeError(f"HTTP {response.status}")
+    except Exception:
+        atalho.registrar_resultado(False)
+        raise
+    atalho.registrar_resultado(True)
+
+
+def _aplicar_pelo_modal(
+    page: Page,
     settings: Settings,
+    bloco_id: int,
+    alvos: dict[str, AlteracaoAnotacao],
+    agendador: AgendadorRetentativas,
+    progress: ProgressFn,
+    *,
+    auto_credentials: bool,
+    atalho: AtalhoRequisicao | None = None,
+) -> tuple[int, dict[str, AlteracaoAnotacao]]:
+    """
+    Percorre o bloco aplicando as alterações de `alvos` pelo modal; processos que
+    já mostram o texto desejado contam como atualizados. Para de paginar assim
+    que todos forem encontrados.
+
+    Com `atalho`, para também assim que o envio do formulário for aprendido e
+    devolve as alterações ainda não aplicadas, para serem enviadas diretamente.
+    As páginas antes da primeira alteração não são lidas.
+    """
+    total = 0
+    restantes = dict(alvos)
+    login_and_open_bloco(page, settings, bloco_id=bloco_id, progress=progress, auto_credentials=auto_credentials)
+    for registro in iterar_registros(
+        page,
+        progress=progress,
+        wait_timeout_ms=settings.wait_timeout_ms,
+        pagina_inicial=min((alteracao.pagina for alteracao in alvos.values()), default=1),
+    ):
+        alteracao = restantes.pop(registro.numero, None)
+        if alteracao is None:
+            continue
+        numero = alteracao.numero
+        if anotacao_confere(registro.anotacao, alteracao.desejado):
+            agendador.registrar_sucesso(numero)
+            emitir(RegistrosProcessados("anotacao", "atualizado"))
+            total += 1
+        else:
+            try:
+                _log(f"Atualizando anotação de {numero}…", progress)
+                with regular("anotacao", concorrente=True), medir("anotacao_atualizar"):
+                    _atualizar_anotacao(
+                        registro.row(page),
+                        numero,
+                        page,
+                        progress,
+                        texto=alteracao.desejado,
+                        wait_timeout_ms=settings.wait_timeout_ms,
+                        atalho=atalho,
+                        href=registro.href,
+                    )
+                agendador.registrar_sucesso(numero)
+                emitir(RegistrosProcessados("anotacao", "atualizado"))
+                total += 1
+            except Exception as exc:  # noqa: BLE001
+                registrar_falha_anotacao(agendador, numero, exc, progress)
+            finally:
+                page.bring_to_front()
+        if not restantes or (atalho is not None and atalho.disponivel):
+            return total, restantes
+    for numero in restantes:
+        registrar_falha_anotacao(agendador, numero, "processo não encontrado no bloco", progress)
+    return total, {}
+
+
+def _enviar_em_lote(
+    page: Page,
+    alteracoes: dict[str, AlteracaoAnotacao],
+    atalho: AtalhoRequisicao,
+    regulador: Regulador,
+    workers: int,
+    progress: ProgressFn,
+) -> None:
+    """Envia as alterações diretamente, até `workers` de cada vez; as que falham ficam para a conferência."""
+    _log(f"Enviando {len(alteracoes)} anotações diretamente…", progress)
+    client = HttpClient(page.context.cookies(), max_connections=workers)
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="anotacao-direta") as executor:
+            envios = {
+                numero: executor.submit(
+                    contextvars.copy_context().run, _enviar_direto, client, atalho, regulador, alteracao
+                )
+                for numero, alteracao in alteracoes.items()
+            }
+            for numero, envio in envios.items():
+                try:
+                    envio.result()
+                except Exception as exc:  # noqa: BLE001
+                    _log(f"Envio direto falhou para {numero} ({exc}); será refeito pelo modal.", progress)
+    finally:
+        client.close()
+
+
+def _repetir_falhas(
+    page: Page,
+    settings: Settings,
+    bloco_id: int,
+    plano: PlanoAnotacoes,
+    agendador: AgendadorRetentativas,
+    progress: ProgressFn,
+    *,
+    auto_credentials: bool,
+) -> int:
+    """Passada final só com os processos que falharam, na mesma sessão e após o backoff."""
+    total = 0
+    alteracoes = plano.por_numero
+    while pendentes := agendador.pendentes():
+        alvos = {numero: alteracoes[numero] for numero, _ in pendentes}
+        _log(f"Repetindo {len(alvos)} anotações que falharam…", progress)
+        time.sleep(agendador.espera_restante(alvos))
+        aplicados, _ = _aplicar_pelo_modal(
+            page, settings, bloco_id, alvos, agendador, progress, auto_credentials=auto_credentials
+        )
+        total += aplicados
+    return total
+
+
+def aplicar_plano(
+    page: Page,
+    settings: Settings,
+    bloco_id: int,
+    plano: PlanoAnotacoes,
+    agendador: AgendadorRetentativas,
+    progress: ProgressFn,
+    *,
+    auto_credentials: bool,
+    atalho: AtalhoRequisicao | None,
+    regulador: Regulador,
+    workers: int,
+) -> int:
+    """
+    Fase de aplicação: a primeira alteração pelo modal (aprendendo o envio), as
+    demais diretamente, uma releitura para conferir e as retentativas.
+
+    Returns:
+        Quantidade de processos atualizados.
+    """
+    total, restantes = _aplicar_pelo_modal(
+        page,
+        settings,
+        bloco_id,
+        plano.por_numero,
+        agendador,
+        progress,
+        auto_credentials=auto_credentials,
+        atalho=atalho,
+    )
+    if restantes and atalho is not None:
+        _enviar_em_lote(page, restantes, atalho, regulador, workers, progress)
+        _log(f"Conferindo {len(restantes)} anotações enviadas diretamente…", progress)
+        conferidos, _ = _aplicar_pelo_modal(
+            page, settings, bloco_id, restantes, agendador, progress, auto_credentials=auto_credentials
+        )
+        total += conferidos
+    return total + _repetir_falhas(
+        page, settings, bloco_id, plano, agendador, progress, auto_credentials=auto_credentials
+    )
+
+
+def _anotar_shard(
+    alteracoes: list[AlteracaoAnotacao],
+    *,
+    progress: ProgressFn,
+    settings: Settings,
+    bloco_id: int,
+    headless: bool,
+    auto_credentials: bool,
+    direto: bool,
+    retentativas: PoliticaRetentativa | None,
+    workers: int,
+    taxa: float,
+) -> tuple[int, list[FalhaProcesso]]:
+    """Aplica um shard do plano num processo próprio (ver `_aplicar_em_shards`)."""
+    agendador = AgendadorRetentativas(retentativas)
+    regulador = Regulador(taxa=taxa, maximo=workers, progress=progress)
+    atalho = AtalhoRequisicao(MAX_FALHAS_ATALHO) if direto else None
+    try:
+        with usar_regulador(regulador), launch_session(headless=headless) as session:
+            total = aplicar_plano(
+                session.page,
+                settings,
+                bloco_id,
+                PlanoAnotacoes(alteracoes, lidos=len(alteracoes)),
+                agendador,
+                progress,
+                auto_credentials=auto_credentials,
+                atalho=atalho,
+                regulador=regulador,
+                workers=workers,
+            )
+    finally:
+        close_pool()
+    return total, agendador.definitivas()
+
+
+def _aplicar_em_shards(
+    page: Page,
+    settings: Settings,
+    bloco_id: int,
+    plano: PlanoAnotacoes,
+    agendador: AgendadorRetentativas,
+    progress: ProgressFn,
+    *,
+    shards: int,
+    headless: bool,
+    auto_credentials: bool,
+    direto: bool,
+    retentativas: PoliticaRetentativa | None,
+    atalho: AtalhoRequisicao | None,
+    regulador: Regulador,
+    workers: int,
+) -> int:
+    """
+    Divide o plano entre `shards` processos do sistema, cada um com o próprio
+    navegador (autenticado pela sessão salva) aplicando a sua parte como
+    `aplicar_plano`. A taxa de requisições configurada é repartida entre eles.
+
+    As falhas definitivas de cada shard vão para `agendador`; a parte de um
+    shard que morreu é aplicada em seguida na aba principal.
+    """
+    partes = particionar(plano.alteracoes, shards)
+    _log(f"Aplicando {len(plano)} alterações em {len(partes)} shards…", progress)
+    total = 0
+    interrompidas: list[AlteracaoAnotacao] = []
+    for shard in executar_em_shards(
+        _anotar_shard,
+        partes,
+        progress=progress,
+        settings=settings,
+        bloco_id=bloco_id,
+        headless=headless,
+        auto_credentials=auto_credentials,
+        direto=direto,
+        retentativas=retentativas,
+        workers=workers,
+        taxa=settings.max_requests_per_second / len(partes),
+    ):
+        if shard.ok:
+            atualizados, falhas = shard.resultado
+            total += atualizados
+            agendador.incorporar(falhas)
+        else:
+            interrompidas.extend(shard.itens)
+    if interrompidas:
+        _log(f"Aplicando na aba principal as {len(interrompidas)} alterações de shards interrompidos…", progress)
+        total += aplicar_plano(
+            page,
+            settings,
+            bloco_id,
+            PlanoAnotacoes(interrompidas, lidos=len(interrompidas)),
+            agendador,
+            progress,
+            auto_credentials=auto_credentials,
+            atalho=atalho,
+            regulador=regulador,
+            workers=workers,
+        )
+    return total
+
+
+def _contar_lidos(registros: Iterable[LinhaProcesso]) -> Iterator[LinhaProcesso]:
+    for registro in registros:
+        emitir(RegistrosProcessados("leitura", "lido"))
+        yield registro
+
+
+def _ler_plano(
+    page: Page,
+    settings: Settings,
+    regra: RegraAnotacao,
+    progress: ProgressFn,
+    leitura: LeituraIncremental | None = None,
+    checkpoint: Checkpoint | None = None,
+    pagina_inicial: int = 1,
+) -> PlanoAnotacoes:
+    with medir("plano_anotacoes"):
+        registros = _contar_lidos(
+            iterar_registros(
+                page, progress=progress, wait_timeout_ms=settings.wait_timeout_ms, pagina_inicial=pagina_inicial
+            )
+        )
+        if leitura is not None:
+            registros = (registro for registro in registros if leitura.classificar(registro))
+        if checkpoint is None:
+            plano = planejar(registros, regra)
+        else:
+            plano = PlanoAnotacoes()
+            for registro in registros:
+                # processos sem alteração (ou já alterados numa execução interrompida) ficam concluídos
+                concluido = checkpoint.concluido(registro.numero) or plano.considerar(registro, regra) is None
+                checkpoint.registrar(registro, concluido=concluido)
+    _log(plano.relatorio(), progress)
+    return plano
+
+
+def planejar_anotacoes(
+    settings: Settings,
+    regra: RegraAnotacao,
     *,
     headless: bool = True,
     progress: ProgressFn = None,
     auto_credentials: bool = True,
     bloco_id: int | None = None,
-) -> int:
+) -> PlanoAnotacoes:
+    """Lê o bloco e devolve as alterações que `regra` faria, sem alterar nada no SEI."""
+    target_bloco = bloco_id or settings.bloco_id
+    with launch_session(headless=headless) as session:
+        page = session.page
+        login_and_open_bloco(
+            page,
+            settings,
+            bloco_id=target_bloco,
+            progress=progress,
+            auto_credentials=auto_credentials,
+        )
+        return _ler_plano(page, settings, regra, progress)
+
+
+def atualizar_anotacoes(
+    settings: Settings,
+    regra: RegraAnotacao,
+    *,
+    headless: bool = True,
+    progress: ProgressFn = None,
+    auto_credentials: bool = True,
+    bloco_id: int | None = None,
+    dry_run: bool = False,
+    retentativas: PoliticaRetentativa | None = None,
+    direto: bool = True,
+    concurrency: int = 4,
+    incremental: bool = False,
+    resume: bool = False,
+    shards: int | None = 1,
+) -> TotalAtualizado:
     """
-    Define o texto \"OK\" em todas as anotações ainda vazias do bloco.
+    Atualiza as anotações do bloco em duas fases.
+
+    1. Leitura: a relação inteira é lida e comparada com `regra`
+       (`TextoConstante`, `ModeloAnotacao` ou `TabelaAnotacoes`), gerando o plano
+       com o texto atual e o desejado de cada processo que muda. O plano é
+       registrado no log; com `dry_run=True`, ou se nada muda, a execução termina aqui.
+    2. Aplicação: a primeira alteração é feita pelo modal e o envio do formulário
+       é aprendido; as demais são enviadas diretamente (até `concurrency` envios
+       simultâneos, sem paginar). A relação é então relida uma vez para conferir;
+       o que não aparece gravado passa pelo modal.
+
+    Os processos que falham são repetidos, com backoff, numa passada final na
+    mesma sessão (ver `retentativas`).
+
+    Com `incremental=True`, só processos adicionados ou alterados desde a
+    última execução incremental com a mesma regra entram no plano; se a
+    primeira página e o total do bloco não mudaram, nem a leitura é feita.
+
+    O progresso fica registrado em checkpoint (ver `seiautomation.checkpoint`).
+    Com `resume=True`, uma execução interrompida é retomada: a leitura começa
+    na primeira página com processos ainda pendentes e os processos já
+    concluídos não entram no plano.
+
+    Com `shards` maior que 1 (None: um por núcleo), o plano é dividido entre
+    esse número de processos, cada um com o próprio navegador aplicando a sua
+    parte como descrito acima.
 
     Returns:
-        Quantidade de processos atualizados.
+        Quantidade de processos atualizados; `resultado.falhas` traz os que
+        esgotaram as tentativas.
     """
     total_atualizados = 0
     target_bloco = bloco_id or settings.bloco_id
-    with launch_session(headless=headless) as session:
+    workers = max(1, concurrency)
+    shards = shards_padrao() if shards is None else max(1, shards)
+    agendador = AgendadorRetentativas(retentativas)
+    regulador = Regulador(taxa=settings.max_requests_per_second, maximo=workers, progress=progress)
+    atalho = AtalhoRequisicao(MAX_FALHAS_ATALHO) if direto else None
+    escopo = escopo_snapshot(regra)
+    with usar_recorder() as tempos, usar_regulador(regulador), launch_session(headless=headless) as session, (
+        SnapshotStore(settings) if incremental else nullcontext()
+    ) as snapshots, CheckpointStore(settings) as checkpoints:
         page = session.page
         login_and_open_bloco(
             page,
@@ -60,19 +502,125 @@ def preencher_anotacoes_ok(
             progress=progress,
             auto_credentials=auto_credentials,
         )
+        emitir(ExecucaoIniciada("anotacoes", target_bloco))
+        emitir(EtapaIniciada("leitura", total_registros(page)))
+        checkpoint = Checkpoint(checkpoints, escopo, target_bloco, retomar=resume)
+        pagina_inicial = checkpoint.pagina_inicial() if checkpoint.retomado else 1
+        if pagina_inicial > 1:
+            _log(f"Retomando a execução interrompida a partir da página {pagina_inicial}.", progress)
+        # a comparação incremental precisa da relação inteira
+        leitura = (
+            LeituraIncremental(snapshots, escopo, target_bloco)
+            if snapshots is not None and pagina_inicial == 1
+            else None
+        )
+        if leitura is not None and leitura.primeira_pagina_inalterada(extrair_linhas(page), total_registros(page)):
+            _log(f"Bloco {target_bloco} sem alterações desde a última execução; nada a planejar.", progress)
+            checkpoint.encerrar()
+            emitir(ExecucaoConcluida({"planejadas": 0, "atualizadas": 0, "falhas": 0}))
+            return TotalAtualizado(0)
+        plano = _ler_plano(page, settings, regra, progress, leitura, checkpoint, pagina_inicial)
+        if leitura is not None and not dry_run:
+            _log(f"Desde a última execução: {leitura.concluir().resumo()}", progress)
+        if dry_run:
+            _log("Simulação: nenhuma anotação foi alterada.", progress)
+            checkpoint.encerrar()
+            emitir(ExecucaoConcluida({"planejadas": len(plano), "atualizadas": 0, "falhas": 0}))
+            return TotalAtualizado(0)
+        if not plano:
+            _log("Nenhuma anotação a alterar.", progress)
+            checkpoint.encerrar()
+            emitir(ExecucaoConcluida({"planejadas": 0, "atualizadas": 0, "falhas": 0}))
+            return TotalAtualizado(0)
 
-        for row, numero in iterar_paginas(page, progress=progress):
-            anotacao = row.locator("td").nth(4).inner_text(timeout=5000).strip()
-            if anotacao == "OK":
-                continue
-            try:
-                _log(f"Atualizando anotação de {numero}…", progress)
-                if _atualizar_anotacao(row, numero, page, progress):
-                    total_atualizados += 1
-            except Exception as exc:  # noqa: BLE001
-                _log(f"Falha ao atualizar {numero}: {exc}", progress)
-            finally:
-                page.bring_to_front()
+        emitir(EtapaIniciada("anotacao", len(plano)))
 
-    _log(f"Total de anotações atualizadas: {total_atualizados}", progress)
-    return total_atualizados
+        if shards > 1 and len(plano) > 1:
+            total_atualizados = _aplicar_em_shards(
+                page,
+                settings,
+                target_bloco,
+                plano,
+                agendador,
+                progress,
+                shards=shards,
+                headless=headless,
+                auto_credentials=auto_credentials,
+                direto=direto,
+                retentativas=retentativas,
+                atalho=atalho,
+                regulador=regulador,
+                workers=workers,
+            )
+        else:
+            total_atualizados = aplicar_plano(
+                page,
+                settings,
+                target_bloco,
+                plano,
+                agendador,
+                progress,
+                auto_credentials=auto_credentials,
+                atalho=atalho,
+                regulador=regulador,
+                workers=workers,
+            )
+        if snapshots is not None:
+            falhas = {falha.numero for falha in agendador.definitivas()}
+            snapshots.atualizar_anotacoes(
+                escopo,
+                target_bloco,
+                {alteracao.numero: alteracao.desejado for alteracao in plano.alteracoes if alteracao.numero not in falhas},
+                descartar=falhas,
+            )
+        checkpoint.encerrar()
+
+    _log(f"Total de anotações atualizadas: {total_atualizados} de {len(plano)}", progress)
+    if agendador.relatorio():
+        _log(agendador.relatorio(), progress)
+    if regulador.relatorio():
+        _log(regulador.relatorio(), progress)
+    if tempos.relatorio():
+        _log(tempos.relatorio(), progress)
+    if settings.trace_dir is not None:
+        trace = salvar_trace(tempos, settings.trace_dir, f"anotacoes-{target_bloco}")
+        _log(f"Trace de tempos gravado em {trace}", progress)
+    emitir(
+        ExecucaoConcluida(
+            {"planejadas": len(plano), "atualizadas": total_atualizados, "falhas": len(agendador.definitivas())}
+        )
+    )
+    return TotalAtualizado(total_atualizados, agendador.definitivas())
+
+
+def preencher_anotacoes_ok(
+    settings: Settings,
+    *,
+    headless: bool = True,
+    progress: ProgressFn = None,
+    auto_credentials: bool = True,
+    bloco_id: int | None = None,
+    dry_run: bool = False,
+    retentativas: PoliticaRetentativa | None = None,
+    direto: bool = True,
+    concurrency: int = 4,
+    incremental: bool = False,
+    resume: bool = False,
+    shards: int | None = 1,
+) -> TotalAtualizado:
+    """Define o texto \"OK\" nas anotações do bloco (ver `atualizar_anotacoes`)."""
+    return atualizar_anotacoes(
+        settings,
+        TextoConstante(TEXTO_ANOTACAO),
+        headless=headless,
+        progress=progress,
+        auto_credentials=auto_credentials,
+        bloco_id=bloco_id,
+        dry_run=dry_run,
+        retentativas=retentativas,
+        direto=direto,
+        concurrency=concurrency,
+        incremental=incremental,
+        resume=resume,
+        shards=shards,
+    )
@@ -0,0 +1,251 @@
+"""Auxiliares compartilhados pelas tarefas síncronas e pelo motor assíncrono (`seiautomation.aio`)."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+from playwright.sync_api import TimeoutError
+
+from ..annotation_plan import PlanoAnotacoes, RegraAnotacao
+from ..checkpoint import Checkpoint, CheckpointStore
+from ..config import Settings
+from ..export_formats import EscritorRelacao, nome_do_arquivo, pode_anexar, validar_formato
+from ..manifest import DownloadManifest, sanitizar_numero
+from ..navigation import LinhaProcesso
+from ..progress import BytesBaixados, RegistrosProcessados, emitir
+from ..request_template import nome_do_anexo, valores_do_processo
+from ..retry import AgendadorRetentativas
+from ..zip_storage import ZipSalvo
+
+ProgressFn = Callable[[str], None] | None
+
+# memória reservada por contexto/aba do Chromium ao dimensionar a concorrência automática
+_MEMORIA_POR_WORKER = 400 * 1024 * 1024
+_MAX_WORKERS_AUTOMATICO = 8
+# downloads por processo quando o ZIP recebido está corrompido
+TENTATIVAS_ZIP = 3
+# falhas seguidas do atalho direto (ZIP ou anotação) antes de voltar a usar só a interface
+MAX_FALHAS_ATALHO = 3
+
+
+def _log(message: str, progress: ProgressFn) -> None:
+    if progress:
+        progress(message)
+    else:
+        print(message)
+
+
+def concorrencia_padrao() -> int:
+    por_cpu = max(1, (os.cpu_count() or 2) // 2)
+    try:
+        memoria = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        return min(por_cpu, _MAX_WORKERS_AUTOMATICO)
+    por_memoria = max(1, int(memoria * 0.5) // _MEMORIA_POR_WORKER)
+    return min(por_cpu, por_memoria, _MAX_WORKERS_AUTOMATICO)
+
+
+def eh_zip(corpo: bytes) -> bool:
+    return corpo[:4] in (b"PK\x03\x04", b"PK\x05\x06")
+
+
+def nome_zip(numero: str, content_disposition: str | None) -> str:
+    return f"{sanitizar_numero(numero)}_{nome_do_anexo(content_disposition, 'processo.zip').replace(' ', '_')}"
+
+
+def registrar_download(manifesto: DownloadManifest, numero: str, salvo: ZipSalvo, bloco_id: int) -> None:
+    manifesto.registrar(
+        numero,
+        salvo.arquivo,
+        tamanho=salvo.tamanho,
+        sha256=salvo.sha256,
+        bloco_id=bloco_id,
+    )
+    emitir(BytesBaixados(salvo.tamanho))
+    emitir(RegistrosProcessados("download", "baixado"))
+
+
+def registrar_falha_download(
+    agendador: AgendadorRetentativas, numero: str, exc: BaseException | str, href: str, progress: ProgressFn
+) -> None:
+    motivo = f"Tempo esgotado ao baixar {numero}" if isinstance(exc, TimeoutError) else f"Falha ao baixar {numero}: {exc}"
+    if agendador.registrar_falha(numero, exc, href):
+        _log(f"{motivo} (nova tentativa ao final)", progress)
+    else:
+        _log(f"{motivo} (tentativas esgotadas)", progress)
+
+
+def valores_anotacao(numero: str, href: str, texto: str) -> dict[str, str]:
+    return {**valores_do_processo(numero, href), "anotacao": texto}
+
+
+def registrar_falha_anotacao(
+    agendador: AgendadorRetentativas, numero: str, exc: BaseException | str, progress: ProgressFn
+) -> None:
+    if agendador.registrar_falha(numero, exc):
+        _log(f"Falha ao atualizar {numero}: {exc} (nova tentativa ao final)", progress)
+    else:
+        _log(f"Falha ao atualizar {numero}: {exc} (tentativas esgotadas)", progress)
+
+
+def escopo_snapshot(regra: RegraAnotacao) -> str:
+    # cada regra tem o próprio snapshot: trocar a regra exige reavaliar o bloco inteiro
+    return "anotacao:" + hashlib.sha1(repr(regra).encode("utf-8")).hexdigest()[:12]
+
+
+class RetomadaExportacao:
+    """
+    Checkpoint de uma exportação que pode ser continuada no mesmo arquivo
+    (CSV ou JSON Lines sem compressão).
+
+    O ponto de retomada só avança quando uma página inteira está no disco:
+    guarda o tamanho do arquivo nesse momento e marca os processos da página
+    como concluídos. Ao retomar, o que foi gravado depois disso é descartado e
+    a leitura recomeça na página seguinte.
+    """
+
+    def __init__(self, checkpoint: Checkpoint, arquivo: Path, progress: ProgressFn) -> None:
+        self.checkpoint = checkpoint
+        self.arquivo = arquivo
+        self.anexar = False
+        self.pagina_inicial = 1
+        anterior = Path(checkpoint.dados.get("arquivo", ""))
+        if checkpoint.retomado and anterior.name and anterior.exists():
+            with anterior.open("r+b") as parcial:
+                parcial.truncate(checkpoint.dados["tamanho"])
+            self.arquivo, self.anexar = anterior, True
+            self.pagina_inicial = checkpoint.pagina_inicial()
+            _log(f"Retomando a exportação em {anterior} a partir da página {self.pagina_inicial}.", progress)
+        elif checkpoint.retomado:
+            _log("Arquivo da exportação interrompida não encontrado; recomeçando do zero.", progress)
+            checkpoint.recomecar()
+        self._escritor: EscritorRelacao | None = None
+        self._pagina = self.pagina_inicial
+        self._gravados: list[str] = []
+
+    def iniciar(self, escritor: EscritorRelacao) -> None:
+        self._escritor = escritor
+        if not self.anexar:
+            self._marcar_ponto()
+
+    def _marcar_ponto(self) -> None:
+        self._escritor.descarregar()
+        self.checkpoint.gravar_dados(arquivo=str(self.arquivo), tamanho=self.arquivo.stat().st_size)
+
+    def ja_gravado(self, registro: LinhaProcesso) -> bool:
+        """Registra o processo lido; True se ele já está no arquivo (e não deve ser escrito de novo)."""
+        if registro.pagina != self._pagina:
+            self._marcar_ponto()
+            self.checkpoint.concluir(self._gravados)
+            self._pagina, self._gravados = registro.pagina, []
+        gravado = self.checkpoint.concluido(registro.numero)
+        self.checkpoint.registrar(registro)
+        if not gravado:
+            self._gravados.append(registro.numero)
+        return gravado
+
+
+def validar_etapas(
+    baixar: bool, regra: RegraAnotacao | None, exportar: bool, formato: str, compressao: str | None
+) -> None:
+    """
+    Raises:
+        ValueError: nenhuma etapa selecionada, ou formato de exportação inválido.
+    """
+    if not (baixar or regra is not None or exportar):
+        raise ValueError("Selecione ao menos uma etapa do pipeline.")
+    if exportar:
+        validar_formato(formato, compressao)
+
+
+def arquivo_relacao(settings: Settings, bloco_id: int, formato: str, compressao: str | None) -> Path:
+    timestamp = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
+    return nome_do_arquivo(settings.download_dir / f"bloco_{bloco_id}_relacao_{timestamp}", formato, compressao)
+
+
+class RetomadaPipeline:
+    """
+    Checkpoints das etapas do pipeline, nos mesmos escopos das tarefas avulsas
+    ("download", o da regra de anotação e "exportacao"): a leitura única
+    recomeça na menor página pendente entre as etapas e cada etapa pula o que
+    ela própria já concluiu. Uma execução interrompida do pipeline pode ser
+    retomada pelas tarefas avulsas, e vice-versa.
+    """
+
+    def __init__(
+        self,
+        store: CheckpointStore,
+        bloco_id: int,
+        *,
+        manifesto: DownloadManifest | None,
+        regra: RegraAnotacao | None,
+        relacao: Path | None,
+        formato: str,
+        compressao: str | None,
+        skip_existentes: bool,
+        retomar: bool,
+        progress: ProgressFn,
+    ) -> None:
+        self.manifesto = manifesto
+        self.download = (
+            Checkpoint(store, "download", bloco_id, retomar=retomar and skip_existentes)
+            if manifesto is not None
+            else None
+        )
+        self.anotacao = Checkpoint(store, escopo_snapshot(regra), bloco_id, retomar=retomar) if regra is not None else None
+        self.exportacao: RetomadaExportacao | None = None
+        if relacao is not None and pode_anexar(formato, compressao):
+            self.exportacao = RetomadaExportacao(
+                Checkpoint(store, "exportacao", bloco_id, retomar=retomar), relacao, progress
+            )
+        elif relacao is not None and retomar:
+            _log("Exportação comprimida ou em Parquet não pode ser retomada; a relação recomeça do zero.", progress)
+
+        paginas = [1] if relacao is not None and self.exportacao is None else []
+        if self.download is not None:
+            concluido = lambda numero: numero in manifesto  # noqa: E731
+            paginas.append(self.download.pagina_inicial(concluido) if self.download.retomado else 1)
+        if self.anotacao is not None:
+            paginas.append(self.anotacao.pagina_inicial() if self.anotacao.retomado else 1)
+        if self.exportacao is not None:
+            paginas.append(self.exportacao.pagina_inicial)
+        self.pagina_inicial = min(paginas, default=1)
+        if self.pagina_inicial > 1:
+            _log(f"Retomando a execução interrompida a partir da página {self.pagina_inicial}.", progress)
+
+    @property
+    def relacao(self) -> Path | None:
+        """Arquivo da exportação retomada, se houver."""
+        return self.exportacao.arquivo if self.exportacao is not None else None
+
+    @property
+    def anexar(self) -> bool:
+        return self.exportacao is not None and self.exportacao.anexar
+
+    def exportar(self, registro: LinhaProcesso) -> bool:
+        """False se a linha já está no arquivo da exportação retomada."""
+        return self.exportacao is None or not self.exportacao.ja_gravado(registro)
+
+    def planejar(self, plano: PlanoAnotacoes, registro: LinhaProcesso, regra: RegraAnotacao) -> None:
+        if self.anotacao is None:
+            plano.considerar(registro, regra)
+            return
+        # processos sem alteração (ou já alterados numa execução interrompida) ficam concluídos
+        concluido = self.anotacao.concluido(registro.numero) or plano.considerar(registro, regra) is None
+        self.anotacao.registrar(registro, concluido=concluido)
+
+    def baixar(self, registro: LinhaProcesso) -> None:
+        if self.download is not None:
+            self.download.registrar(registro, concluido=registro.numero in self.manifesto)
+
+    def encerrar(self) -> None:
+        """Pipeline concluído: nenhuma etapa tem o que retomar."""
+        for checkpoint in (self.download, self.anotacao):
+            if checkpoint is not None:
+                checkpoint.encerrar()
+        if self.exportacao is not None:
+            self.exportacao.checkpoint.encerrar()
@@ -1,18 +1,50 @@
 from __future__ import annotations
 
 import os
+import queue
+import threading
+import time
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Callable, Iterable
+from typing import Callable
 
-from playwright.sync_api import Locator, Page, TimeoutError
+from playwright.sync_api import BrowserContext, Locator, Page, Request
 
-from ..browser import launch_session
+from ..browser import ContextoReciclavel, close_pool, launch_session
+from ..checkpoint import Checkpoint, CheckpointStore
 from ..config import Settings
-from ..navigation import iterar_paginas, login_and_open_bloco
+from ..manifest import DownloadManifest, sanitizar_numero
+from ..navigation import extrair_linhas, garantir_login, iterar_registros, login_and_open_bloco, total_registros
+from ..progress import (
+    EtapaIniciada,
+    ExecucaoConcluida,
+    ExecucaoIniciada,
+    RegistrosProcessados,
+    emissor_atual,
+    emitir,
+    usar_emissor,
+)
+from ..request_template import AtalhoRequisicao, valores_do_processo
+from ..retry import AgendadorRetentativas, ArquivosBaixados, FalhaProcesso, PoliticaRetentativa
+from ..shards import executar_em_shards, particionar, shards_padrao
+from ..snapshots import LeituraIncremental, SnapshotStore
+from ..throttle import Regulador, regulador_atual, regular, usar_regulador
+from ..timing import medir, recorder_atual, salvar_trace, usar_recorder
+from ..zip_storage import ZipCorrompidoError, ZipSalvo, salvar_arquivo, salvar_bytes
+from .common import (
+    MAX_FALHAS_ATALHO,
+    TENTATIVAS_ZIP,
+    concorrencia_padrao,
+    eh_zip,
+    nome_zip,
+    registrar_download,
+    registrar_falha_download,
+)
 
 ProgressFn = Callable[[str], None] | None
 
 
+
 def _log(message: str, progress: ProgressFn) -> None:
     if progress:
         progress(message)
@@ -20,50 +52,402 @@ def _log(message: str, progress: ProgressFn) -> None:
         print(message)
 
 
-def _arquivo_ja_existente(download_dir: Path, numero: str) -> bool:
-    sanitized = numero.replace("/", "_").replace(".", "_").replace("-", "_")
-    for name in os.listdir(download_dir):
-        if name.startswith(f"{sanitized}_") and name.endswith(".zip"):
-            return True
-    return False
+def _com_verificacao(baixar: Callable[[], ZipSalvo | None], numero: str, progress: ProgressFn) -> ZipSalvo | None:
+    """Repete o download quando o ZIP recebido não passa na verificação de integridade."""
+    for tentativa in range(1, TENTATIVAS_ZIP + 1):
+        try:
+            return baixar()
+        except ZipCorrompidoError as exc:
+            if tentativa == TENTATIVAS_ZIP:
+                raise
+            _log(f"ZIP corrompido para {numero} ({exc}); baixando novamente ({tentativa + 1}/{TENTATIVAS_ZIP})…", progress)
+    return None
+
+
+def _baixar_zip_direto(
+    context: BrowserContext, atalho: AtalhoRequisicao, numero: str, href: str, download_dir: Path, progress: ProgressFn
+) -> ZipSalvo | None:
+    """Baixa o ZIP pela requisição aprendida; None indica que é preciso usar a interface."""
+    requisicao = atalho.requisicao(valores_do_processo(numero, href))
+    if requisicao is None:
+        return None
+    url, kwargs = requisicao
+    try:
+        with medir("zip_direto"):
+            response = context.request.fetch(url, **kwargs)
+            corpo = response.body()
+    except Exception as exc:  # noqa: BLE001
+        atalho.registrar_resultado(False)
+        _log(f"Atalho do ZIP falhou para {numero} ({exc}); usando a interface.", progress)
+        return None
+    if not response.ok or not eh_zip(corpo):
+        atalho.registrar_resultado(False)
+        _log(f"Atalho do ZIP não retornou um ZIP para {numero} (HTTP {response.status}); usando a interface.", progress)
+        return None
+    try:
+        with medir("zip_gravar"):
+            salvo = salvar_bytes(corpo, download_dir / nome_zip(numero, response.headers.get("content-disposition")))
+    except ZipCorrompidoError as exc:
+        atalho.registrar_resultado(False)
+        _log(f"Atalho do ZIP retornou um arquivo corrompido para {numero} ({exc}); usando a interface.", progress)
+        return None
+    atalho.registrar_resultado(True)
+    _log(f"ZIP salvo: {salvo.arquivo}", progress)
+    return salvo
+
+
+def _baixar_zip_do_popup(
+    popup: Page,
+    numero: str,
+    download_dir: Path,
+    progress: ProgressFn,
+    *,
+    atalho: AtalhoRequisicao | None = None,
+    href: str = "",
+    reaproveitar: bool = False,
+) -> ZipSalvo | None:
+    """
+    Gera e salva o ZIP do processo aberto em `popup`.
+
+    Args:
+        reaproveitar: a aba é a aba de processo reaproveitada (ver
+            `ContextoReciclavel.aba_processo`) e continua aberta no fim.
+    """
+    requisicoes: list[Request] = []
+
+    def anotar(request: Request) -> None:
+        requisicoes.append(request)
+
+    def fechar() -> None:
+        if reaproveitar:
+            popup.remove_listener("request", anotar)
+        else:
+            popup.close()
+
+    if atalho is not None and not atalho.disponivel:
+        popup.on("request", anotar)
+    try:
+        with medir("zip_carregar_processo"):
+            popup.wait_for_load_state("domcontentloaded")
+
+            frame = popup.frame(name="ifrConteudoVisualizacao")
+            if frame is None:
+                raise RuntimeError("iframe ifrConteudoVisualizacao não encontrado ao abrir processo.")
+
+        with medir("zip_gerar"):
+            frame.locator("img[title='Gerar Arquivo ZIP do Processo']").click()
+            zip_frame = popup.frame(name="ifrVisualizacao")
+            if zip_frame is None:
+                raise RuntimeError("iframe ifrVisualizacao não encontrado ao gerar ZIP.")
+
+            zip_frame.wait_for_load_state("domcontentloaded")
+            radio = zip_frame.locator("label:has-text('Todos os documentos disponíveis') input[type='radio']")
+            if radio.count() and not radio.first.is_checked():
+                radio.first.check()
+
+        with medir("zip_aguardar_download"):
+            with popup.expect_download() as download_info:
+                zip_frame.locator("a:has-text('Gerar'), button:has-text('Gerar')").first.click()
+            download = download_info.value
+            origem = Path(download.path())
+        if atalho is not None and requisicoes:
+            atalho.aprender(
+                next((r for r in reversed(requisicoes) if r.url == download.url), None),
+                valores_do_processo(numero, href),
+            )
+        suggested = download.suggested_filename.replace(" ", "_")
+        filename = f"{sanitizar_numero(numero)}_{suggested}"
+    finally:
+        fechar()
+    with medir("zip_gravar"):
+        salvo = salvar_arquivo(origem, download_dir / filename)
+    _log(f"ZIP salvo: {filename}", progress)
+    return salvo
 
 
 def _baixar_zip_de_linha(
-    row: Locator, page: Page, numero: str, download_dir: Path, progress: ProgressFn
-) -> str | None:
-    sanitized = numero.replace("/", "_").replace(".", "_").replace("-", "_")
+    row: Locator,
+    page: Page,
+    numero: str,
+    download_dir: Path,
+    progress: ProgressFn,
+    *,
+    atalho: AtalhoRequisicao | None = None,
+    href: str = "",
+    aba: Callable[[], Page] | None = None,
+) -> ZipSalvo | None:
+    """
+    Args:
+        aba: fornece a aba reaproveitada onde abrir o processo pelo `href`; sem
+            ela (ou sem `href`), o link da linha é clicado e o processo abre num popup.
+    """
     context = page.context
+    if atalho is not None:
+        salvo = _baixar_zip_direto(context, atalho, numero, href, download_dir, progress)
+        if salvo:
+            return salvo
+    if aba is not None and href:
+        return _baixar_zip_por_link(context, href, numero, download_dir, progress, atalho=atalho, aba=aba)
     row_link = row.locator("td").nth(2).locator("a").first
-    with context.expect_page() as popup_info:
+    with medir("zip_abrir_processo"), context.expect_page() as popup_info:
         row_link.click()
-    popup = popup_info.value
-    popup.wait_for_load_state("domcontentloaded")
-
-    frame = popup.frame(name="ifrConteudoVisualizacao")
-    if frame is None:
-        popup.close()
-        raise RuntimeError("iframe ifrConteudoVisualizacao não encontrado ao abrir processo.")
-
-    frame.locator("img[title='Gerar Arquivo ZIP do Processo']").click()
-    zip_frame = popup.frame(name="ifrVisualizacao")
-    if zip_frame is None:
-        popup.close()
-        raise RuntimeError("iframe ifrVisualizacao não encontrado ao gerar ZIP.")
-
-    zip_frame.wait_for_load_state("domcontentloaded")
-    radio = zip_frame.locator("label:has-text('Todos os documentos disponíveis') input[type='radio']")
-    if radio.count() and not radio.first.is_checked():
-        radio.first.check()
-
-    with popup.expect_download() as download_info:
-        zip_frame.locator("a:has-text('Gerar'), button:has-text('Gerar')").first.click()
-    download = download_info.value
-    suggested = download.suggested_filename.replace(" ", "_")
-    filename = f"{sanitized}_{suggested}"
-    download.save_as(str(download_dir / filename))
-    popup.close()
-    _log(f"ZIP salvo: {filename}", progress)
-    return filename
+    return _baixar_zip_do_popup(popup_info.value, numero, download_dir, progress, atalho=atalho, href=href)
+
+
+def _baixar_zip_por_link(
+    context: BrowserContext,
+    url: str,
+    numero: str,
+    download_dir: Path,
+    progress: ProgressFn,
+    *,
+    atalho: AtalhoRequisicao | None = None,
+    aba: Callable[[], Page] | None = None,
+) -> ZipSalvo | None:
+    """
+    Args:
+        aba: fornece a aba reaproveitada onde abrir o processo; sem ela, cada
+            processo abre (e fecha) uma aba nova.
+    """
+    if atalho is not None:
+        salvo = _baixar_zip_direto(context, atalho, numero, url, download_dir, progress)
+        if salvo:
+            return salvo
+    popup = aba() if aba is not None else context.new_page()
+    try:
+        with medir("zip_abrir_processo"):
+            popup.goto(url, wait_until="domcontentloaded")
+    except Exception:
+        if aba is None:
+            popup.close()
+        raise
+    return _baixar_zip_do_popup(
+        popup, numero, download_dir, progress, atalho=atalho, href=url, reaproveitar=aba is not None
+    )
+
+
+def baixar_em_paralelo(
+    settings: Settings,
+    itens: list[tuple[str, str]],
+    *,
+    concurrency: int,
+    headless: bool,
+    auto_credentials: bool,
+    manifesto: DownloadManifest,
+    bloco_id: int,
+    atalho: AtalhoRequisicao | None,
+    agendador: AgendadorRetentativas,
+    progress: ProgressFn,
+) -> list[str]:
+    """
+    Distribui os processos entre `concurrency` workers, cada um com sua própria
+    thread, navegador e contexto autenticado pela sessão salva no login principal.
+    Cada worker abre os processos numa única aba e troca de contexto conforme
+    `settings.recycle_after`/`settings.recycle_memory_mb` (ver `ContextoReciclavel`).
+    """
+    fila: queue.Queue[tuple[str, str]] = queue.Queue()
+    for item in itens:
+        fila.put(item)
+
+    lock = threading.Lock()
+    arquivos: list[str] = []
+    regulador = regulador_atual()
+    emissor = emissor_atual()
+    tempos = recorder_atual()
+
+    def log(message: str) -> None:
+        with lock:
+            _log(message, progress)
+
+    def worker(indice: int) -> None:
+        prefixo = f"[worker {indice}] "
+        try:
+            worker_log = lambda msg: log(prefixo + msg)  # noqa: E731
+            with usar_regulador(regulador), usar_emissor(emissor), usar_recorder(tempos), ContextoReciclavel(
+                headless=headless, limite=settings.recycle_after, memoria_mb=settings.recycle_memory_mb
+            ) as sessao:
+                garantir_login(sessao.page, settings, progress=worker_log, auto_credentials=auto_credentials)
+                while True:
+                    try:
+                        numero, url = fila.get_nowait()
+                    except queue.Empty:
+                        break
+                    try:
+                        with regular("download", concorrente=True):
+                            salvo = _com_verificacao(
+                                lambda: _baixar_zip_por_link(
+                                    sessao.context,
+                                    url,
+                                    numero,
+                                    manifesto.download_dir,
+                                    worker_log,
+                                    atalho=atalho,
+                                    aba=sessao.aba_processo,
+                                ),
+                                numero,
+                                worker_log,
+                            )
+                        if salvo:
+                            registrar_download(manifesto, numero, salvo, bloco_id)
+                            with lock:
+                                arquivos.append(salvo.arquivo)
+                    except Exception as exc:  # noqa: BLE001
+                        registrar_falha_download(agendador, numero, exc, url, worker_log)
+                    if sessao.registrar_processo():
+                        worker_log("Renovando o contexto do navegador para liberar memória…")
+                        sessao.renovar()
+                        garantir_login(sessao.page, settings, progress=worker_log, auto_credentials=auto_credentials)
+        except Exception as exc:  # noqa: BLE001
+            log(f"{prefixo}Worker interrompido: {exc}")
+        finally:
+            close_pool()
+
+    total = min(concurrency, len(itens))
+    _log(f"Baixando {len(itens)} processos com {total} workers em paralelo…", progress)
+    threads = [
+        threading.Thread(target=worker, args=(indice,), name=f"download-zip-{indice}", daemon=True)
+        for indice in range(1, total + 1)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    restantes = fila.qsize()
+    if restantes:
+        _log(f"Aviso: {restantes} processos não foram baixados (workers encerrados).", progress)
+        while not fila.empty():
+            numero, url = fila.get_nowait()
+            agendador.registrar_falha(numero, "worker encerrado", url)
+    return arquivos
+
+
+def repetir_downloads(
+    context: BrowserContext,
+    agendador: AgendadorRetentativas,
+    manifesto: DownloadManifest,
+    bloco_id: int,
+    atalho: AtalhoRequisicao | None,
+    progress: ProgressFn,
+) -> list[str]:
+    """
+    Passada final só com os processos que falharam, reaproveitando o contexto já
+    autenticado e respeitando o backoff de cada um.
+    """
+    arquivos: list[str] = []
+    while pendentes := agendador.pendentes():
+        _log(f"Repetindo {len(pendentes)} processos que falharam…", progress)
+        for numero, href in pendentes:
+            time.sleep(agendador.espera_restante([numero]))
+            try:
+                with regular("download", concorrente=True):
+                    salvo = _com_verificacao(
+                        lambda: _baixar_zip_por_link(
+                            context, href, numero, manifesto.download_dir, progress, atalho=atalho
+                        ),
+                        numero,
+                        progress,
+                    )
+            except Exception as exc:  # noqa: BLE001
+                registrar_falha_download(agendador, numero, exc, href, progress)
+                continue
+            agendador.registrar_sucesso(numero)
+            if salvo:
+                registrar_download(manifesto, numero, salvo, bloco_id)
+                arquivos.append(salvo.arquivo)
+    return arquivos
+
+
+def _baixar_shard(
+    itens: list[tuple[str, str]],
+    *,
+    progress: ProgressFn,
+    settings: Settings,
+    bloco_id: int,
+    concurrency: int,
+    headless: bool,
+    auto_credentials: bool,
+    zip_direto: bool,
+    retentativas: PoliticaRetentativa | None,
+    taxa: float,
+) -> tuple[list[str], list[FalhaProcesso]]:
+    """Baixa um shard num processo próprio (ver `_baixar_em_shards`), com retentativas."""
+    agendador = AgendadorRetentativas(retentativas)
+    atalho = AtalhoRequisicao(MAX_FALHAS_ATALHO) if zip_direto else None
+    regulador = Regulador(taxa=taxa, maximo=concurrency, progress=progress)
+    with DownloadManifest(settings.download_dir) as manifesto, usar_regulador(regulador), usar_recorder() as tempos:
+        arquivos = baixar_em_paralelo(
+            settings,
+            itens,
+            concurrency=concurrency,
+            headless=headless,
+            auto_credentials=auto_credentials,
+            manifesto=manifesto,
+            bloco_id=bloco_id,
+            atalho=atalho,
+            agendador=agendador,
+            progress=progress,
+        )
+        if agendador.pendentes():
+            try:
+                with launch_session(headless=headless) as session:
+                    garantir_login(session.page, settings, progress=progress, auto_credentials=auto_credentials)
+                    arquivos.extend(repetir_downloads(session.context, agendador, manifesto, bloco_id, atalho, progress))
+            finally:
+                close_pool()
+    if settings.trace_dir is not None:
+        # cada shard tem o próprio recorder; o trace dele vai num arquivo à parte
+        trace = salvar_trace(tempos, settings.trace_dir, f"download-{bloco_id}-shard-{os.getpid()}")
+        _log(f"Trace de tempos gravado em {trace}", progress)
+    return arquivos, agendador.definitivas()
+
+
+def _baixar_em_shards(
+    settings: Settings,
+    itens: list[tuple[str, str]],
+    *,
+    shards: int,
+    concurrency: int,
+    headless: bool,
+    auto_credentials: bool,
+    bloco_id: int,
+    zip_direto: bool,
+    retentativas: PoliticaRetentativa | None,
+    agendador: AgendadorRetentativas,
+    progress: ProgressFn,
+) -> list[str]:
+    """
+    Divide os processos entre `shards` processos do sistema, cada um com
+    `concurrency` workers (ver `baixar_em_paralelo`) e a sessão salva no login
+    principal. A taxa de requisições configurada é repartida entre eles.
+
+    As falhas definitivas de cada shard vão para `agendador`; os processos de
+    um shard que morreu voltam como falhas comuns, para a passada final.
+    """
+    partes = particionar(itens, shards)
+    _log(f"Baixando {len(itens)} processos em {len(partes)} shards com {concurrency} workers cada…", progress)
+    arquivos: list[str] = []
+    for shard in executar_em_shards(
+        _baixar_shard,
+        partes,
+        progress=progress,
+        settings=settings,
+        bloco_id=bloco_id,
+        concurrency=concurrency,
+        headless=headless,
+        auto_credentials=auto_credentials,
+        zip_direto=zip_direto,
+        retentativas=retentativas,
+        taxa=settings.max_requests_per_second / len(partes),
+    ):
+        if shard.ok:
+            baixados, falhas = shard.resultado
+            arquivos.extend(baixados)
+            agendador.incorporar(falhas)
+        else:
+            for numero, url in shard.itens:
+                agendador.registrar_falha(numero, f"shard {shard.indice} interrompido: {shard.erro}", url)
+    return arquivos
 
 
 def download_zip_lote(
@@ -75,7 +459,13 @@ def download_zip_lote(
     limite: int | None = None,
     auto_credentials: bool = True,
     bloco_id: int | None = None,
-) -> Iterable[str]:
+    concurrency: int | None = 1,
+    zip_direto: bool = True,
+    retentativas: PoliticaRetentativa | None = None,
+    incremental: bool = False,
+    resume: bool = False,
+    shards: int | None = 1,
+) -> ArquivosBaixados:
     """
     Faz o download em lote dos ZIPs do bloco configurado.
 
@@ -85,43 +475,191 @@ def download_zip_lote(
         progress: função opcional para atualizar status.
         skip_existentes: se True, não baixa novamente arquivos já existentes.
         limite: limita quantidade de processos a baixar (útil para testes).
+        concurrency: quantidade de workers paralelos; None dimensiona pela CPU/memória.
+        zip_direto: após o primeiro download pela interface, repete a requisição do ZIP
+            diretamente (sem popup), voltando à interface se ela falhar.
+        retentativas: backoff e limite de tentativas por processo; os que falham são
+            repetidos numa passada final, na mesma sessão.
+        incremental: guarda um snapshot do bloco a cada leitura completa e, se a
+            primeira página e o total não mudaram desde o anterior (e todos os
+            processos já estão baixados), encerra sem paginar.
+        resume: retoma uma execução interrompida a partir da primeira página com
+            processos lidos e ainda não baixados (o manifesto diz o que já foi
+            baixado; exige `skip_existentes`).
+        shards: com mais de 1, a relação é lida uma vez e os downloads são
+            divididos entre esse número de processos (cada um com o próprio
+            navegador e `concurrency` workers), aproveitando vários núcleos;
+            None usa um por núcleo.
 
     Returns:
-        Um iterável com os nomes dos arquivos ZIP criados ou reutilizados.
+        Lista com os nomes dos arquivos ZIP criados; `resultado.falhas` traz os
+        processos que esgotaram as tentativas.
     """
 
     arquivos_gerados: list[str] = []
     target_bloco = bloco_id or settings.bloco_id
+    workers = concorrencia_padrao() if concurrency is None else max(1, concurrency)
+    shards = shards_padrao() if shards is None else max(1, shards)
+    pendentes: list[tuple[str, str]] = []
+    atalho = AtalhoRequisicao(MAX_FALHAS_ATALHO) if zip_direto else None
+    agendador = AgendadorRetentativas(retentativas)
+    regulador = Regulador(taxa=settings.max_requests_per_second, maximo=workers, progress=progress)
 
-    with launch_session(headless=headless) as session:
-        page = session.page
-        login_and_open_bloco(
-            page,
-            settings,
-            bloco_id=target_bloco,
-            progress=progress,
-            auto_credentials=auto_credentials,
-        )
-        download_dir = settings.download_dir
-
-        contador = 0
-        for row, numero in iterar_paginas(page, progress=progress):
-            if limite is not None and contador >= limite:
-                break
-            if skip_existentes and _arquivo_ja_existente(download_dir, numero):
-                _log(f"Pulando {numero} (já existe ZIP)", progress)
-                contador += 1
-                continue
-            try:
-                arquivo = _baixar_zip_de_linha(row, page, numero, download_dir, progress)
-                if arquivo:
-                    arquivos_gerados.append(arquivo)
-            except TimeoutError:
-                _log(f"Tempo esgotado ao baixar {numero}", progress)
-            except Exception as exc:  # noqa: BLE001
-                _log(f"Falha ao baixar {numero}: {exc}", progress)
-            finally:
-                contador += 1
-                page.bring_to_front()
+    with DownloadManifest(settings.download_dir) as manifesto, (
+        SnapshotStore(settings) if incremental else nullcontext()
+    ) as snapshots, CheckpointStore(settings) as checkpoints:
+        with usar_recorder() as tempos, usar_regulador(regulador), ContextoReciclavel(
+            headless=headless, limite=settings.recycle_after, memoria_mb=settings.recycle_memory_mb
+        ) as sessao:
+            page = sessao.page
+            login_and_open_bloco(
+                page,
+                settings,
+                bloco_id=target_bloco,
+                progress=progress,
+                auto_credentials=auto_credentials,
+            )
+            emitir(ExecucaoIniciada("download", target_bloco))
+            emitir(EtapaIniciada("download", total_registros(page)))
+            download_dir = settings.download_dir
+            checkpoint = Checkpoint(checkpoints, "download", target_bloco, retomar=resume and skip_existentes)
+            pagina_inicial = checkpoint.pagina_inicial(lambda numero: numero in manifesto) if checkpoint.retomado else 1
+            if pagina_inicial > 1:
+                _log(f"Retomando a execução interrompida a partir da página {pagina_inicial}.", progress)
+            # a comparação incremental precisa da relação inteira
+            leitura = (
+                LeituraIncremental(snapshots, "download", target_bloco)
+                if snapshots is not None and pagina_inicial == 1
+                else None
+            )
+            if (
+                leitura is not None
+                and skip_existentes
+                and leitura.primeira_pagina_inalterada(extrair_linhas(page), total_registros(page))
+                and all(numero in manifesto for numero in leitura.processos_anteriores)
+            ):
+                _log(f"Bloco {target_bloco} sem alterações desde a última leitura; nada a baixar.", progress)
+                checkpoint.encerrar()
+                emitir(ExecucaoConcluida({"arquivos": 0, "falhas": 0}))
+                return ArquivosBaixados()
+
+            contador = 0
+            leitura_completa = True
+            # processos já vistos: ao renovar o contexto, a leitura recomeça na página em que estava
+            vistos: set[str] = set()
+            renovar = True
+            while renovar:
+                renovar = False
+                for registro in iterar_registros(
+                    page, progress=progress, wait_timeout_ms=settings.wait_timeout_ms, pagina_inicial=pagina_inicial
+                ):
+                    numero = registro.numero
+                    if numero in vistos:
+                        continue
+                    if limite is not None and contador >= limite:
+                        leitura_completa = False
+                        break
+                    vistos.add(numero)
+                    if leitura is not None:
+                        leitura.classificar(registro)
+                    checkpoint.registrar(registro, concluido=numero in manifesto)
+                    if skip_existentes and numero in manifesto:
+                        _log(f"Pulando {numero} (já existe ZIP)", progress)
+                        emitir(RegistrosProcessados("download", "pulado"))
+                        contador += 1
+                        continue
+                    if workers > 1 or shards > 1:
+                        pendentes.append((numero, registro.href))
+                        contador += 1
+                        continue
+                    try:
+                        with regular("download", concorrente=True):
+                            salvo = _com_verificacao(
+                                lambda: _baixar_zip_de_linha(
+                                    registro.row(page),
+                                    page,
+                                    numero,
+                                    download_dir,
+                                    progress,
+                                    atalho=atalho,
+                                    href=registro.href,
+                                    aba=sessao.aba_processo,
+                                ),
+                                numero,
+                                progress,
+                            )
+                        if salvo:
+                            registrar_download(manifesto, numero, salvo, target_bloco)
+                            arquivos_gerados.append(salvo.arquivo)
+                    except Exception as exc:  # noqa: BLE001
+                        registrar_falha_download(agendador, numero, exc, registro.href, progress)
+                    finally:
+                        contador += 1
+                        page.bring_to_front()
+                    if sessao.registrar_processo():
+                        pagina_inicial = registro.pagina
+                        renovar = True
+                        break
+                if renovar:
+                    _log(
+                        f"Renovando o contexto do navegador para liberar memória "
+                        f"(retomando na página {pagina_inicial})…",
+                        progress,
+                    )
+                    sessao.renovar()
+                    page = sessao.page
+                    login_and_open_bloco(
+                        page, settings, bloco_id=target_bloco, progress=progress, auto_credentials=auto_credentials
+                    )
+
+            if leitura is not None and leitura_completa:
+                _log(f"Desde a última leitura: {leitura.concluir().resumo()}", progress)
+
+            if pendentes and shards > 1:
+                arquivos_gerados.extend(
+                    _baixar_em_shards(
+                        settings,
+                        pendentes,
+                        shards=shards,
+                        concurrency=workers,
+                        headless=headless,
+                        auto_credentials=auto_credentials,
+                        bloco_id=target_bloco,
+                        zip_direto=zip_direto,
+                        retentativas=retentativas,
+                        agendador=agendador,
+                        progress=progress,
+                    )
+                )
+            elif pendentes:
+                arquivos_gerados.extend(
+                    baixar_em_paralelo(
+                        settings,
+                        pendentes,
+                        concurrency=workers,
+                        headless=headless,
+                        auto_credentials=auto_credentials,
+                        manifesto=manifesto,
+                        bloco_id=target_bloco,
+                        atalho=atalho,
+                        agendador=agendador,
+                        progress=progress,
+                    )
+                )
+            arquivos_gerados.extend(
+                repetir_downloads(sessao.context, agendador, manifesto, target_bloco, atalho, progress)
+            )
+            if leitura_completa:
+                checkpoint.encerrar()
 
-    return arquivos_gerados
+    if agendador.relatorio():
+        _log(agendador.relatorio(), progress)
+    if regulador.relatorio():
+        _log(regulador.relatorio(), progress)
+    if tempos.relatorio():
+        _log(tempos.relatorio(), progress)
+    if settings.trace_dir is not None:
+        trace = salvar_trace(tempos, settings.trace_dir, f"download-{target_bloco}")
+        _log(f"Trace de tempos gravado em {trace}", progress)
+    emitir(ExecucaoConcluida({"arquivos": len(arquivos_gerados), "falhas": len(agendador.definitivas())}))
+    return ArquivosBaixados(arquivos_gerados, agendador.definitivas())
@@ -1,13 +1,29 @@
 from __future__ import annotations
 
-import csv
+from contextlib import ExitStack
 from datetime import datetime
 from pathlib import Path
-from typing import Callable, Iterable
+from typing import Callable, Iterator
 
+from .. import bloco_index
 from ..browser import launch_session
+from ..checkpoint import Checkpoint, CheckpointStore
 from ..config import Settings
-from ..navigation import iterar_paginas, login_and_open_bloco
+from ..export_formats import (
+    COLUNAS,
+    COLUNAS_INCREMENTAIS,
+    EscritorRelacao,
+    linha_da_relacao,
+    nome_do_arquivo,
+    pode_anexar,
+    validar_formato,
+)
+from ..http_listing import HttpClient, SessaoExpiradaError, cliente_da_sessao_salva, iterar_registros_http
+from ..navigation import LinhaProcesso, extrair_linhas, iterar_registros, login_and_open_bloco, total_registros
+from ..progress import EtapaIniciada, ExecucaoConcluida, ExecucaoIniciada, RegistrosProcessados, emitir
+from ..snapshots import REMOVIDO, LeituraIncremental, SnapshotStore
+from ..timing import salvar_trace, usar_recorder
+from .common import RetomadaExportacao
 
 ProgressFn = Callable[[str], None] | None
 
@@ -19,6 +35,84 @@ def _log(message: str, progress: ProgressFn) -> None:
         print(message)
 
 
+def _registros_navegador(
+    settings: Settings,
+    bloco_id: int,
+    *,
+    headless: bool,
+    auto_credentials: bool,
+    progress: ProgressFn,
+    leitura: LeituraIncremental | None = None,
+    pagina_inicial: int = 1,
+) -> Iterator[LinhaProcesso]:
+    with launch_session(headless=headless) as session:
+        page = session.page
+        login_and_open_bloco(
+            page,
+            settings,
+            bloco_id=bloco_id,
+            progress=progress,
+            auto_credentials=auto_credentials,
+        )
+        total = total_registros(page)
+        emitir(EtapaIniciada("exportacao", total))
+        if leitura is not None and leitura.primeira_pagina_inalterada(extrair_linhas(page), total):
+            return
+        yield from iterar_registros(
+            page, progress=progress, wait_timeout_ms=settings.wait_timeout_ms, pagina_inicial=pagina_inicial
+        )
+
+
+def _registros_http(
+    settings: Settings,
+    bloco_id: int,
+    *,
+    headless: bool,
+    auto_credentials: bool,
+    progress: ProgressFn,
+    leitura: LeituraIncremental | None = None,
+    pagina_inicial: int = 1,
+) -> Iterator[LinhaProcesso]:
+    """
+    Lista o bloco por HTTP. Usa a sessão e o link salvos quando existem; caso
+    contrário (ou se o SEI recusar), abre o navegador só para o login e a
+    navegação até o bloco, e segue a listagem com os cookies do contexto.
+
+    A detecção de bloco inalterado pela primeira página (`leitura`) só é feita
+    com o navegador; aqui a comparação com o snapshot é registro a registro.
+    """
+    emitidos: set[str] = set()
+    url = bloco_index.url_do_bloco(settings, bloco_id)
+    client = cliente_da_sessao_salva(settings) if url else None
+    if client is not None:
+        try:
+            for registro in iterar_registros_http(client, url, progress, pagina_inicial=pagina_inicial):
+                emitidos.add(registro.numero)
+                yield registro
+            return
+        except SessaoExpiradaError:
+            _log("Sessão salva recusada na listagem HTTP; abrindo o navegador para novo login…", progress)
+        finally:
+            client.close()
+
+    with launch_session(headless=headless) as session:
+        login_and_open_bloco(
+            session.page,
+            settings,
+            bloco_id=bloco_id,
+            progress=progress,
+            auto_credentials=auto_credentials,
+        )
+        client = HttpClient(session.context.cookies())
+        url = session.page.url
+    try:
+        for registro in iterar_registros_http(client, url, progress, pagina_inicial=pagina_inicial):
+            if registro.numero not in emitidos:
+                yield registro
+    finally:
+        client.close()
+
+
 def exportar_relacao_csv(
     settings: Settings,
     *,
@@ -26,46 +120,106 @@ def exportar_relacao_csv(
     progress: ProgressFn = None,
     bloco_id: int | None = None,
     auto_credentials: bool = True,
-) -> Path:
+    listagem: str = "browser",
+    formato: str = "csv",
+    compressao: str | None = None,
+    incremental: bool = False,
+    resume: bool = False,
+) -> Path | None:
     """
-    Exporta a relação do bloco para um arquivo CSV.
+    Exporta a relação do bloco, gravando as linhas à medida que as páginas são lidas.
+
+    Args:
+        listagem: "browser" lê a tabela pelo Chromium; "http" baixa e interpreta
+            o HTML diretamente, reaproveitando os cookies da sessão autenticada.
+        formato: "csv", "jsonl" (JSON Lines) ou "parquet" (requer `pyarrow`).
+        compressao: None, "gzip" ou "zstd" (requer `zstandard`); no Parquet vira
+            o codec interno das colunas.
+        incremental: compara com o snapshot da exportação incremental anterior e
+            grava só os processos adicionados, alterados ou removidos (coluna
+            `mudanca`); se a primeira página e o total não mudaram, encerra sem paginar.
+        resume: continua a exportação interrompida anterior no mesmo arquivo, a
+            partir da primeira página não gravada por inteiro. Só em CSV ou JSON
+            Lines sem compressão e fora do modo incremental; nos demais casos a
+            exportação recomeça do zero.
 
     Returns:
-        Caminho do arquivo CSV gerado.
+        Caminho do arquivo gerado, ou None numa exportação incremental sem alterações.
     """
+    if listagem not in {"browser", "http"}:
+        raise ValueError(f"Modo de listagem desconhecido: {listagem}")
+    validar_formato(formato, compressao)
     target_bloco = bloco_id or settings.bloco_id
     download_dir = settings.download_dir
     timestamp = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
-    filename = download_dir / f"bloco_{target_bloco}_relacao_{timestamp}.csv"
+    sufixo = "alteracoes" if incremental else "relacao"
+    filename = nome_do_arquivo(download_dir / f"bloco_{target_bloco}_{sufixo}_{timestamp}", formato, compressao)
+    fonte = _registros_http if listagem == "http" else _registros_navegador
+    colunas = COLUNAS_INCREMENTAIS if incremental else COLUNAS
+    leitura: LeituraIncremental | None = None
+    retomada: RetomadaExportacao | None = None
+    retomavel = pode_anexar(formato, compressao) and not incremental
+    if resume and not retomavel:
+        _log("Exportação incremental, comprimida ou em Parquet não pode ser retomada; recomeçando do zero.", progress)
 
-    with launch_session(headless=headless) as session:
-        page = session.page
-        login_and_open_bloco(
-            page,
-            settings,
-            bloco_id=target_bloco,
-            progress=progress,
-            auto_credentials=auto_credentials,
-        )
-
-        rows_data: list[dict[str, str]] = []
-        for row, numero in iterar_paginas(page, progress=progress):
-            seq = row.locator("td").nth(1).inner_text(timeout=5000).strip()
-            tipo = row.locator("td").nth(3).inner_text(timeout=5000).strip()
-            anotacao = row.locator("td").nth(4).inner_text(timeout=5000).strip()
-            rows_data.append(
-                {
-                    "sequencia": seq,
-                    "processo": numero,
-                    "tipo": tipo,
-                    "anotacoes": anotacao,
-                }
+    emitir(ExecucaoIniciada("exportacao", target_bloco))
+    emitir(EtapaIniciada("exportacao"))
+    with ExitStack() as pilha:
+        tempos = pilha.enter_context(usar_recorder())
+        if retomavel:
+            checkpoints = pilha.enter_context(CheckpointStore(settings))
+            retomada = RetomadaExportacao(
+                Checkpoint(checkpoints, "exportacao", target_bloco, retomar=resume), filename, progress
             )
+            filename = retomada.arquivo
+        anexar = retomada is not None and retomada.anexar
+        escritor = pilha.enter_context(EscritorRelacao(filename, formato, compressao, colunas=colunas, anexar=anexar))
+        if retomada is not None:
+            retomada.iniciar(escritor)
+        if incremental:
+            leitura = LeituraIncremental(pilha.enter_context(SnapshotStore(settings)), "exportacao", target_bloco)
+        try:
+            for registro in fonte(
+                settings,
+                target_bloco,
+                headless=headless,
+                auto_credentials=auto_credentials,
+                progress=progress,
+                leitura=leitura,
+                pagina_inicial=retomada.pagina_inicial if retomada is not None else 1,
+            ):
+                if retomada is not None and retomada.ja_gravado(registro):
+                    emitir(RegistrosProcessados("exportacao", "ja_gravado"))
+                    continue
+                if leitura is None:
+                    escritor.escrever(linha_da_relacao(registro))
+                    emitir(RegistrosProcessados("exportacao", "exportado"))
+                elif mudanca := leitura.classificar(registro):
+                    escritor.escrever(linha_da_relacao(registro, mudanca))
+                    emitir(RegistrosProcessados("exportacao", "exportado"))
+                else:
+                    emitir(RegistrosProcessados("exportacao", "inalterado"))
+        except Exception:
+            _log(f"Exportação interrompida; {escritor.linhas} linhas gravadas em {filename}", progress)
+            raise
+        if leitura is not None and not leitura.inalterado:
+            diferenca = leitura.concluir()
+            for removido in diferenca.removidos:
+                escritor.escrever(linha_da_relacao(removido, REMOVIDO))
+            _log(f"Desde a última exportação incremental: {diferenca.resumo()}", progress)
+        if retomada is not None:
+            retomada.checkpoint.encerrar()
 
-    with filename.open("w", newline="", encoding="utf-8") as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=["sequencia", "processo", "tipo", "anotacoes"])
-        writer.writeheader()
-        writer.writerows(rows_data)
-
-    _log(f"Relação exportada para {filename}", progress)
+    if leitura is not None and leitura.inalterado:
+        filename.unlink(missing_ok=True)
+        _log(f"Bloco {target_bloco} sem alterações desde a última exportação incremental.", progress)
+        emitir(ExecucaoConcluida({"linhas": 0}))
+        return None
+    _log(f"Relação exportada para {filename} ({escritor.linhas} linhas)", progress)
+    if tempos.relatorio():
+        _log(tempos.relatorio(), progress)
+    if settings.trace_dir is not None:
+        trace = salvar_trace(tempos, settings.trace_dir, f"exportacao-{target_bloco}")
+        _log(f"Trace de tempos gravado em {trace}", progress)
+    emitir(ExecucaoConcluida({"linhas": escritor.linhas, "arquivo": str(filename)}))
     return filename
@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import contextvars
+import threading
+from contextlib import ExitStack
+from dataclasses import dataclass
+from pathlib import Path
+
+from ..annotation_plan import PlanoAnotacoes, RegraAnotacao
+from ..browser import launch_session
+from ..checkpoint import CheckpointStore
+from ..config import Settings
+from ..export_formats import EscritorRelacao, linha_da_relacao
+from ..manifest import DownloadManifest
+from ..navigation import iterar_registros, login_and_open_bloco, total_registros
+from ..progress import EtapaIniciada, ExecucaoConcluida, ExecucaoIniciada, RegistrosProcessados, emitir
+from ..request_template import AtalhoRequisicao
+from ..retry import AgendadorRetentativas, ArquivosBaixados, PoliticaRetentativa, TotalAtualizado
+from ..throttle import Regulador, usar_regulador
+from ..timing import medir, salvar_trace, usar_recorder
+from .annotate_ok import aplicar_plano
+from .common import MAX_FALHAS_ATALHO, ProgressFn, RetomadaPipeline, arquivo_relacao, validar_etapas
+from .download_zip import baixar_em_paralelo, repetir_downloads
+
+
+def _log(message: str, progress: ProgressFn) -> None:
+    if progress:
+        progress(message)
+    else:
+        print(message)
+
+
+@dataclass(slots=True)
+class ResultadoPipeline:
+    """O que cada etapa selecionada produziu; etapas não selecionadas ficam None."""
+
+    arquivos: ArquivosBaixados | None = None
+    anotacoes: TotalAtualizado | None = None
+    relacao: Path | None = None
+
+    def estatisticas(self) -> dict[str, object]:
+        """Números das etapas executadas, para `progress.ExecucaoConcluida`."""
+        dados: dict[str, object] = {}
+        if self.relacao is not None:
+            dados["relacao"] = str(self.relacao)
+        if self.anotacoes is not None:
+            dados["anotacoes"] = int(self.anotacoes)
+            dados["falhas_anotacoes"] = len(self.anotacoes.falhas)
+        if self.arquivos is not None:
+            dados["arquivos"] = len(self.arquivos)
+            dados["falhas_downloads"] = len(self.arquivos.falhas)
+        return dados
+
+    def resumo(self) -> str:
+        partes = []
+        if self.relacao is not None:
+            partes.append(f"relação em {self.relacao.name}")
+        if self.anotacoes is not None:
+            partes.append(f"{int(self.anotacoes)} anotações atualizadas")
+        if self.arquivos is not None:
+            partes.append(f"{len(self.arquivos)} ZIPs baixados")
+        return ", ".join(partes)
+
+
+def executar_pipeline(
+    settings: Settings,
+    *,
+    baixar: bool = False,
+    regra: RegraAnotacao | None = None,
+    exportar: bool = False,
+    headless: bool = True,
+    progress: ProgressFn = None,
+    auto_credentials: bool = True,
+    bloco_id: int | None = None,
+    concurrency: int = 4,
+    skip_existentes: bool = True,
+    zip_direto: bool = True,
+    direto: bool = True,
+    dry_run: bool = False,
+    retentativas: PoliticaRetentativa | None = None,
+    formato: str = "csv",
+    compressao: str | None = None,
+    resume: bool = False,
+) -> ResultadoPipeline:
+    """
+    Executa várias tarefas no bloco com um único login e uma única leitura da relação.
+
+    Cada registro lido é repassado às etapas selecionadas: `exportar` grava a
+    linha (como em `exportar_relacao_csv`), `regra` a inclui no plano de
+    anotações (como em `atualizar_anotacoes`) e `baixar` enfileira o ZIP
+    (como em `download_zip_lote`). Ao fim da leitura os downloads seguem em
+    `concurrency` workers em segundo plano enquanto o plano de anotações é
+    aplicado na aba principal, de modo que o conjunto leva aproximadamente o
+    tempo da etapa mais lenta.
+
+    A relação exportada mostra as anotações como estavam antes desta execução.
+
+    Args:
+        baixar: baixa os ZIPs do bloco.
+        regra: regra de anotação (ex.: `TextoConstante("OK")`); None não altera anotações.
+        exportar: exporta a relação em `formato`/`compressao`.
+        dry_run: apenas registra o plano de anotações, sem alterá-las.
+        resume: retoma um pipeline (ou as tarefas avulsas) interrompido: a
+            leitura começa na menor página pendente entre as etapas, os ZIPs do
+            manifesto e as anotações já gravadas são pulados e a relação continua
+            no mesmo arquivo (CSV ou JSON Lines sem compressão).
+
+    Raises:
+        ValueError: nenhuma etapa selecionada, ou formato de exportação inválido.
+    """
+    validar_etapas(baixar, regra, exportar, formato, compressao)
+    target_bloco = bloco_id or settings.bloco_id
+    workers = max(1, concurrency)
+    regulador = Regulador(taxa=settings.max_requests_per_second, maximo=workers, progress=progress)
+    falhas_download = AgendadorRetentativas(retentativas)
+    falhas_anotacao = AgendadorRetentativas(retentativas)
+    atalho_zip = AtalhoRequisicao(MAX_FALHAS_ATALHO) if zip_direto else None
+    atalho_anotacao = AtalhoRequisicao(MAX_FALHAS_ATALHO) if direto else None
+    plano = PlanoAnotacoes() if regra is not None else None
+    pendentes: list[tuple[str, str]] = []
+    arquivos: list[str] = []
+    resultado = ResultadoPipeline()
+
+    with ExitStack() as pilha:
+        tempos = pilha.enter_context(usar_recorder())
+        pilha.enter_context(usar_regulador(regulador))
+        manifesto = pilha.enter_context(DownloadManifest(settings.download_dir)) if baixar else None
+        caminho = arquivo_relacao(settings, target_bloco, formato, compressao) if exportar else None
+        retomada = RetomadaPipeline(
+            pilha.enter_context(CheckpointStore(settings)),
+            target_bloco,
+            manifesto=manifesto,
+            regra=regra,
+            relacao=caminho,
+            formato=formato,
+            compressao=compressao,
+            skip_existentes=skip_existentes,
+            retomar=resume,
+            progress=progress,
+        )
+        escritor = None
+        if caminho is not None:
+            caminho = retomada.relacao or caminho
+            escritor = pilha.enter_context(EscritorRelacao(caminho, formato, compressao, anexar=retomada.anexar))
+            if retomada.exportacao is not None:
+                retomada.exportacao.iniciar(escritor)
+        session = pilha.enter_context(launch_session(headless=headless))
+        page = session.page
+        login_and_open_bloco(
+            page,
+            settings,
+            bloco_id=target_bloco,
+            progress=progress,
+            auto_credentials=auto_credentials,
+        )
+        emitir(ExecucaoIniciada("pipeline", target_bloco))
+        emitir(EtapaIniciada("leitura", total_registros(page)))
+
+        with medir("pipeline_leitura"):
+            for registro in iterar_registros(
+                page,
+                progress=progress,
+                wait_timeout_ms=settings.wait_timeout_ms,
+                pagina_inicial=retomada.pagina_inicial,
+            ):
+                emitir(RegistrosProcessados("leitura", "lido"))
+                if escritor is not None and retomada.exportar(registro):
+                    escritor.escrever(linha_da_relacao(registro))
+                if plano is not None:
+                    retomada.planejar(plano, registro, regra)
+                if manifesto is not None:
+                    retomada.baixar(registro)
+                    if skip_existentes and registro.numero in manifesto:
+                        _log(f"Pulando {registro.numero} (já existe ZIP)", progress)
+                    else:
+                        pendentes.append((registro.numero, registro.href))
+
+        if escritor is not None:
+            escritor.close()
+            resultado.relacao = escritor.path
+            _log(f"Relação exportada para {escritor.path} ({escritor.linhas} linhas)", progress)
+
+        def baixar_pendentes() -> None:
+            arquivos.extend(
+                baixar_em_paralelo(
+                    settings,
+                    pendentes,
+                    concurrency=workers,
+                    headless=headless,
+                    auto_credentials=auto_credentials,
+                    manifesto=manifesto,
+                    bloco_id=target_bloco,
+                    atalho=atalho_zip,
+                    agendador=falhas_download,
+                    progress=progress,
+                )
+            )
+
+        # `baixar_em_paralelo` repassa aos workers o regulador ativo neste contexto
+        downloads = threading.Thread(
+            target=contextvars.copy_context().run, args=(baixar_pendentes,), name="pipeline-downloads", daemon=True
+        )
+        if pendentes:
+            emitir(EtapaIniciada("download", len(pendentes)))
+            downloads.start()
+        try:
+            if plano is not None:
+                _log(plano.relatorio(), progress)
+                total = 0
+                if dry_run:
+                    _log("Simulação: nenhuma anotação foi alterada.", progress)
+                elif not plano:
+                    _log("Nenhuma anotação a alterar.", progress)
+                else:
+                    emitir(EtapaIniciada("anotacao", len(plano)))
+                    total = aplicar_plano(
+                        page,
+                        settings,
+                        target_bloco,
+                        plano,
+                        falhas_anotacao,
+                        progress,
+                        auto_credentials=auto_credentials,
+                        atalho=atalho_anotacao,
+                        regulador=regulador,
+                        workers=workers,
+                    )
+                    _log(f"Total de anotações atualizadas: {total} de {len(plano)}", progress)
+                resultado.anotacoes = TotalAtualizado(total, falhas_anotacao.definitivas())
+        finally:
+            if downloads.is_alive():
+                downloads.join()
+
+        if manifesto is not None:
+            arquivos.extend(
+                repetir_downloads(session.context, falhas_download, manifesto, target_bloco, atalho_zip, progress)
+            )
+            resultado.arquivos = ArquivosBaixados(arquivos, falhas_download.definitivas())
+        retomada.encerrar()
+
+    for relatorio in (falhas_download.relatorio(), falhas_anotacao.relatorio(), regulador.relatorio(), tempos.relatorio()):
+        if relatorio:
+            _log(relatorio, progress)
+    if settings.trace_dir is not None:
+        trace = salvar_trace(tempos, settings.trace_dir, f"pipeline-{target_bloco}")
+        _log(f"Trace de tempos gravado em {trace}", progress)
+    _log(f"Pipeline concluído: {resultado.resumo()}", progress)
+    emitir(ExecucaoConcluida(resultado.estatisticas()))
+    return resultado
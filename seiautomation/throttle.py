@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Callable, Iterator
+
+ProgressFn = Callable[[str], None] | None
+
+# latência acima de FATOR_CONGESTIONAMENTO × a linha de base da operação indica SEI sobrecarregado
+FATOR_CONGESTIONAMENTO = 2.0
+_SUAVIZACAO = 0.3
+# a linha de base sobe devagar, para acompanhar um servidor que ficou mais lento de vez
+_DERIVA_BASE = 1.01
+_ESPERA_VAGA = 0.05
+
+
+class TokenBucket:
+    """
+    Limita a taxa de requisições ao SEI (requisições por segundo, com rajadas de
+    até `capacidade`). Compartilhável entre threads e tasks.
+    """
+
+    def __init__(self, taxa: float, capacidade: float | None = None) -> None:
+        self.taxa = taxa
+        self.capacidade = capacidade if capacidade is not None else max(1.0, taxa)
+        self._fichas = self.capacidade
+        self._atualizado = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reservar(self) -> float:
+        """Consome uma ficha e devolve quantos segundos esperar antes de usá-la."""
+        if self.taxa <= 0:
+            return 0.0
+        with self._lock:
+            agora = time.monotonic()
+            self._fichas = min(self.capacidade, self._fichas + (agora - self._atualizado) * self.taxa)
+            self._atualizado = agora
+            self._fichas -= 1
+            if self._fichas >= 0:
+                return 0.0
+            return -self._fichas / self.taxa
+
+
+class ControladorAIMD:
+    """
+    Ajusta o limite de operações simultâneas pelo que o SEI aguenta: sobe uma
+    vaga a cada `limite` operações saudáveis (aumento aditivo) e corta pela
+    metade quando há erro ou a latência passa de `FATOR_CONGESTIONAMENTO` vezes
+    a linha de base daquela operação (redução multiplicativa, no máximo uma
+    vez por janela de latência).
+    """
+
+    def __init__(
+        self,
+        maximo: int,
+        *,
+        minimo: int = 1,
+        inicial: int | None = None,
+        progress: ProgressFn = None,
+    ) -> None:
+        self.maximo = max(1, maximo)
+        self.minimo = max(1, min(minimo, self.maximo))
+        self.limite = max(self.minimo, min(inicial or self.maximo, self.maximo))
+        self.progress = progress
+        self.operacoes = 0
+        self.erros = 0
+        self._latencia: dict[str, float] = {}
+        self._base: dict[str, float] = {}
+        self._credito = 0.0
+        self._ultima_reducao = 0.0
+        self._lock = threading.Lock()
+
+    def registrar(self, nome: str, segundos: float, sucesso: bool = True) -> None:
+        with self._lock:
+            self.operacoes += 1
+            if not sucesso:
+                self.erros += 1
+            anterior = self._latencia.get(nome)
+            media = segundos if anterior is None else anterior + _SUAVIZACAO * (segundos - anterior)
+            self._latencia[nome] = media
+            base = min(self._base.get(nome, math.inf) * _DERIVA_BASE, media)
+            self._base[nome] = base
+
+            limite_anterior = self.limite
+            agora = time.monotonic()
+            if not sucesso or media > FATOR_CONGESTIONAMENTO * base:
+                self._credito = 0.0
+                if agora - self._ultima_reducao >= max(1.0, media):
+                    self.limite = max(self.minimo, self.limite // 2)
+                    self._ultima_reducao = agora
+            elif self.limite < self.maximo:
+                self._credito += 1 / self.limite
+                if self._credito >= 1:
+                    self.limite += 1
+                    self._credito = 0.0
+            mudou = self.limite != limite_anterior
+
+        if mudou and self.progress:
+            self.progress(f"Ajuste de carga: {self.descricao()}")
+
+    def latencia(self, nome: str | None = None) -> float | None:
+        with self._lock:
+            if nome is not None:
+                return self._latencia.get(nome)
+            if not self._latencia:
+                return None
+            return sum(self._latencia.values()) / len(self._latencia)
+
+    def descricao(self) -> str:
+        with self._lock:
+            latencias = ", ".join(f"{nome} {valor * 1000:.0f} ms" for nome, valor in sorted(self._latencia.items()))
+            return f"limite {self.limite}/{self.maximo} simultâneos" + (f", latência {latencias}" if latencias else "")
+
+
+class Regulador:
+    """
+    Ponto único de controle do tráfego para o SEI: taxa máxima (token bucket) e
+    concorrência adaptativa (AIMD), usados por downloads, anotações e navegação.
+    """
+
+    def __init__(self, *, taxa: float, maximo: int = 1, progress: ProgressFn = None) -> None:
+        self.balde = TokenBucket(taxa)
+        self.controlador = ControladorAIMD(maximo, progress=progress)
+        self._ativos = 0
+        self._vagas = threading.Condition()
+
+    def _tentar_vaga(self) -> bool:
+        with self._vagas:
+            if self._ativos >= self.controlador.limite:
+                return False
+            self._ativos += 1
+            return True
+
+    def _liberar_vaga(self) -> None:
+        with self._vagas:
+            self._ativos -= 1
+            self._vagas.notify_all()
+
+    @contextmanager
+    def requisicao(self, nome: str, *, concorrente: bool = True) -> Iterator[None]:
+        """
+        Aguarda a taxa e, se `concorrente`, uma vaga; mede a duração e alimenta o controlador.
+        Operações não concorrentes (ex.: a paginação, sempre em uma única aba) só respeitam a taxa.
+        """
+        time.sleep(self.balde.reservar())
+        if concorrente:
+            with self._vagas:
+                while self._ativos >= self.controlador.limite:
+                    self._vagas.wait(timeout=0.5)
+                self._ativos += 1
+        inicio = time.perf_counter()
+        sucesso = False
+        try:
+            yield
+            sucesso = True
+        finally:
+            self.controlador.registrar(nome, time.perf_counter() - inicio, sucesso)
+            if concorrente:
+                self._liberar_vaga()
+
+    @asynccontextmanager
+    async def requisicao_async(self, nome: str, *, concorrente: bool = True) -> AsyncIterator[None]:
+        """Versão de `requisicao` que espera com `asyncio.sleep` em vez de bloquear o loop."""
+        espera = self.balde.reservar()
+        if espera:
+            await asyncio.sleep(espera)
+        if concorrente:
+            while not self._tentar_vaga():
+                await asyncio.sleep(_ESPERA_VAGA)
+        inicio = time.perf_counter()
+        sucesso = False
+        try:
+            yield
+            sucesso = True
+        finally:
+            self.controlador.registrar(nome, time.perf_counter() - inicio, sucesso)
+            if concorrente:
+                self._liberar_vaga()
+
+    def relatorio(self) -> str:
+        if not self.controlador.operacoes:
+            return ""
+        return (
+            f"Carga no SEI: {self.controlador.operacoes} requisições, {self.controlador.erros} erros; "
+            f"{self.controlador.descricao()}; taxa máxima "
+            + (f"{self.balde.taxa:g}/s" if self.balde.taxa > 0 else "sem limite")
+        )
+
+
+_regulador_atual: ContextVar[Regulador | None] = ContextVar("seiautomation_regulador", default=None)
+
+
+def regulador_atual() -> Regulador | None:
+    return _regulador_atual.get()
+
+
+@contextmanager
+def usar_regulador(regulador: Regulador | None) -> Iterator[Regulador | None]:
+    """Ativa o regulador para o contexto atual (thread ou task asyncio)."""
+    token = _regulador_atual.set(regulador)
+    try:
+        yield regulador
+    finally:
+        _regulador_atual.reset(token)
+
+
+@contextmanager
+def regular(nome: str, *, concorrente: bool = False) -> Iterator[None]:
+    """Passa a operação pelo regulador ativo; sem regulador não faz nada."""
+    regulador = _regulador_atual.get()
+    if regulador is None:
+        yield
+        return
+    with regulador.requisicao(nome, concorrente=concorrente):
+        yield
+
+
+@asynccontextmanager
+async def regular_async(nome: str, *, concorrente: bool = False) -> AsyncIterator[None]:
+    regulador = _regulador_atual.get()
+    if regulador is None:
+        yield
+        return
+    async with regulador.requisicao_async(nome, concorrente=concorrente):
+        yield
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterator
+
+# trechos guardados para o trace; além disso só o resumo continua sendo acumulado
+_MAX_TRECHOS = 100_000
+
+
+def _faixa_atual() -> tuple[int, str]:
+    """Identifica quem está medindo: a task asyncio em execução ou, fora de um loop, a thread."""
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    if task is not None:
+        return id(task), task.get_name()
+    thread = threading.current_thread()
+    return thread.ident or 0, thread.name
+
+
+def _percentil(ordenados: list[float], fracao: float) -> float:
+    """Percentil pelo método do posto mais próximo (`ordenados` em ordem crescente)."""
+    return ordenados[max(0, math.ceil(fracao * len(ordenados)) - 1)]
+
+
+class TimingRecorder:
+    """
+    Acumula quanto tempo cada etapa e cada tipo de espera realmente levaram
+    durante uma execução, além de contadores simples (ex.: requisições
+    bloqueadas do navegador).
+
+    Cada medição também é guardada como um trecho com início, duração e a
+    thread/task que o mediu (até `_MAX_TRECHOS`), para `exportar_trace`.
+    """
+
+    def __init__(self) -> None:
+        self._origem = time.perf_counter()
+        self._origem_epoch = time.time()
+        self._duracoes: dict[str, list[float]] = {}
+        self._contadores: dict[str, int] = {}
+        self._trechos: list[tuple[str, float, float, int]] = []
+        self._faixas: dict[int, tuple[int, str]] = {}
+        self._descartados = 0
+        self._lock = threading.Lock()
+
+    def registrar(self, nome: str, segundos: float, inicio: float | None = None) -> None:
+        """Registra uma medição; `inicio` é o `time.perf_counter()` do começo (padrão: agora - `segundos`)."""
+        if inicio is None:
+            inicio = time.perf_counter() - segundos
+        chave, rotulo = _faixa_atual()
+        with self._lock:
+            self._duracoes.setdefault(nome, []).append(segundos)
+            if len(self._trechos) >= _MAX_TRECHOS:
+                self._descartados += 1
+                return
+            faixa = self._faixas.get(chave)
+            if faixa is None:
+                faixa = self._faixas[chave] = (len(self._faixas) + 1, rotulo)
+            self._trechos.append((nome, inicio - self._origem, segundos, faixa[0]))
+
+    def contar(self, nome: str, quantidade: int = 1) -> None:
+        with self._lock:
+            self._contadores[nome] = self._contadores.get(nome, 0) + quantidade
+
+    def contadores(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._contadores)
+
+    @contextmanager
+    def medir(self, nome: str) -> Iterator[None]:
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.registrar(nome, time.perf_counter() - inicio, inicio)
+
+    def resumo(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            itens = {nome: sorted(valores) for nome, valores in self._duracoes.items()}
+        return {
+            nome: {
+                "count": len(valores),
+                "total": sum(valores),
+                "media": sum(valores) / len(valores),
+                "p50": _percentil(valores, 0.50),
+                "p95": _percentil(valores, 0.95),
+                "max": valores[-1],
+            }
+            for nome, valores in itens.items()
+            if valores
+        }
+
+    def relatorio(self) -> str:
+        linhas = [
+            f"  {nome}: {dados['count']:.0f}x, p50 {dados['p50'] * 1000:.0f} ms, p95 {dados['p95'] * 1000:.0f} ms, "
+            f"máx {dados['max'] * 1000:.0f} ms, total {dados['total']:.1f} s"
+            for nome, dados in sorted(self.resumo().items())
+        ]
+        partes = ["Tempos:\n" + "\n".join(linhas)] if linhas else []
+        if contadores := self.contadores():
+            partes.append(
+                "Contadores:\n" + "\n".join(f"  {nome}: {valor}" for nome, valor in sorted(contadores.items()))
+            )
+        return "\n".join(partes)
+
+    def trace(self) -> dict[str, Any]:
+        """
+        Os trechos no formato Trace Event do Chrome (abre em chrome://tracing ou
+        no Perfetto): um evento "X" por medição, com tempos em microssegundos a
+        partir da criação do recorder, e uma faixa por thread/task.
+        """
+        pid = os.getpid()
+        with self._lock:
+            trechos = list(self._trechos)
+            faixas = list(self._faixas.values())
+            descartados = self._descartados
+        eventos: list[dict[str, Any]] = [
+            {"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": "seiautomation"}}
+        ]
+        eventos.extend(
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": faixa, "args": {"name": rotulo}}
+            for faixa, rotulo in faixas
+        )
+        eventos.extend(
+            {
+                "name": nome,
+                "cat": "seiautomation",
+                "ph": "X",
+                "ts": round(inicio * 1_000_000, 1),
+                "dur": round(duracao * 1_000_000, 1),
+                "pid": pid,
+                "tid": faixa,
+            }
+            for nome, inicio, duracao, faixa in trechos
+        )
+        return {
+            "traceEvents": eventos,
+            "displayTimeUnit": "ms",
+            "otherData": {
+                "inicio": datetime.fromtimestamp(self._origem_epoch).isoformat(timespec="seconds"),
+                "resumo": self.resumo(),
+                "contadores": self.contadores(),
+                "trechos_descartados": descartados,
+            },
+        }
+
+    def exportar_trace(self, arquivo: Path) -> Path:
+        """Grava `trace()` em `arquivo` (JSON), criando a pasta se preciso."""
+        arquivo = Path(arquivo)
+        arquivo.parent.mkdir(parents=True, exist_ok=True)
+        arquivo.write_text(json.dumps(self.trace(), ensure_ascii=False), encoding="utf-8")
+        return arquivo
+
+
+def salvar_trace(recorder: TimingRecorder, diretorio: Path, tarefa: str) -> Path:
+    """Exporta o trace da execução em `diretorio` como `trace-<tarefa>-<data e hora>.json`."""
+    carimbo = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    return recorder.exportar_trace(Path(diretorio) / f"trace-{tarefa}-{carimbo}.json")
+
+
+_recorder_atual: ContextVar[TimingRecorder | None] = ContextVar("seiautomation_timing", default=None)
+
+
+def recorder_atual() -> TimingRecorder | None:
+    return _recorder_atual.get()
+
+
+@contextmanager
+def usar_recorder(recorder: TimingRecorder | None = None) -> Iterator[TimingRecorder]:
+    """Ativa um recorder para o contexto atual (thread ou task asyncio)."""
+    recorder = recorder or TimingRecorder()
+    token = _recorder_atual.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _recorder_atual.reset(token)
+
+
+@contextmanager
+def medir(nome: str) -> Iterator[None]:
+    """Mede o bloco no recorder ativo; sem recorder ativo não faz nada."""
+    recorder = _recorder_atual.get()
+    if recorder is None:
+        yield
+        return
+    with recorder.medir(nome):
+        yield
+
+
+def registrar_desde(nome: str, inicio: float) -> None:
+    """
+    Registra no recorder ativo o trecho iniciado em `inicio` (`time.perf_counter()`)
+    e terminado agora; para trechos que não cabem num `with`, como uma página
+    percorrida por um gerador.
+    """
+    recorder = _recorder_atual.get()
+    if recorder is not None:
+        recorder.registrar(nome, time.perf_counter() - inicio, inicio)
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import errno
+import hashlib
+import os
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+
+_BLOCO = 1024 * 1024
+
+
+class ZipCorrompidoError(RuntimeError):
+    """O arquivo recebido não é um ZIP legível (download truncado ou página de erro)."""
+
+
+@dataclass(slots=True, frozen=True)
+class ZipSalvo:
+    arquivo: str
+    tamanho: int
+    sha256: str
+
+
+def validar_zip(path: Path) -> None:
+    """
+    Confere se o diretório central do ZIP pode ser lido e aponta para dentro do arquivo.
+
+    Raises:
+        ZipCorrompidoError: se o arquivo estiver truncado ou não for um ZIP.
+    """
+    try:
+        tamanho = path.stat().st_size
+        with zipfile.ZipFile(path) as arquivo:
+            for info in arquivo.infolist():
+                if info.header_offset + info.compress_size > tamanho:
+                    raise ZipCorrompidoError(f"{path.name}: entrada {info.filename} além do fim do arquivo")
+    except (zipfile.BadZipFile, OSError, ValueError) as exc:
+        raise ZipCorrompidoError(f"{path.name}: {exc}") from exc
+
+
+def zip_valido(path: Path) -> bool:
+    try:
+        validar_zip(path)
+    except ZipCorrompidoError:
+        return False
+    return True
+
+
+def _temporario(destino: Path) -> Path:
+    return destino.with_name(f".{destino.name}.part")
+
+
+def _publicar(temporario: Path, destino: Path, sha256: str) -> ZipSalvo:
+    try:
+        validar_zip(temporario)
+    except ZipCorrompidoError:
+        temporario.unlink(missing_ok=True)
+        raise
+    tamanho = temporario.stat().st_size
+    os.replace(temporario, destino)
+    return ZipSalvo(arquivo=destino.name, tamanho=tamanho, sha256=sha256)
+
+
+def _hash_arquivo(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as arquivo:
+        while bloco := arquivo.read(_BLOCO):
+            digest.update(bloco)
+    return digest.hexdigest()
+
+
+def salvar_arquivo(origem: Path, destino: Path) -> ZipSalvo:
+    """
+    Publica `origem` (ex.: o arquivo temporário de um download do Playwright) em
+    `destino` sem nunca deixar um ZIP parcial com o nome final.
+
+    Move o arquivo quando origem e destino estão no mesmo sistema de arquivos;
+    caso contrário copia em blocos, calculando o SHA-256 durante a cópia.
+
+    Raises:
+        ZipCorrompidoError: se o conteúdo não for um ZIP legível (nada é publicado).
+    """
+    temporario = _temporario(destino)
+    try:
+        os.replace(origem, temporario)
+    except OSError as exc:
+        if exc.errno != errno.EXDEV:
+            raise
+        digest = hashlib.sha256()
+        with origem.open("rb") as entrada, temporario.open("wb") as saida:
+            while bloco := entrada.read(_BLOCO):
+                digest.update(bloco)
+                saida.write(bloco)
+        sha256 = digest.hexdigest()
+    else:
+        sha256 = _hash_arquivo(temporario)
+    return _publicar(temporario, destino, sha256)
+
+
+def salvar_bytes(corpo: bytes, destino: Path) -> ZipSalvo:
+    """Mesmo que `salvar_arquivo`, para um corpo de resposta já em memória."""
+    temporario = _temporario(destino)
+    digest = hashlib.sha256()
+    with temporario.open("wb") as saida:
+        for inicio in range(0, len(corpo), _BLOCO):
+            bloco = corpo[inicio : inicio + _BLOCO]
+            digest.update(bloco)
+            saida.write(bloco)
+    return _publicar(temporario, destino, digest.hexdigest())
@@ -8,6 +8,7 @@ from urllib import request as urllib_request
 
 import pytest
 
+from seiautomation.browser import close_pool
 from seiautomation.config import Settings
 from seiautomation.devserver.app import run_devserver
 
@@ -65,6 +66,13 @@ def reset_fake_server(fake_server: Dict[str, str]) -> None:
     _post(f"{fake_server['base_url']}/sei/api/reset")
 
 
+@pytest.fixture(autouse=True)
+def close_browser_pool():
+    # o pool da thread principal mantém o loop do Playwright síncrono ativo entre testes
+    yield
+    close_pool()
+
+
 @pytest.fixture
 def fake_settings(monkeypatch: pytest.MonkeyPatch, tmp_path, fake_server: Dict[str, str]) -> Settings:
     monkeypatch.setenv("SEI_USERNAME", "00000000000")
@@ -75,6 +83,7 @@ def fake_settings(monkeypatch: pytest.MonkeyPatch, tmp_path, fake_server: Dict[s
     monkeypatch.setenv("SEI_IS_ADMIN", "true")
     monkeypatch.setenv("SEI_DEV_MODE", "true")
     monkeypatch.setenv("SEI_DEV_BASE_URL", f"{fake_server['base_url']}/sei/")
+    monkeypatch.setenv("SEI_CACHE_DIR", str(tmp_path / "cache"))
 
     settings = Settings.load()
     return settings
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from seiautomation.annotation_plan import (
+    ModeloAnotacao,
+    PlanoAnotacoes,
+    TabelaAnotacoes,
+    TextoConstante,
+    planejar,
+    regra_das_opcoes,
+)
+from seiautomation.navigation import LinhaProcesso
+
+
+def _linha(indice: int, numero: str, anotacao: str = "") -> LinhaProcesso:
+    return LinhaProcesso(indice=indice, seq=str(indice), numero=numero, tipo="Procedimento", anotacao=anotacao, href="")
+
+
+def test_plano_inclui_apenas_alteracoes_reais() -> None:
+    registros = [_linha(1, "0001", "OK"), _linha(2, "0002", ""), _linha(3, "0003", " OK "), _linha(4, "0002", "")]
+    plano = planejar(registros, TextoConstante("OK"))
+    assert plano.lidos == 3
+    assert [(a.numero, a.atual, a.desejado) for a in plano.alteracoes] == [("0002", "", "OK")]
+    assert "0002: '' → 'OK'" in plano.relatorio()
+
+
+def test_plano_vazio_quando_nada_muda() -> None:
+    plano = planejar([_linha(1, "0001", "OK")], TextoConstante("OK"))
+    assert not plano
+    assert plano.resumo() == "0 de 1 anotações a alterar"
+
+
+def test_plano_montado_registro_a_registro() -> None:
+    plano = PlanoAnotacoes()
+    regra = TextoConstante("OK")
+    assert plano.considerar(_linha(1, "0001", ""), regra).desejado == "OK"
+    assert plano.considerar(_linha(2, "0001", ""), regra) is None
+    assert plano.considerar(_linha(3, "0002", "OK"), regra) is None
+    assert (plano.lidos, len(plano)) == (2, 1)
+
+
+def test_modelo_usa_campos_da_linha() -> None:
+    plano = planejar([_linha(7, "0007", "pendente")], ModeloAnotacao("{anotacao} — conferido ({seq})"))
+    assert plano.alteracoes[0].desejado == "pendente — conferido (7)"
+    with pytest.raises(ValueError):
+        ModeloAnotacao("{processo}")
+
+
+def test_tabela_csv_e_json(tmp_path) -> None:
+    csv_path = tmp_path / "relacao.csv"
+    csv_path.write_text("sequencia,processo,tipo,anotacoes\n1,0001,X,Revisar\n2,0002,X,OK\n", encoding="utf-8")
+    plano = planejar([_linha(1, "0001"), _linha(2, "0002", "OK"), _linha(3, "0003")], TabelaAnotacoes.carregar(csv_path))
+    assert [(a.numero, a.desejado) for a in plano.alteracoes] == [("0001", "Revisar")]
+
+    json_path = tmp_path / "anotacoes.json"
+    json_path.write_text(json.dumps({"0003": "Arquivar"}), encoding="utf-8")
+    assert TabelaAnotacoes.carregar(json_path).textos == {"0003": "Arquivar"}
+
+    invalido = tmp_path / "invalido.csv"
+    invalido.write_text("numero;texto\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        TabelaAnotacoes.carregar(invalido)
+
+
+def test_regra_das_opcoes(tmp_path) -> None:
+    assert regra_das_opcoes() is None
+    assert regra_das_opcoes("OK") == TextoConstante("OK")
+    assert regra_das_opcoes(modelo="OK {seq}") == ModeloAnotacao("OK {seq}")
+    assert regra_das_opcoes(tabela={" 0001 ": "Revisar"}) == TabelaAnotacoes({"0001": "Revisar"})
+    json_path = tmp_path / "anotacoes.json"
+    json_path.write_text(json.dumps({"0003": "Arquivar"}), encoding="utf-8")
+    assert regra_das_opcoes(tabela=json_path) == TabelaAnotacoes({"0003": "Arquivar"})
+    with pytest.raises(ValueError, match="só uma regra"):
+        regra_das_opcoes("OK", modelo="OK {seq}")
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import pytest
+
+from seiautomation.batch import ResultadoBloco, ResultadoLote, interpretar_blocos
+from seiautomation.tasks.pipeline import ResultadoPipeline
+
+
+def test_interpretar_blocos_intervalos_e_listas() -> None:
+    assert interpretar_blocos("55") == [55]
+    assert interpretar_blocos("10-12, 31;11") == [10, 11, 12, 31]
+    assert interpretar_blocos("7 8") == [7, 8]
+
+
+@pytest.mark.parametrize("texto", ["", "abc", "12-10", "0", "5-"])
+def test_interpretar_blocos_invalidos(texto: str) -> None:
+    with pytest.raises(ValueError):
+        interpretar_blocos(texto)
+
+
+def test_relatorio_do_lote() -> None:
+    lote = ResultadoLote(
+        [
+            ResultadoBloco(10, 2.0, resultado=ResultadoPipeline(relacao=None)),
+            ResultadoBloco(11, 0.5, erro="Tempo esgotado"),
+        ],
+        segundos=2.5,
+    )
+    assert [bloco.bloco_id for bloco in lote.falhas] == [11]
+    relatorio = lote.relatorio()
+    assert "Lote de 2 blocos em 2.5 s (1 com erro)" in relatorio
+    assert "bloco 11: 0.5 s — erro: Tempo esgotado" in relatorio
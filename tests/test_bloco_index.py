@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from seiautomation import bloco_index
+
+
+def test_indice_registra_e_invalida_blocos(fake_settings) -> None:
+    base = fake_settings.target_base_url
+    links = [
+        f"{base}controlador.php?acao=rel_bloco_protocolo_listar&id_bloco=55&infra_hash=abc",
+        f"{base}controlador.php?acao=rel_bloco_protocolo_listar&id_bloco=77&infra_hash=def",
+        f"{base}controlador.php?acao=bloco_interno_listar",
+    ]
+    assert bloco_index.registrar_links(fake_settings, links) == 2
+    assert bloco_index.url_do_bloco(fake_settings, 55) == links[0]
+    assert bloco_index.url_do_bloco(fake_settings, 99) is None
+
+    bloco_index.invalidar(fake_settings, 55)
+    assert bloco_index.url_do_bloco(fake_settings, 55) is None
+    assert bloco_index.url_do_bloco(fake_settings, 77) == links[1]
+
+    bloco_index.invalidar(fake_settings)
+    assert bloco_index.url_do_bloco(fake_settings, 77) is None
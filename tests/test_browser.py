@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import threading
+
+import pytest
+
+from seiautomation import browser
+from seiautomation.aio import browser as aio_browser
+from seiautomation.browser import BrowserPool, ContextoReciclavel, memoria_chromium_mb
+
+
+class _PaginaFalsa:
+    def __init__(self, context: "_ContextoFalso") -> None:
+        self.context = context
+
+    def close(self) -> None:
+        self.context.pages.remove(self)
+
+
+class _ContextoFalso:
+    def __init__(self, browser: "_NavegadorFalso") -> None:
+        self.browser = browser
+        self.pages: list[_PaginaFalsa] = []
+        self.cookies_limpos = 0
+        self.fechado = False
+
+    def new_page(self) -> _PaginaFalsa:
+        pagina = _PaginaFalsa(self)
+        self.pages.append(pagina)
+        return pagina
+
+    def clear_cookies(self) -> None:
+        self.cookies_limpos += 1
+
+    def close(self) -> None:
+        self.fechado = True
+
+
+class _NavegadorFalso:
+    def __init__(self) -> None:
+        self.contextos: list[_ContextoFalso] = []
+
+    def is_connected(self) -> bool:
+        return True
+
+    def new_context(self, **kwargs) -> _ContextoFalso:
+        contexto = _ContextoFalso(self)
+        self.contextos.append(contexto)
+        return contexto
+
+
+@pytest.fixture
+def pool_falso(monkeypatch) -> BrowserPool:
+    pool = BrowserPool(max_size=2, idle_timeout=60)
+    navegador = _NavegadorFalso()
+    monkeypatch.setattr(pool, "_browser", lambda headless: navegador)
+    return pool
+
+
+def test_pool_reaproveita_o_contexto_devolvido(pool_falso: BrowserPool) -> None:
+    primeira = pool_falso.acquire()
+    contexto = primeira.context
+    pool_falso.release(primeira)
+    assert contexto.pages == [] and contexto.cookies_limpos == 1
+    assert pool_falso.size == 1
+
+    segunda = pool_falso.acquire()
+    assert segunda.context is contexto
+    assert not contexto.fechado
+    pool_falso.release(segunda, discard=True)
+    assert contexto.fechado and pool_falso.size == 0
+
+
+def test_pool_recusa_contextos_alem_do_limite(pool_falso: BrowserPool) -> None:
+    sessoes = [pool_falso.acquire(), pool_falso.acquire()]
+    with pytest.raises(RuntimeError, match="Limite de 2"):
+        pool_falso.acquire()
+    # com um contexto ocioso de outro modo, ele é descartado para abrir espaço
+    pool_falso.release(sessoes.pop())
+    visivel = pool_falso.acquire(headless=False)
+    assert pool_falso.size == 2 and visivel.context is not sessoes[0].context
+
+
+def test_pool_expira_contextos_ociosos(pool_falso: BrowserPool, monkeypatch) -> None:
+    sessao = pool_falso.acquire()
+    pool_falso.release(sessao)
+    agora = browser.time.monotonic()
+    monkeypatch.setattr(browser.time, "monotonic", lambda: agora + 61)
+    pool_falso.evict_idle()
+    assert sessao.context.fechado and pool_falso.size == 0
+
+
+def test_pool_so_aceita_a_thread_que_o_criou(pool_falso: BrowserPool) -> None:
+    sessao = pool_falso.acquire()
+    erros: list[Exception] = []
+
+    def devolver() -> None:
+        try:
+            pool_falso.release(sessao)
+        except RuntimeError as exc:
+            erros.append(exc)
+
+    thread = threading.Thread(target=devolver)
+    thread.start()
+    thread.join()
+    assert len(erros) == 1 and "thread que o criou" in str(erros[0])
+    assert pool_falso.size == 1
+
+
+class _Sessao:
+    def __init__(self, indice: int) -> None:
+        self.indice = indice
+        self.page = f"pagina-{indice}"
+        self.context = self
+
+
+class _PoolFalso:
+    def __init__(self) -> None:
+        self.abertas = 0
+        self.descartadas: list[int] = []
+        self.devolvidas: list[int] = []
+
+    def acquire(self, headless: bool = True) -> _Sessao:
+        self.abertas += 1
+        return _Sessao(self.abertas)
+
+    def release(self, session: _Sessao, *, discard: bool = False) -> None:
+        (self.descartadas if discard else self.devolvidas).append(session.indice)
+
+
+def test_renova_o_contexto_a_cada_limite_de_processos() -> None:
+    pool = _PoolFalso()
+    with ContextoReciclavel(limite=3, pool=pool) as sessao:
+        sinais = [sessao.registrar_processo() for _ in range(3)]
+        assert sinais == [False, False, True]
+        sessao.renovar()
+        assert sessao.page == "pagina-2"
+        assert not sessao.registrar_processo()
+    assert pool.descartadas == [1]
+    assert pool.devolvidas == [2]
+    assert sessao.renovacoes == 1
+
+
+def test_renova_pela_memoria_medida_periodicamente(monkeypatch) -> None:
+    monkeypatch.setattr(browser, "memoria_chromium_mb", lambda: 2048.0)
+    with ContextoReciclavel(memoria_mb=1024, pool=_PoolFalso()) as sessao:
+        sinais = [sessao.registrar_processo() for _ in range(browser.INTERVALO_MEMORIA)]
+    assert sinais[-1] and not any(sinais[:-1])
+
+
+def test_sem_criterios_nunca_renova() -> None:
+    with ContextoReciclavel(pool=_PoolFalso()) as sessao:
+        assert not any(sessao.registrar_processo() for _ in range(500))
+
+
+
+class _PoolFalsoAsync(_PoolFalso):
+    async def acquire(self, headless: bool = True) -> _Sessao:
+        return _PoolFalso.acquire(self, headless)
+
+    async def release(self, session: _Sessao, *, discard: bool = False) -> None:
+        _PoolFalso.release(self, session, discard=discard)
+
+
+def test_motor_assincrono_renova_pelo_limite_e_pela_memoria(monkeypatch) -> None:
+    monkeypatch.setattr(aio_browser, "memoria_chromium_mb", lambda: 2048.0)
+    pool = _PoolFalsoAsync()
+
+    async def executar() -> tuple[list[bool], list[bool]]:
+        async with aio_browser.ContextoReciclavel(limite=3, pool=pool) as sessao:
+            por_limite = [await sessao.registrar_processo() for _ in range(3)]
+            await sessao.renovar()
+            assert sessao.page == "pagina-2" and sessao.renovacoes == 1
+        async with aio_browser.ContextoReciclavel(memoria_mb=1024, pool=pool) as sessao:
+            por_memoria = [await sessao.registrar_processo() for _ in range(browser.INTERVALO_MEMORIA)]
+        return por_limite, por_memoria
+
+    por_limite, por_memoria = asyncio.run(executar())
+    assert por_limite == [False, False, True]
+    assert por_memoria[-1] and not any(por_memoria[:-1])
+    assert pool.descartadas == [1]
+    assert pool.devolvidas == [2, 3]
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="memória lida de /proc")
+def test_memoria_dos_processos_filhos() -> None:
+    assert memoria_chromium_mb() >= 0
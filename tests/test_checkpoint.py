@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from seiautomation.checkpoint import Checkpoint, CheckpointStore
+from seiautomation.navigation import LinhaProcesso
+
+
+def _registro(numero: str, pagina: int) -> LinhaProcesso:
+    return LinhaProcesso(indice=1, seq="1", numero=numero, tipo="Procedimento", anotacao="", href="", pagina=pagina)
+
+
+def test_retomada_pela_primeira_pagina_pendente(fake_settings) -> None:
+    with CheckpointStore(fake_settings) as store:
+        checkpoint = Checkpoint(store, "download", 55, retomar=True)
+        assert not checkpoint.retomado
+        checkpoint.registrar(_registro("0001", 1), concluido=True)
+        checkpoint.registrar(_registro("0002", 2))
+        checkpoint.registrar(_registro("0003", 3), concluido=True)
+        checkpoint.gravar_dados(arquivo="relacao.csv")
+
+    with CheckpointStore(fake_settings) as store:
+        retomado = Checkpoint(store, "download", 55, retomar=True)
+        assert retomado.retomado
+        assert retomado.dados == {"arquivo": "relacao.csv"}
+        assert retomado.pagina_inicial() == 2
+        assert retomado.concluido("0001") and not retomado.concluido("0002")
+        # o critério extra (ex.: manifesto) também conclui processos
+        assert retomado.pagina_inicial(lambda numero: numero == "0002") == 3
+
+        retomado.concluir(["0002"])
+        assert Checkpoint(store, "download", 55, retomar=True).pagina_inicial() == 3
+
+
+def test_sem_retomar_descarta_o_anterior(fake_settings) -> None:
+    with CheckpointStore(fake_settings) as store:
+        Checkpoint(store, "exportacao", 55, retomar=False).registrar(_registro("0001", 4))
+        assert Checkpoint(store, "anotacao", 55, retomar=True).retomado is False
+
+        novo = Checkpoint(store, "exportacao", 55, retomar=False)
+        assert not novo.retomado
+        assert novo.pagina_inicial() == 1
+        assert store.carregar("exportacao", 55) == (1, {}, {})
+
+
+def test_encerrar_apaga_o_checkpoint(fake_settings) -> None:
+    with CheckpointStore(fake_settings) as store:
+        checkpoint = Checkpoint(store, "download", 55, retomar=False)
+        checkpoint.registrar(_registro("0001", 2))
+        checkpoint.encerrar()
+        assert store.carregar("download", 55) is None
+        assert not Checkpoint(store, "download", 55, retomar=True).retomado
+
+
+def test_pipeline_retoma_na_menor_pagina_pendente(fake_settings, tmp_path) -> None:
+    from seiautomation.annotation_plan import PlanoAnotacoes, TextoConstante
+    from seiautomation.export_formats import EscritorRelacao, linha_da_relacao
+    from seiautomation.tasks.common import RetomadaPipeline
+
+    regra = TextoConstante("OK")
+    relacao = tmp_path / "relacao.csv"
+
+    def retomada(store: CheckpointStore, retomar: bool) -> RetomadaPipeline:
+        return RetomadaPipeline(
+            store,
+            55,
+            manifesto=None,
+            regra=regra,
+            relacao=relacao,
+            formato="csv",
+            compressao=None,
+            skip_existentes=True,
+            retomar=retomar,
+            progress=None,
+        )
+
+    with CheckpointStore(fake_settings) as store:
+        interrompida = retomada(store, retomar=True)
+        assert interrompida.pagina_inicial == 1 and not interrompida.anexar
+        with EscritorRelacao(relacao, "csv", None) as escritor:
+            interrompida.exportacao.iniciar(escritor)
+            plano = PlanoAnotacoes()
+            for numero, pagina in (("0001", 1), ("0002", 2), ("0003", 3), ("0004", 4)):
+                registro = _registro(numero, pagina)
+                if interrompida.exportar(registro):
+                    escritor.escrever(linha_da_relacao(registro))
+                interrompida.planejar(plano, registro, regra)
+        # anotações da página 1 aplicadas antes da interrupção
+        interrompida.anotacao.concluir(["0001"])
+
+    with CheckpointStore(fake_settings) as store:
+        # a exportação parou após a página 3; a anotação, na página 2
+        retomado = retomada(store, retomar=True)
+        assert retomado.pagina_inicial == 2
+        assert retomado.anexar and retomado.relacao == relacao
+        with EscritorRelacao(relacao, "csv", None, anexar=True) as escritor:
+            retomado.exportacao.iniciar(escritor)
+            assert not retomado.exportar(_registro("0002", 2))
+            assert retomado.exportar(_registro("0004", 4))
+        retomado.encerrar()
+        assert retomada(store, retomar=True).pagina_inicial == 1
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import csv
+import gzip
+import json
+
+import pytest
+
+from seiautomation.export_formats import EscritorRelacao, nome_do_arquivo, pode_anexar
+
+
+def _linhas(n: int) -> list[dict[str, str]]:
+    return [{"sequencia": str(i), "processo": f"{i:04d}", "tipo": "Procedimento", "anotacoes": "OK"} for i in range(n)]
+
+
+def test_nome_do_arquivo(tmp_path) -> None:
+    base = tmp_path / "bloco_55_relacao"
+    assert nome_do_arquivo(base, "csv").name == "bloco_55_relacao.csv"
+    assert nome_do_arquivo(base, "jsonl", "gzip").name == "bloco_55_relacao.jsonl.gz"
+    assert nome_do_arquivo(base, "parquet", "zstd").name == "bloco_55_relacao.parquet"
+    with pytest.raises(ValueError):
+        EscritorRelacao(base, "xlsx")
+
+
+def test_csv_grava_em_lotes_antes_de_fechar(tmp_path) -> None:
+    path = tmp_path / "relacao.csv"
+    escritor = EscritorRelacao(path, "csv")
+    for linha in _linhas(150):
+        escritor.escrever(linha)
+    # as primeiras 100 linhas já estão no disco, mesmo sem fechar
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 101
+    escritor.close()
+    with path.open(newline="", encoding="utf-8") as arquivo:
+        assert list(csv.DictReader(arquivo)) == _linhas(150)
+
+
+def test_csv_anexado_sem_repetir_cabecalho(tmp_path) -> None:
+    path = tmp_path / "relacao.csv"
+    with EscritorRelacao(path, "csv") as escritor:
+        for linha in _linhas(2):
+            escritor.escrever(linha)
+    with EscritorRelacao(path, "csv", anexar=True) as escritor:
+        escritor.escrever(_linhas(3)[2])
+    with path.open(newline="", encoding="utf-8") as arquivo:
+        assert list(csv.DictReader(arquivo)) == _linhas(3)
+
+    assert pode_anexar("jsonl", None)
+    assert not pode_anexar("csv", "gzip")
+    with pytest.raises(ValueError):
+        EscritorRelacao(tmp_path / "relacao.parquet", "parquet", anexar=True)
+
+
+def test_jsonl_gzip(tmp_path) -> None:
+    path = tmp_path / "relacao.jsonl.gz"
+    with EscritorRelacao(path, "jsonl", "gzip") as escritor:
+        for linha in _linhas(3):
+            escritor.escrever(linha)
+    with gzip.open(path, "rt", encoding="utf-8") as arquivo:
+        assert [json.loads(linha) for linha in arquivo] == _linhas(3)
+
+
+def test_jsonl_zstd(tmp_path) -> None:
+    zstandard = pytest.importorskip("zstandard")
+    path = tmp_path / "relacao.jsonl.zst"
+    with EscritorRelacao(path, "jsonl", "zstd") as escritor:
+        escritor.escrever(_linhas(1)[0])
+    with zstandard.ZstdDecompressor().stream_reader(path.open("rb")) as leitor:
+        assert json.loads(leitor.read()) == _linhas(1)[0]
+
+
+def test_parquet(tmp_path) -> None:
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = tmp_path / "relacao.parquet"
+    with EscritorRelacao(path, "parquet", "zstd") as escritor:
+        for linha in _linhas(5):
+            escritor.escrever(linha)
+    assert pq.read_table(path).to_pylist() == _linhas(5)
+    assert not list(tmp_path.glob(".*.part"))
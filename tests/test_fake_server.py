@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import asyncio
 import csv
 from pathlib import Path
 
-from seiautomation.tasks import download_zip_lote, exportar_relacao_csv, preencher_anotacoes_ok
+from seiautomation import aio
+from seiautomation.annotation_plan import TextoConstante
+from seiautomation.tasks import download_zip_lote, executar_pipeline, exportar_relacao_csv, preencher_anotacoes_ok
 
 
 def test_tasks_against_fake_server(fake_settings) -> None:
@@ -44,3 +47,52 @@ def test_tasks_against_fake_server(fake_settings) -> None:
 
     assert len(rows) == 2
     assert all(row["anotacoes"] == "OK" for row in rows)
+
+
+def test_download_paralelo(fake_settings) -> None:
+    settings = fake_settings.with_dev_mode(True)
+
+    arquivos = list(
+        download_zip_lote(
+            settings,
+            headless=True,
+            auto_credentials=True,
+            bloco_id=55,
+            concurrency=2,
+        )
+    )
+    assert len(arquivos) == 2
+    for nome in arquivos:
+        assert (settings.download_dir / nome).exists()
+
+
+def test_motor_assincrono(fake_settings) -> None:
+    settings = fake_settings.with_dev_mode(True)
+
+    async def executar() -> tuple[list[str], int]:
+        arquivos = await aio.download_zip_lote(settings, headless=True, bloco_id=55, concurrency=2)
+        atualizados = await aio.preencher_anotacoes_ok(settings, headless=True, bloco_id=55)
+        await aio.close_pool()
+        return arquivos, atualizados
+
+    arquivos, atualizados = asyncio.run(executar())
+    assert len(arquivos) == 2
+    assert atualizados == 1
+
+
+def test_pipeline_uma_leitura(fake_settings) -> None:
+    settings = fake_settings.with_dev_mode(True)
+
+    resultado = executar_pipeline(
+        settings,
+        headless=True,
+        bloco_id=55,
+        baixar=True,
+        regra=TextoConstante("OK"),
+        exportar=True,
+        concurrency=2,
+    )
+    assert len(resultado.arquivos) == 2
+    assert resultado.anotacoes == 1
+    with resultado.relacao.open(newline="", encoding="utf-8") as csvfile:
+        assert len(list(csv.DictReader(csvfile))) == 2
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Dict
+
+import pytest
+
+from seiautomation import aio, bloco_index
+from seiautomation.config import Settings
+from seiautomation.http_listing import (
+    HttpClient,
+    SessaoExpiradaError,
+    _ListagemParser,
+    _salto_requisicao,
+    iterar_registros_http,
+)
+from seiautomation.session_cache import gravar_sessao
+from seiautomation.tasks import export_relation
+
+
+def test_listagem_http_do_bloco(fake_server: Dict[str, str]) -> None:
+    client = HttpClient()
+    url = f"{fake_server['base_url']}/sei/controlador.php?acao=rel_bloco_protocolo_listar&id_bloco=55"
+    try:
+        registros = list(iterar_registros_http(client, url))
+    finally:
+        client.close()
+
+    assert [registro.numero for registro in registros] == [
+        "0800001-23.2024.8.15.0001",
+        "0800002-11.2024.8.15.0001",
+    ]
+    assert registros[0].seq == "1"
+    assert registros[0].tipo == "Procedimento"
+    assert registros[1].anotacao == "OK"
+    assert registros[0].href.startswith(fake_server["base_url"] + "/sei/processo/")
+
+
+def test_listagem_http_detecta_tela_de_login(fake_server: Dict[str, str]) -> None:
+    client = HttpClient()
+    with pytest.raises(SessaoExpiradaError):
+        list(iterar_registros_http(client, f"{fake_server['base_url']}/"))
+    client.close()
+
+
+def test_salto_pelo_campo_de_paginacao() -> None:
+    parser = _ListagemParser("http://sei/sei/controlador.php")
+    parser.feed(
+        '<form action="controlador.php?acao=rel_bloco_protocolo_listar">'
+        '<input type="hidden" name="hdnInfraPaginaAtual" value="0">'
+        '<input type="hidden" name="id_bloco" value="55"></form>'
+    )
+    parser.close()
+
+    destino, campos = _salto_requisicao(parser, "http://sei/sei/controlador.php", 3)
+    assert destino == "http://sei/sei/controlador.php?acao=rel_bloco_protocolo_listar"
+    assert campos == {"hdnInfraPaginaAtual": "3", "id_bloco": "55"}
+    assert _salto_requisicao(_ListagemParser("http://sei/"), "http://sei/", 3) is None
+
+
+def test_exportacao_assincrona_com_listagem_http(fake_settings: Settings, fake_server: Dict[str, str]) -> None:
+    url = f"{fake_server['base_url']}/sei/controlador.php?acao=rel_bloco_protocolo_listar&id_bloco=55"
+    gravar_sessao(fake_settings, {"cookies": []}, fake_settings.target_base_url)
+    bloco_index.registrar_links(fake_settings, [url])
+
+    arquivo = asyncio.run(aio.exportar_relacao_csv(fake_settings, listagem="http"))
+
+    conteudo = arquivo.read_text(encoding="utf-8")
+    assert "0800001-23.2024.8.15.0001" in conteudo and "0800002-11.2024.8.15.0001" in conteudo
+
+
+def test_listagem_http_sem_link_salvo_nao_abre_cliente(fake_settings: Settings, monkeypatch) -> None:
+    criados: list[object] = []
+    monkeypatch.setattr(export_relation, "cliente_da_sessao_salva", lambda settings: criados.append(settings))
+
+    def sem_navegador(**kwargs):
+        raise RuntimeError("navegador indisponível")
+
+    monkeypatch.setattr(export_relation, "launch_session", sem_navegador)
+    registros = export_relation._registros_http(
+        fake_settings, 55, headless=True, auto_credentials=True, progress=None
+    )
+    with pytest.raises(RuntimeError, match="navegador indisponível"):
+        next(registros)
+    assert criados == []
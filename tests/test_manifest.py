@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import io
+import zipfile
+
+from seiautomation.manifest import DownloadManifest
+
+
+def test_manifesto_registra_e_persiste(tmp_path) -> None:
+    with DownloadManifest(tmp_path) as manifesto:
+        assert "0001/2024" not in manifesto
+        (tmp_path / "0001_2024_PROC.zip").write_bytes(b"zip")
+        manifesto.registrar("0001/2024", "0001_2024_PROC.zip", sha256="abc", bloco_id=7)
+        assert "0001/2024" in manifesto
+
+    with DownloadManifest(tmp_path) as manifesto:
+        entrada = manifesto.obter("0001/2024")
+        assert entrada is not None
+        assert entrada.tamanho == 3
+        assert entrada.sha256 == "abc"
+        assert [e.numero for e in manifesto.entradas(bloco_id=7)] == ["0001/2024"]
+
+
+def test_manifesto_importa_zips_legados(tmp_path) -> None:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as arquivo:
+        arquivo.writestr("doc.txt", "legado")
+    (tmp_path / "12345_000001_2024_11_Processo.zip").write_bytes(buffer.getvalue())
+    with DownloadManifest(tmp_path) as manifesto:
+        assert len(manifesto) == 0
+        assert "12345.000001/2024-11" in manifesto
+        assert "12345.000002/2024-11" not in manifesto
+        assert len(manifesto) == 1
+
+
+def test_manifesto_ignora_arquivo_alterado_ou_removido(tmp_path) -> None:
+    arquivo = tmp_path / "0002_2024_PROC.zip"
+    arquivo.write_bytes(b"zip")
+    with DownloadManifest(tmp_path) as manifesto:
+        manifesto.registrar("0002/2024", arquivo.name)
+        arquivo.write_bytes(b"zip truncado")
+        assert "0002/2024" not in manifesto
+        arquivo.unlink()
+        assert "0002/2024" not in manifesto
+        assert manifesto.entradas() == []
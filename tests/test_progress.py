@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import time
+
+from seiautomation.progress import (
+    Andamento,
+    BytesBaixados,
+    EmissorProgresso,
+    ErroProcesso,
+    EtapaIniciada,
+    ExecucaoConcluida,
+    ExecucaoIniciada,
+    PaginaLida,
+    RegistrosProcessados,
+    Retentativa,
+    emitir,
+    usar_emissor,
+)
+from seiautomation.retry import AgendadorRetentativas, PoliticaRetentativa
+
+
+def test_lotes_agrupam_eventos_equivalentes() -> None:
+    lotes: list[list] = []
+    with EmissorProgresso(lotes.append, intervalo=60) as emissor:
+        emissor.emitir(ExecucaoIniciada("download", 55))
+        emissor.texto("Processando página 1…")
+        emissor.emitir(PaginaLida(1, 50))
+        for _ in range(3):
+            emissor.emitir(RegistrosProcessados("download", "baixado"))
+            emissor.emitir(BytesBaixados(1000))
+        emissor.emitir(RegistrosProcessados("download", "pulado"))
+        emissor.emitir(PaginaLida(2, 50))
+
+    assert [type(evento) for evento in lotes[0]] == [ExecucaoIniciada]
+    tipos = [evento.tipo for evento in lotes[1]]
+    assert tipos == ["mensagem", "registros_processados", "bytes_baixados", "registros_processados", "pagina_lida"]
+    baixados, bytes_, pagina = lotes[1][1], lotes[1][2], lotes[1][4]
+    assert baixados.quantidade == 3 and bytes_.tamanho == 3000 and bytes_.arquivos == 3
+    assert pagina.pagina == 2
+    assert lotes[1][0].para_dict()["texto"] == "Processando página 1…"
+    assert len(lotes) == 2
+
+
+def test_intervalo_limita_a_frequencia_e_entrega_o_resto_depois() -> None:
+    lotes: list[list] = []
+    emissor = EmissorProgresso(lotes.append, intervalo=0.1)
+    emissor.texto("primeira")
+    emissor.texto("segunda")
+    emissor.texto("terceira")
+    assert len(lotes) == 1
+    time.sleep(0.3)
+    assert [evento.texto for evento in lotes[1]] == ["segunda", "terceira"]
+    emissor.fechar()
+
+
+def test_andamento_calcula_taxa_e_eta() -> None:
+    andamento = Andamento()
+    inicio = time.time() - 10
+    andamento.aplicar(
+        [
+            ExecucaoIniciada("download", 55, momento=inicio),
+            EtapaIniciada("download", 100, momento=inicio),
+            RegistrosProcessados("download", "baixado", 20, momento=inicio + 5),
+            RegistrosProcessados("download", "pulado", 5, momento=inicio + 6),
+            Retentativa("0001", 1, 2.0, "timeout"),
+            ErroProcesso("0002", "timeout"),
+            BytesBaixados(2048, 2),
+        ]
+    )
+    dados = andamento.para_dict()
+    etapa = dados["etapas"]["download"]
+    assert etapa["processados"] == 25 and etapa["situacoes"] == {"baixado": 20, "pulado": 5}
+    assert 2.0 < andamento.taxa() < 3.0
+    assert 25 < andamento.eta() < 40
+    assert (dados["bytes"], dados["retentativas"], dados["erros"]) == (2048, 1, 1)
+    assert "download: 25/100" in andamento.resumo()
+
+    andamento.aplicar([ExecucaoConcluida({"arquivos": 20}, momento=inicio + 10)])
+    assert andamento.estatisticas == {"arquivos": 20}
+    assert andamento.eta() is not None
+
+
+def test_agendador_emite_retentativas_e_erros() -> None:
+    lotes: list[list] = []
+    agendador = AgendadorRetentativas(PoliticaRetentativa(tentativas=2, base=0, jitter=0))
+    with EmissorProgresso(lotes.append, intervalo=0) as emissor, usar_emissor(emissor):
+        agendador.registrar_falha("0001", "timeout")
+        agendador.registrar_falha("0001", "timeout")
+    eventos = [evento for lote in lotes for evento in lote]
+    assert [evento.tipo for evento in eventos] == ["retentativa", "erro"]
+    assert eventos[0].tentativa == 1
+
+
+def test_emitir_sem_emissor_nao_faz_nada() -> None:
+    emitir(PaginaLida(1, 10))
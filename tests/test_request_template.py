@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import json
+
+from seiautomation.request_template import AtalhoRequisicao, RequestTemplate, nome_do_anexo, valores_do_processo
+
+
+def test_modelo_troca_identificadores_do_processo() -> None:
+    href = "https://sei.example/sei/controlador.php?acao=procedimento_trabalhar&id_procedimento=123456&infra_hash=x"
+    valores = valores_do_processo("0800001-23.2024.8.15.0001", href)
+    modelo = RequestTemplate.aprender(
+        "post",
+        "https://sei.example/sei/controlador.php?acao=procedimento_gerar_zip&id_procedimento=123456",
+        "hdnProtocolo=0800001-23.2024.8.15.0001&rdoTipo=T",
+        valores,
+        content_type="application/x-www-form-urlencoded",
+    )
+    assert modelo is not None
+    assert modelo.method == "POST"
+    assert modelo.parametros == {"numero", "id_procedimento"}
+
+    outro = valores_do_processo(
+        "0800002-11.2024.8.15.0001",
+        "https://sei.example/sei/controlador.php?acao=procedimento_trabalhar&id_procedimento=654321&infra_hash=y",
+    )
+    url, body = modelo.montar(outro)
+    assert url.endswith("acao=procedimento_gerar_zip&id_procedimento=654321")
+    assert body == "hdnProtocolo=0800002-11.2024.8.15.0001&rdoTipo=T"
+
+
+
+def test_modelo_com_assinatura_propria_nao_e_aprendido() -> None:
+    href = "https://sei.example/sei/controlador.php?acao=procedimento_trabalhar&id_procedimento=123456&infra_hash=abc"
+    valores = valores_do_processo("0800001-23.2024.8.15.0001", href)
+    zip_url = "https://sei.example/sei/controlador.php?acao=procedimento_gerar_zip&id_procedimento=123456"
+    # a assinatura do ZIP é outra: repetida, o SEI a recusaria para os demais processos
+    assert RequestTemplate.aprender("GET", f"{zip_url}&infra_hash=f00d", None, valores) is None
+    assert RequestTemplate.aprender("POST", zip_url, "infra_hash=f00d&rdoTipo=T", valores) is None
+    # a do próprio link do processo vira parâmetro
+    modelo = RequestTemplate.aprender("GET", f"{zip_url}&infra_hash=abc", None, valores)
+    assert modelo is not None and "infra_hash" in modelo.parametros
+
+def test_modelo_usa_valores_codificados() -> None:
+    modelo = RequestTemplate.aprender("GET", "http://h/zip?p=0001%2F2024", None, {"numero": "0001/2024"})
+    assert modelo is not None
+    assert modelo.montar({"numero": "0002/2024"})[0] == "http://h/zip?p=0002%2F2024"
+
+
+def test_modelo_sem_identificador_nao_e_aprendido() -> None:
+    assert RequestTemplate.aprender("GET", "http://h/zip", None, {"numero": "0001/2024"}) is None
+
+
+def test_campos_trocam_apenas_o_valor_inteiro_do_formulario() -> None:
+    modelo = RequestTemplate.aprender(
+        "POST",
+        "http://h/controlador.php?acao=rel_bloco_protocolo_alterar&id_procedimento=123456",
+        "txtAnotacao=OK&hdnOk=OKAY&sbmAlterarRelBlocoProtocolo=Salvar",
+        {"id_procedimento": "123456"},
+        content_type="application/x-www-form-urlencoded",
+        campos={"anotacao": "OK"},
+    )
+    assert modelo is not None
+    assert modelo.parametros == {"id_procedimento", "anotacao"}
+    url, body = modelo.montar({"id_procedimento": "654321", "anotacao": "Conferido e OK"})
+    assert url.endswith("id_procedimento=654321")
+    assert body == "txtAnotacao=Conferido+e+OK&hdnOk=OKAY&sbmAlterarRelBlocoProtocolo=Salvar"
+
+
+def test_campos_em_corpo_json() -> None:
+    modelo = RequestTemplate.aprender(
+        "POST",
+        "http://h/api/anotacao",
+        '{"numero": "0001/2024", "valor": "OK"}',
+        {"numero": "0001/2024"},
+        content_type="application/json; charset=utf-8",
+        campos={"anotacao": "OK"},
+    )
+    assert modelo is not None
+    _, body = modelo.montar({"numero": "0002/2024", "anotacao": 'visto "ok"'})
+    assert json.loads(body) == {"numero": "0002/2024", "valor": 'visto "ok"'}
+
+
+def test_nome_do_anexo() -> None:
+    assert nome_do_anexo('attachment; filename="processo 1.zip"', "p.zip") == "processo 1.zip"
+    assert nome_do_anexo("attachment; filename*=UTF-8''proc%C3%A9sso.zip", "p.zip") == "procésso.zip"
+    assert nome_do_anexo(None, "p.zip") == "p.zip"
+
+
+def test_atalho_exige_que_os_campos_virem_parametros() -> None:
+    class Requisicao:
+        method = "POST"
+        url = "http://h/controlador.php?id_procedimento=123456"
+        post_data = "txtAnotacao=Revisar"
+        headers = {"content-type": "application/x-www-form-urlencoded"}
+
+    atalho = AtalhoRequisicao()
+    assert not atalho.aprender(Requisicao(), {"id_procedimento": "123456"}, {"anotacao": "Arquivar"})
+    assert atalho.aprender(Requisicao(), {"id_procedimento": "123456"}, {"anotacao": "Revisar"})
+    url, kwargs = atalho.requisicao({"id_procedimento": "9", "anotacao": "Arquivar"})
+    assert kwargs["data"] == "txtAnotacao=Arquivar"
+
+
+def test_envio_da_anotacao_com_assinatura_propria_nao_vira_atalho() -> None:
+    class Envio:
+        method = "POST"
+        url = (
+            "https://sei.example/sei/controlador.php?acao=rel_bloco_protocolo_alterar"
+            "&id_procedimento=123456&infra_hash=c0ffee"
+        )
+        post_data = "txtAnotacao=Revisar&sbmAlterarRelBlocoProtocolo=Salvar"
+        headers = {"content-type": "application/x-www-form-urlencoded"}
+
+    href = "https://sei.example/sei/controlador.php?acao=procedimento_trabalhar&id_procedimento=123456&infra_hash=abc"
+    atalho = AtalhoRequisicao()
+    assert not atalho.aprender(Envio(), valores_do_processo("0001/2024", href), {"anotacao": "Revisar"})
+    assert not atalho.disponivel
+    assert atalho.requisicao({"numero": "0002/2024", "id_procedimento": "9", "anotacao": "OK"}) is None
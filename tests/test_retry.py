@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from seiautomation.retry import (
+    AgendadorRetentativas,
+    ArquivosBaixados,
+    FalhaProcesso,
+    PoliticaRetentativa,
+    TotalAtualizado,
+)
+
+
+def test_backoff_exponencial_com_teto() -> None:
+    politica = PoliticaRetentativa(base=1.0, fator=2.0, maximo=5.0, jitter=0.5)
+    for falhas, atraso in [(1, 1.0), (2, 2.0), (3, 4.0), (6, 5.0)]:
+        espera = politica.espera(falhas)
+        assert atraso * 0.5 <= espera <= atraso
+
+
+def test_agendador_limita_tentativas_e_gera_falhas_definitivas() -> None:
+    agendador = AgendadorRetentativas(PoliticaRetentativa(tentativas=2, base=0.0))
+
+    assert agendador.registrar_falha("A", TimeoutError("lento"), "href-a")
+    assert agendador.registrar_falha("B", RuntimeError("erro"), "href-b")
+    assert sorted(agendador.pendentes()) == [("A", "href-a"), ("B", "href-b")]
+    assert agendador.espera_restante() == 0.0
+
+    agendador.registrar_sucesso("A")
+    assert not agendador.registrar_falha("B", RuntimeError("de novo"))
+
+    assert agendador.pendentes() == []
+    [falha] = agendador.definitivas()
+    assert (falha.numero, falha.tentativas, falha.erro) == ("B", 2, "de novo")
+    assert "Falhas definitivas (1)" in agendador.relatorio()
+
+
+def test_incorporar_falhas_de_outro_agendador() -> None:
+    agendador = AgendadorRetentativas(PoliticaRetentativa(tentativas=3, base=0))
+    agendador.registrar_falha("0001", "timeout", "h1")
+    agendador.incorporar([FalhaProcesso("0001", 3, "erro 500"), FalhaProcesso("0002", 3, "timeout")])
+    assert agendador.pendentes() == []
+    assert [(falha.numero, falha.erro) for falha in agendador.definitivas()] == [("0001", "erro 500"), ("0002", "timeout")]
+
+
+def test_resultados_preservam_tipos_originais() -> None:
+    arquivos = ArquivosBaixados(["a.zip"], [])
+    assert arquivos == ["a.zip"] and arquivos.falhas == []
+
+    total = TotalAtualizado(3)
+    assert total == 3 and total + 1 == 4 and total.falhas == []
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from dataclasses import replace
+
+from seiautomation.routing import _hosts_do_sei, _Roteamento
+from seiautomation.timing import TimingRecorder
+
+
+def test_perfis_bloqueiam_tipos_e_terceiros(fake_settings) -> None:
+    hosts = _hosts_do_sei(fake_settings)
+    pagina = fake_settings.target_base_url + "controlador.php?acao=rel_bloco_protocolo_listar"
+
+    sem_midia = _Roteamento("no-media", hosts, None)
+    assert sem_midia.bloquear(pagina, "document") is None
+    assert sem_midia.bloquear(fake_settings.target_base_url + "infra_css/sei.css", "stylesheet") is None
+    assert sem_midia.bloquear(fake_settings.target_base_url + "imagens/logo.png", "image") == "image"
+    assert sem_midia.bloquear("https://fonts.example.com/app.js", "script") == "terceiros"
+    assert sem_midia.bloquear("data:image/png;base64,AAAA", "script") is None
+
+    assert _Roteamento("minimal", hosts, None).bloquear(pagina, "stylesheet") == "stylesheet"
+    assert _Roteamento("full", hosts, None).bloquear("https://fonts.example.com/a.woff", "font") is None
+
+
+def test_hosts_do_sei_incluem_o_ambiente_de_desenvolvimento(fake_settings) -> None:
+    settings = replace(fake_settings, base_url="https://sei.tjpb.jus.br/sei/")
+    assert "sei.tjpb.jus.br" in _hosts_do_sei(settings)
+
+
+def test_contadores_vao_para_o_recorder() -> None:
+    tempos = TimingRecorder()
+    roteamento = _Roteamento("no-media", frozenset({"sei"}), tempos)
+    roteamento.contar("navegador_bloqueadas_image", 2)
+    roteamento.contar("navegador_permitidas")
+    assert tempos.contadores() == {"navegador_bloqueadas_image": 2, "navegador_permitidas": 1}
+    assert "Contadores:\n  navegador_bloqueadas_image: 2" in tempos.relatorio()
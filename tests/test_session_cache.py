@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import json
+import time
+
+from seiautomation.session_cache import _cache_path, carregar_sessao, descartar_sessao
+
+
+def _gravar(settings, saved_at: float, cookies: list[dict]) -> None:
+    path = _cache_path(settings)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "saved_at": saved_at,
+        "home_url": f"{settings.target_base_url}home?infra_unidade_atual=1",
+        "storage_state": {"cookies": cookies, "origins": []},
+    }
+    path.write_text(json.dumps(payload), encoding="utf-8")
+
+
+def test_sessao_valida_e_carregada(fake_settings) -> None:
+    _gravar(fake_settings, time.time(), [{"name": "PHPSESSID", "value": "x", "expires": -1}])
+    data = carregar_sessao(fake_settings)
+    assert data is not None
+    assert "infra_unidade_atual" in data["home_url"]
+
+    descartar_sessao(fake_settings)
+    assert carregar_sessao(fake_settings) is None
+
+
+def test_sessao_expirada_e_descartada(fake_settings) -> None:
+    _gravar(fake_settings, time.time() - fake_settings.session_ttl_minutes * 60 - 1, [])
+    assert carregar_sessao(fake_settings) is None
+    assert not _cache_path(fake_settings).exists()
+
+    _gravar(fake_settings, time.time(), [{"name": "PHPSESSID", "value": "x", "expires": time.time() - 10}])
+    assert carregar_sessao(fake_settings) is None
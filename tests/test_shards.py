@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import os
+
+from seiautomation.shards import executar_em_shards, particionar
+
+
+def _somar(itens: list[int], *, progress, fator: int) -> int:
+    if 0 in itens:
+        raise ValueError("item inválido")
+    if -1 in itens:
+        os._exit(1)
+    progress(f"{len(itens)} itens")
+    return sum(item * fator for item in itens)
+
+
+def test_particionar_em_fatias_contiguas() -> None:
+    assert particionar(list(range(7)), 3) == [[0, 1, 2], [3, 4], [5, 6]]
+    assert particionar([1, 2], 5) == [[1], [2]]
+    assert particionar([], 4) == []
+
+
+def test_executar_em_shards_junta_resultados_e_progresso() -> None:
+    mensagens: list[str] = []
+    resultados = executar_em_shards(_somar, [[1, 2], [3], [0, 4]], progress=mensagens.append, fator=10)
+
+    assert [resultado.resultado for resultado in resultados] == [30, 30, None]
+    assert [resultado.ok for resultado in resultados] == [True, True, False]
+    assert resultados[2].erro == "item inválido"
+    assert resultados[2].itens == [0, 4]
+    assert "[shard 1] 2 itens" in mensagens and "[shard 2] 1 itens" in mensagens
+
+
+def test_morte_de_um_shard_nao_afeta_os_outros() -> None:
+    mensagens: list[str] = []
+    resultados = executar_em_shards(_somar, [[1, 2], [-1, 5], [3]], progress=mensagens.append, fator=1)
+
+    assert [resultado.resultado for resultado in resultados] == [3, None, 3]
+    assert [resultado.ok for resultado in resultados] == [True, False, True]
+    assert [mensagem for mensagem in mensagens if "Interrompido" in mensagem][0].startswith("[shard 2]")
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from seiautomation.navigation import LinhaProcesso
+from seiautomation.snapshots import ADICIONADO, ALTERADO, LeituraIncremental, SnapshotStore
+
+
+def _pagina(*linhas: tuple[str, str]) -> list[LinhaProcesso]:
+    return [
+        LinhaProcesso(indice=i, seq=str(i), numero=numero, tipo="Procedimento", anotacao=anotacao, href=f"h{i}")
+        for i, (numero, anotacao) in enumerate(linhas, start=1)
+    ]
+
+
+def _ler(store: SnapshotStore, paginas: list[list[LinhaProcesso]]):
+    leitura = LeituraIncremental(store, "exportacao", 55)
+    mudancas = {registro.numero: leitura.classificar(registro) for pagina in paginas for registro in pagina}
+    return leitura, mudancas, leitura.concluir()
+
+
+def test_diferenca_entre_leituras(fake_settings) -> None:
+    with SnapshotStore(fake_settings) as store:
+        _, mudancas, diferenca = _ler(store, [_pagina(("0001", ""), ("0002", "")), _pagina(("0003", ""))])
+        assert set(mudancas.values()) == {ADICIONADO}
+        assert len(diferenca.adicionados) == 3
+
+        _, mudancas, diferenca = _ler(store, [_pagina(("0001", "OK"), ("0002", "")), _pagina(("0004", ""))])
+        assert mudancas == {"0001": ALTERADO, "0002": None, "0004": ADICIONADO}
+        assert [processo.numero for processo in diferenca.removidos] == ["0003"]
+        assert diferenca.resumo() == "1 adicionados, 1 alterados, 1 removidos"
+
+        # outro escopo tem o próprio snapshot
+        assert LeituraIncremental(store, "download", 55).anterior is None
+
+
+def test_primeira_pagina_inalterada(fake_settings) -> None:
+    primeira = _pagina(("0001", ""), ("0002", ""))
+    with SnapshotStore(fake_settings) as store:
+        _ler(store, [primeira, _pagina(("0003", ""))])
+
+        leitura = LeituraIncremental(store, "exportacao", 55)
+        assert leitura.primeira_pagina_inalterada(primeira, total=3)
+        assert leitura.inalterado
+        assert not LeituraIncremental(store, "exportacao", 55).primeira_pagina_inalterada(primeira, total=4)
+        # sem a legenda com o total, só um bloco de uma página pode ser dado como inalterado
+        assert not LeituraIncremental(store, "exportacao", 55).primeira_pagina_inalterada(primeira, total=None)
+        alterada = _pagina(("0001", "OK"), ("0002", ""))
+        assert not LeituraIncremental(store, "exportacao", 55).primeira_pagina_inalterada(alterada, total=3)
+
+
+def test_anotacoes_aplicadas_e_falhas(fake_settings) -> None:
+    with SnapshotStore(fake_settings) as store:
+        _ler(store, [_pagina(("0001", ""), ("0002", ""))])
+        store.atualizar_anotacoes("exportacao", 55, {"0001": "OK"}, descartar=["0002"])
+
+        _, mudancas, _ = _ler(store, [_pagina(("0001", "OK"), ("0002", ""))])
+        assert mudancas == {"0001": None, "0002": ADICIONADO}
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from seiautomation.throttle import ControladorAIMD, Regulador, TokenBucket
+
+
+def test_token_bucket_respeita_taxa() -> None:
+    balde = TokenBucket(taxa=10, capacidade=2)
+    assert balde.reservar() == 0.0
+    assert balde.reservar() == 0.0
+    assert balde.reservar() == pytest.approx(0.1, abs=0.02)
+    assert TokenBucket(taxa=0).reservar() == 0.0
+
+
+def test_aimd_reduz_com_erro_e_cresce_com_sucesso() -> None:
+    mensagens: list[str] = []
+    controlador = ControladorAIMD(8, progress=mensagens.append)
+    assert controlador.limite == 8
+
+    controlador.registrar("download", 0.2, sucesso=False)
+    assert controlador.limite == 4
+    # uma segunda falha na mesma janela não derruba o limite de novo
+    controlador.registrar("download", 0.2, sucesso=False)
+    assert controlador.limite == 4
+
+    for _ in range(4):
+        controlador.registrar("download", 0.2)
+    assert controlador.limite == 5
+    assert mensagens and "limite 5/8" in mensagens[-1]
+
+
+def test_aimd_reduz_quando_latencia_dispara() -> None:
+    controlador = ControladorAIMD(4)
+    controlador.registrar("anotacao", 0.1)
+    for _ in range(5):
+        controlador.registrar("anotacao", 2.0)
+    assert controlador.limite < 4
+
+
+def test_regulador_limita_concorrencia_async() -> None:
+    regulador = Regulador(taxa=0, maximo=2)
+    ativos = 0
+    pico = 0
+
+    async def operacao() -> None:
+        nonlocal ativos, pico
+        async with regulador.requisicao_async("download"):
+            ativos += 1
+            pico = max(pico, ativos)
+            await asyncio.sleep(0.01)
+            ativos -= 1
+
+    async def executar() -> None:
+        await asyncio.gather(*(operacao() for _ in range(6)))
+
+    asyncio.run(executar())
+    assert pico <= 2
+    assert regulador.controlador.operacoes == 6
+    assert "Carga no SEI: 6 requisições" in regulador.relatorio()
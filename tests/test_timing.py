@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+
+from seiautomation import timing
+from seiautomation.timing import (
+    TimingRecorder,
+    medir,
+    recorder_atual,
+    registrar_desde,
+    salvar_trace,
+    usar_recorder,
+)
+
+
+def test_medir_sem_recorder_nao_falha() -> None:
+    assert recorder_atual() is None
+    with medir("qualquer"):
+        pass
+    registrar_desde("qualquer", time.perf_counter())
+
+
+def test_recorder_acumula_esperas() -> None:
+    with usar_recorder() as tempos:
+        for _ in range(3):
+            with medir("proxima_pagina"):
+                pass
+        tempos.registrar("login", 0.5)
+
+    assert recorder_atual() is None
+    resumo = tempos.resumo()
+    assert resumo["proxima_pagina"]["count"] == 3
+    assert resumo["login"]["max"] == 0.5
+    assert "login: 1x" in tempos.relatorio()
+    assert TimingRecorder().relatorio() == ""
+
+
+def test_resumo_traz_percentis() -> None:
+    tempos = TimingRecorder()
+    for milissegundos in range(1, 101):
+        tempos.registrar("pagina", milissegundos / 1000)
+    dados = tempos.resumo()["pagina"]
+    assert (dados["p50"], dados["p95"], dados["max"]) == (0.05, 0.095, 0.1)
+    assert "pagina: 100x, p50 50 ms, p95 95 ms, máx 100 ms" in tempos.relatorio()
+
+
+def test_trace_separa_threads_e_tasks(tmp_path) -> None:
+    with usar_recorder() as tempos:
+        inicio = time.perf_counter()
+        with medir("login_e_abertura_bloco"):
+            pass
+        registrar_desde("pagina", inicio)
+
+        def worker() -> None:
+            with usar_recorder(tempos), medir("zip_gravar"):
+                pass
+
+        thread = threading.Thread(target=worker, name="worker-1")
+        thread.start()
+        thread.join()
+
+        async def baixar() -> None:
+            with medir("zip_aguardar_download"):
+                await asyncio.sleep(0)
+
+        async def principal() -> None:
+            await asyncio.gather(
+                asyncio.create_task(baixar(), name="download-a"), asyncio.create_task(baixar(), name="download-b")
+            )
+
+        asyncio.run(principal())
+        tempos.contar("navegador_permitidas", 3)
+
+    arquivo = salvar_trace(tempos, tmp_path / "traces", "download-55")
+    assert arquivo.name.startswith("trace-download-55-")
+    dados = json.loads(arquivo.read_text(encoding="utf-8"))
+    trechos = [evento for evento in dados["traceEvents"] if evento["ph"] == "X"]
+    assert [evento["name"] for evento in trechos][:3] == ["login_e_abertura_bloco", "pagina", "zip_gravar"]
+    pagina = trechos[1]
+    assert pagina["ts"] >= 0 and pagina["dur"] >= trechos[0]["dur"]
+    faixas = {
+        evento["args"]["name"]: evento["tid"] for evento in dados["traceEvents"] if evento["name"] == "thread_name"
+    }
+    assert {"worker-1", "download-a", "download-b"} <= set(faixas)
+    assert len(set(faixas.values())) == len(faixas)
+    assert dados["otherData"]["resumo"]["zip_aguardar_download"]["count"] == 2
+    assert dados["otherData"]["contadores"] == {"navegador_permitidas": 3}
+
+
+def test_trechos_acima_do_limite_ficam_so_no_resumo(monkeypatch) -> None:
+    monkeypatch.setattr(timing, "_MAX_TRECHOS", 2)
+    tempos = TimingRecorder()
+    for _ in range(5):
+        tempos.registrar("leitura_pagina", 0.01)
+    dados = tempos.trace()
+    assert len([evento for evento in dados["traceEvents"] if evento["ph"] == "X"]) == 2
+    assert dados["otherData"]["trechos_descartados"] == 3
+    assert tempos.resumo()["leitura_pagina"]["count"] == 5
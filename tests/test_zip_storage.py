@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import zipfile
+
+import pytest
+
+from seiautomation.manifest import DownloadManifest
+from seiautomation.zip_storage import ZipCorrompidoError, salvar_arquivo, salvar_bytes
+
+
+def _zip(conteudo: bytes = b"conteudo") -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as arquivo:
+        arquivo.writestr("doc.txt", conteudo)
+    return buffer.getvalue()
+
+
+def test_salvar_arquivo_move_e_calcula_hash(tmp_path) -> None:
+    dados = _zip()
+    origem = tmp_path / "download-tmp"
+    origem.write_bytes(dados)
+
+    salvo = salvar_arquivo(origem, tmp_path / "0001_processo.zip")
+
+    assert not origem.exists()
+    assert salvo.arquivo == "0001_processo.zip"
+    assert salvo.tamanho == len(dados)
+    assert salvo.sha256 == hashlib.sha256(dados).hexdigest()
+    assert (tmp_path / "0001_processo.zip").read_bytes() == dados
+
+
+def test_zip_truncado_nao_e_publicado(tmp_path) -> None:
+    destino = tmp_path / "0001_processo.zip"
+    with pytest.raises(ZipCorrompidoError):
+        salvar_bytes(_zip()[:-10], destino)
+    assert not destino.exists()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_manifesto_ignora_zip_legado_truncado(tmp_path) -> None:
+    (tmp_path / "0001_2024_processo.zip").write_bytes(_zip()[:-10])
+    (tmp_path / "0002_2024_processo.zip").write_bytes(_zip())
+    with DownloadManifest(tmp_path) as manifesto:
+        assert "0001/2024" not in manifesto
+        assert "0002/2024" in manifesto